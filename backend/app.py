@@ -2,7 +2,11 @@ from flask import Flask
 from flask_migrate import Migrate
 from models.db import db
 import models
+from models import search, partitions
+from models.routing import router, REPLICA_PREFIX
 import os
+import logging
+import click
 from routes.auth import auth_bp
 from routes.projects import projects_bp
 from routes.project_member import project_member_bp
@@ -12,24 +16,48 @@ from routes.user import user_bp
 from routes.teams import teams_bp
 from routes.notification import notification_bp
 from routes.reports import reports_bp
+from routes.search import search_bp
+from routes.health import health_bp
 from flask_cors import CORS
 from flask import request
-from flask_jwt_extended import JWTManager
+from controllers.jwt_utils import authenticate_request
+from controllers.serializers import FastJSONProvider
+from controllers.pooling import engine_options, log_pool_stats
 from routes.setup import setup_bp
+from controllers.realtime import socketio, RealtimeNamespace, NAMESPACE
+from green import green_mode_active, patch_psycopg
 
+# Under gunicorn -k eventlet, let psycopg2 yield to other requests while it waits on Postgres
+if green_mode_active():
+    patch_psycopg()
 
 
+
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 # For production, restrict CORS to your frontend's Render URL
 FRONTEND_URL = os.getenv("FRONTEND_URL", "*")
-CORS(app, resources={r"/*": {"origins": "https://jira-clone-frontend-1uup.onrender.com"}}, allow_headers="*", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
+FRONTEND_ORIGIN = "https://jira-clone-frontend-1uup.onrender.com"
+CORS(app, resources={r"/*": {"origins": FRONTEND_ORIGIN}}, allow_headers="*", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
+# Pool size, overflow, recycle, pre-ping and PgBouncer (NullPool) mode come from DB_POOL_* variables
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(os.getenv('DATABASE_URL'))
+# Optional comma-separated read replicas; GET requests read from them (see models/routing.py)
+REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+app.config['SQLALCHEMY_BINDS'] = {f'{REPLICA_PREFIX}{i}': {'url': url, **engine_options(url)} for i, url in enumerate(REPLICA_URLS)}
+app.config['DB_STICKY_SECONDS'] = float(os.getenv('DB_STICKY_SECONDS', 5))
+app.config['DB_REPLICA_MAX_LAG'] = float(os.getenv('DB_REPLICA_MAX_LAG', 2))
+app.config['DB_REPLICA_CHECK_INTERVAL'] = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 5))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'very-secret-key'
-app.config['JWT_TOKEN_LOCATION'] = ['headers']
-app.config['JWT_HEADER_NAME'] = 'Authorization'
-app.config['JWT_HEADER_TYPE'] = 'Bearer'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SIDE_EFFECTS_MODE'] = os.getenv('SIDE_EFFECTS_MODE', 'inline')
+app.config['NOTIFICATION_RETENTION_DAYS'] = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
+# Activity older than this many whole months moves to gzipped NDJSON segments in ACTIVITY_ARCHIVE_DIR
+# (default <instance>/activity_archive); every worker must see the same directory
+app.config['ACTIVITY_HOT_MONTHS'] = int(os.getenv('ACTIVITY_HOT_MONTHS', 6))
+app.config['ACTIVITY_ARCHIVE_DIR'] = os.getenv('ACTIVITY_ARCHIVE_DIR')
 # Register blueprints
 app.register_blueprint(auth_bp)
 app.register_blueprint(projects_bp)
@@ -40,16 +68,108 @@ app.register_blueprint(user_bp)
 app.register_blueprint(teams_bp)
 app.register_blueprint(notification_bp)
 app.register_blueprint(reports_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(health_bp)
 app.register_blueprint(setup_bp)
 
 db.init_app(app)
-migrate = Migrate(app, db)
-jwt = JWTManager(app)
-print('JWTManager initialized:', jwt)
+router.init_app(app)
+# Search structures and activity_log partitions live outside the ORM mapping; keep autogenerate off them
+migrate = Migrate(app, db, include_object=lambda *args: search.include_object(*args) and partitions.include_object(*args))
+# Verify the bearer token once per request; jwt_required and the RBAC checks read request.user
+app.before_request(authenticate_request)
+app.after_request(log_pool_stats)
+# Set SOCKETIO_MESSAGE_QUEUE (e.g. a Redis URL) when running more than one worker
+socketio.init_app(app, cors_allowed_origins=FRONTEND_ORIGIN, message_queue=os.getenv('SOCKETIO_MESSAGE_QUEUE'))
+socketio.on_namespace(RealtimeNamespace(NAMESPACE))
 
 @app.route('/')
 def index():
     return 'Jira Clone Backend is running!'
 
+@app.cli.command('backfill-permission-masks')
+def backfill_permission_masks_command():
+    """Compile legacy Permission rows into Role.permission_mask."""
+    from database import backfill_permission_masks
+    print(f'Backfilled {backfill_permission_masks()} roles')
+
+@app.cli.command('reconcile-stats')
+def reconcile_stats_command():
+    """Recompute project/user counters from source tables and report drift."""
+    from controllers.stats import reconcile_stats
+    drift = reconcile_stats()
+    for entry in drift:
+        print(entry)
+    print(f'{len(drift)} counters corrected')
+
+@app.cli.command('rebalance-ranks')
+def rebalance_ranks_command():
+    """Respace card ranks in columns whose keys have grown long."""
+    from controllers.ranking import long_rank_columns, rebalance_column
+    column_ids = long_rank_columns()
+    for column_id in column_ids:
+        rebalance_column(column_id)
+        db.session.commit()
+    print(f'Rebalanced {len(column_ids)} columns')
+
+@app.cli.command('refresh-rollups')
+def refresh_rollups_command():
+    """Store the epic rollups missing for items that have children, e.g. after loading data by hand."""
+    from controllers.hierarchy import refresh_missing_rollups
+    print(f'Stored rollups for {refresh_missing_rollups()} items')
+
+@app.cli.command('purge-notifications')
+@click.option('--days', type=int, default=None, help='Age in days (default NOTIFICATION_RETENTION_DAYS).')
+@click.option('--batch-size', type=int, default=5000, show_default=True)
+def purge_notifications_command(days, batch_size):
+    """Delete read notifications past the retention window, in batches."""
+    from controllers.notification_controller import purge_read_notifications
+    days = app.config['NOTIFICATION_RETENTION_DAYS'] if days is None else days
+    total = purge_read_notifications(days, batch_size, progress=lambda n: print(f'{n} deleted'))
+    print(f'Purged {total} read notifications older than {days} days')
+
+@app.cli.command('purge-projects')
+@click.option('--batch-size', type=int, default=None, help='Items per transaction (default 2000).')
+def purge_projects_command(batch_size):
+    """Finish purging soft-deleted projects, e.g. after a restart interrupted the background worker."""
+    from controllers.deletion import purge_pending_projects, PURGE_BATCH_SIZE
+    total = purge_pending_projects(batch_size or PURGE_BATCH_SIZE, progress=lambda project_id, n: print(f'Project {project_id}: {n} items deleted'))
+    print(f'Purged {total} items')
+
+@app.cli.command('generate-data')
+@click.option('--seed', type=int, default=0, show_default=True, help='Same seed and end date, same data.')
+@click.option('--users', type=int, default=1000, show_default=True)
+@click.option('--teams', type=int, default=50, show_default=True)
+@click.option('--projects', type=int, default=100, show_default=True)
+@click.option('--items', type=int, default=100000, show_default=True)
+@click.option('--comments', type=float, default=1.0, show_default=True, help='Average comments per item.')
+@click.option('--activity', type=float, default=1.0, show_default=True, help='Average edits per item besides status changes.')
+@click.option('--months', type=int, default=12, show_default=True, help='Months of history ending at --end.')
+@click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Newest timestamp (default today).')
+@click.option('--batch-size', type=int, default=10000, show_default=True, help='Rows per COPY or executemany.')
+def generate_data_command(seed, users, teams, projects, items, comments, activity, months, end, batch_size):
+    """Append a large synthetic dataset for benchmarking; every user's password is 'password'."""
+    from synthetic_data import generate_dataset
+    if min(users, teams, projects) < 1 or items < 0:
+        raise click.BadParameter('users, teams and projects must be at least 1, items at least 0')
+    counts = generate_dataset(users, teams, projects, items, seed=seed, end=end, months=months, comments=comments,
+                              activity=activity, batch_size=batch_size, progress=lambda n: print(f'{n} items generated'))
+    for table, count in counts.items():
+        print(f'{table}: {count} rows')
+    print(f'Loaded {sum(counts.values())} rows')
+
+@app.cli.command('archive-activity')
+@click.option('--older-than-months', type=int, default=None, help='Months kept in the database (default ACTIVITY_HOT_MONTHS).')
+def archive_activity_command(older_than_months):
+    """Create upcoming activity_log partitions and archive cold months; run daily."""
+    from controllers.activity import archive_activity
+    created = partitions.ensure_partitions(db.session.connection())
+    db.session.commit()
+    for month in created:
+        print(f'Created partition {partitions.partition_name(month)}')
+    months = app.config['ACTIVITY_HOT_MONTHS'] if older_than_months is None else older_than_months
+    total = archive_activity(months, progress=lambda month, count: print(f'{month:%Y-%m}: {count} rows archived'))
+    print(f'Archived {total} activity rows')
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    socketio.run(app, host="0.0.0.0", port=5000, debug=True)
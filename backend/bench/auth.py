@@ -0,0 +1,45 @@
+"""Per-request authentication: one decode with a principal cache against the old double decode.
+
+    python -m bench.auth [--repeat N]
+
+The old path is rebuilt from its parts: jwt_required decoded the token and
+loaded the User, then require_project_permission ran flask_jwt_extended's
+verify_jwt_in_request, which decoded it again.
+"""
+import argparse
+from flask import Flask
+from flask_jwt_extended import JWTManager, verify_jwt_in_request
+from bench.common import app, build, db, login, measure, report
+from controllers import jwt_utils
+from models.user import User
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5000)
+    args = parser.parse_args()
+    build()
+    headers = login(app.test_client())
+    token = headers['Authorization'].split(' ')[1]
+    legacy = Flask('legacy')
+    legacy.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']
+    JWTManager(legacy)
+
+    def double_decode():
+        payload = jwt_utils.decode_jwt(token)
+        db.session.get(User, int(payload['sub']))
+        db.session.expunge_all()
+        with legacy.test_request_context('/', headers=headers):
+            verify_jwt_in_request()
+
+    with app.test_request_context('/', headers=headers):
+        jwt_utils.invalidate_principal()
+        report('decode + User query + second decode (before)', *measure(double_decode, args.repeat))
+        report('authenticate_request, principal cached', *measure(jwt_utils.authenticate_request, args.repeat))
+
+        def cold():
+            jwt_utils.invalidate_principal()
+            jwt_utils.authenticate_request()
+        report('authenticate_request, cache miss', *measure(cold, args.repeat))
+
+if __name__ == '__main__':
+    main()
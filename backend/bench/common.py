@@ -0,0 +1,92 @@
+"""Shared setup for the benchmark scripts in this directory.
+
+Run them from backend/, e.g. `python -m bench.roles`. Each script builds its
+own database: a fresh SQLite file in a temporary directory, or
+BENCH_DATABASE_URL when set. That database is dropped and rebuilt, so point
+it at a scratch database. Every build starts from the demo seed (alice, bob,
+carol and dave, password 'password'). Scripts that need volume append a
+synthetic dataset with a fixed seed and end date, so two runs measure the
+same rows.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+BENCH_DIR = tempfile.mkdtemp(prefix='jira-clone-bench-')
+os.environ['DATABASE_URL'] = os.environ.get('BENCH_DATABASE_URL') or f'sqlite:///{os.path.join(BENCH_DIR, "bench.db")}'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+from app import app  # noqa: E402
+from database import reset_and_seed_db  # noqa: E402
+from models.db import db  # noqa: E402
+
+SEED = 0
+END = datetime(2026, 1, 1)
+
+def build(users=0, teams=0, projects=0, items=0, **options):
+    """Reset the database to the demo seed, then append a synthetic dataset when items are asked for."""
+    with app.app_context():
+        reset_and_seed_db()
+        if items:
+            from synthetic_data import generate_dataset
+            return generate_dataset(users, teams, projects, items, seed=SEED, end=END, **options)
+    return {}
+
+def login(client, email='alice@example.com', password='password'):
+    token = client.post('/login', json={'email': email, 'password': password}).get_json()['token']
+    return {'Authorization': f'Bearer {token}'}
+
+class Counter:
+    """Statements and commits seen by the engine while active."""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def _statement(self, *args):
+        self.statements += 1
+
+    def _commit(self, connection):
+        self.commits += 1
+
+@contextmanager
+def counting():
+    counter = Counter()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', counter._statement)
+    event.listen(engine, 'commit', counter._commit)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter._statement)
+        event.remove(engine, 'commit', counter._commit)
+
+def measure(fn, repeat):
+    """(seconds per call, statements per call, commits per call) over repeat calls."""
+    with counting() as counter:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = time.perf_counter() - start
+    return elapsed / repeat, counter.statements / repeat, counter.commits / repeat
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def report(label, seconds=None, statements=None, commits=None, **extra):
+    parts = [f'{label:<44}']
+    if seconds is not None:
+        parts.append(f'{seconds * 1e6:>10.1f} us')
+    if statements is not None:
+        parts.append(f'{statements:>6.1f} stmts')
+    if commits is not None:
+        parts.append(f'{commits:>5.1f} commits')
+    parts.extend(f'{name} {value}' for name, value in extra.items())
+    print('  '.join(parts))
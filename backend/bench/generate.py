@@ -0,0 +1,62 @@
+"""Synthetic dataset generation: rows per second at a few sizes, and same seed, same rows.
+
+    python -m bench.generate [--items 10000 100000] [--check]
+
+Each size starts from the demo seed and times generate_dataset, counter rows
+and rollups included, with users, teams and projects scaled from the item
+count the way the generate-data defaults are. --check builds the smallest
+size twice on an empty schema and compares a digest of every table. Columns
+set from the clock or a random salt are left out of the digest.
+"""
+import argparse
+import hashlib
+import time
+from sqlalchemy import select
+from bench.common import END, SEED, app, build, db
+from synthetic_data import generate_dataset
+
+# The salted password hash, and the time counter rows and rollups were stored
+VOLATILE = {'password_hash', 'computed_at', 'project_stats.updated_at', 'user_stats.updated_at'}
+
+def scale(items):
+    return max(20, items // 100), max(2, items // 2000), max(2, items // 1000), items
+
+def digests():
+    result = {}
+    for table in db.metadata.sorted_tables:
+        columns = [c for c in table.c if c.name not in VOLATILE and f'{table.name}.{c.name}' not in VOLATILE]
+        digest = hashlib.sha256()
+        for row in db.session.execute(select(*columns).order_by(*table.primary_key.columns)):
+            digest.update(repr(tuple(row)).encode())
+        result[table.name] = digest.hexdigest()
+    return result
+
+def empty_build(items):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        generate_dataset(*scale(items), seed=SEED, end=END)
+        return digests()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--check', action='store_true', help='Build the smallest size twice and compare table digests.')
+    args = parser.parse_args()
+    for items in args.items:
+        build()
+        users, teams, projects, _ = scale(items)
+        with app.app_context():
+            began = time.perf_counter()
+            counts = generate_dataset(users, teams, projects, items, seed=SEED, end=END)
+            elapsed = time.perf_counter() - began
+        rows = sum(counts.values())
+        print(f'{items:>8} items ({users} users, {teams} teams, {projects} projects): {rows} rows in {elapsed:.1f}s, '
+              f'{rows / elapsed:,.0f} rows/s, {counts["item_rollup"]} rollups')
+    if args.check:
+        first, second = empty_build(min(args.items)), empty_build(min(args.items))
+        differing = [name for name in first if first[name] != second[name]]
+        print('Same seed, same rows:', 'yes' if not differing else f'no, {", ".join(differing)} differ')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Connected Socket.IO clients one eventlet worker holds, and how fast item events reach them.
+
+    python -m bench.realtime [--clients 1000] [--events 20] [--members 100]
+
+Starts one gunicorn eventlet worker, with the flags render.yaml uses, and
+opens --clients websocket connections to /realtime. Each client signs in as
+one of --members generated members of the demo project, then subscribes to
+that project. Once every client has subscribed (or given up), --events
+PATCH /items/<id> requests go out one at a time. Each client timestamps the
+item_updated deltas it receives. The report covers the clients connected,
+the worker's resident memory while they are, and delivery latency from the
+start of the PATCH.
+
+The load runs in its own process under eventlet. It speaks the Engine.IO 4
+text framing over simple-websocket, a dependency the server already has, so
+no Socket.IO client package is needed.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from bench.serving import BACKEND, wait_for
+
+NAMESPACE = '/realtime'
+
+def run_clients(port, config_path, clients, events, interval, worker_pid):
+    import eventlet
+    eventlet.monkey_patch()
+    import http.client
+    import simple_websocket
+    with open(config_path) as f:
+        config = json.load(f)
+    url = f'ws://127.0.0.1:{port}/socket.io/?EIO=4&transport=websocket'
+    prefix = f'42{NAMESPACE},'
+    sent, latencies, failures = {}, [], {}
+    state = {'subscribed': 0, 'finished': 0, 'done': False}
+
+    def fail(reason):
+        failures[reason] = failures.get(reason, 0) + 1
+
+    def client(token):
+        try:
+            ws = simple_websocket.Client.connect(url)
+        except Exception as e:
+            fail(type(e).__name__)
+            state['finished'] += 1
+            return
+        try:
+            ws.receive(timeout=30)  # Engine.IO open packet
+            ws.send(f'40{NAMESPACE},' + json.dumps({'token': token}))
+            while not state['done']:
+                message = ws.receive(timeout=1)
+                if message is None:
+                    continue
+                if message == '2':
+                    ws.send('3')
+                elif message.startswith(f'40{NAMESPACE},'):
+                    ws.send(f'42{NAMESPACE},1' + json.dumps(['subscribe', {'project_id': config['project_id']}]))
+                elif message.startswith(f'44{NAMESPACE},'):
+                    fail('refused')
+                    return
+                elif message.startswith(f'43{NAMESPACE},1'):
+                    state['subscribed'] += 1
+                elif message.startswith(prefix):
+                    name, payload = json.loads(message[len(prefix):])
+                    if name == 'item_updated' and payload.get('title') in sent:
+                        latencies.append(time.perf_counter() - sent[payload['title']])
+        except Exception as e:
+            fail(type(e).__name__)
+        finally:
+            state['finished'] += 1
+            ws.close()
+
+    began = time.perf_counter()
+    pool = eventlet.GreenPool(clients)
+    tokens = config['tokens']
+    for i in range(clients):
+        pool.spawn(client, tokens[i % len(tokens)])
+        if i % 100 == 99:
+            eventlet.sleep(0.05)
+    deadline = time.time() + 60
+    while state['subscribed'] + state['finished'] < clients and time.time() < deadline:
+        eventlet.sleep(0.1)
+    connect_seconds = time.perf_counter() - began
+    rss = None
+    if worker_pid:
+        with open(f'/proc/{worker_pid}/status') as f:
+            rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    headers = {'Authorization': f'Bearer {config["writer"]}', 'Content-Type': 'application/json'}
+    for n in range(events):
+        title = f'Realtime bench {n}'
+        sent[title] = time.perf_counter()
+        conn.request('PATCH', f'/items/{config["item_id"]}', body=json.dumps({'title': title}), headers=headers)
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            fail(f'PATCH {response.status}')
+        eventlet.sleep(interval)
+    eventlet.sleep(5)
+    state['done'] = True
+    pool.waitall()
+    latencies.sort()
+    n = len(latencies)
+    print(json.dumps({
+        'subscribed': state['subscribed'], 'connect_seconds': connect_seconds, 'rss_kib': rss,
+        'delivered': n, 'expected': state['subscribed'] * events, 'failures': failures,
+        'p50': latencies[n // 2] * 1e3 if n else None,
+        'p99': latencies[min(n - 1, int(n * 0.99))] * 1e3 if n else None,
+        'max': latencies[-1] * 1e3 if n else None,
+    }))
+
+def setup(members):
+    """Tokens for members generated in the demo project, alice's token, and a project item to update."""
+    from sqlalchemy import insert
+    from bench.common import app, build, db
+    from controllers.jwt_utils import generate_jwt
+    from models.item import Item
+    from models.project_member import ProjectMember
+    from models.role import Role
+    from models.user import User
+    build()
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {'username': f'listener{i}', 'email': f'listener{i}@example.com', 'password_hash': 'x', 'role': 'member'}
+            for i in range(members)
+        ])
+        users = User.query.filter(User.email.like('listener%')).all()
+        role_id = db.session.query(Role.id).filter(Role.project_id == 1, Role.name == 'member').scalar()
+        db.session.execute(insert(ProjectMember), [{'user_id': u.id, 'project_id': 1, 'role_id': role_id} for u in users])
+        db.session.commit()
+        return {
+            'tokens': [generate_jwt(u) for u in users],
+            'writer': generate_jwt(User.query.filter_by(email='alice@example.com').one()),
+            'project_id': 1,
+            'item_id': db.session.query(Item.id).filter(Item.project_id == 1).order_by(Item.id).limit(1).scalar(),
+        }
+
+def worker_pid(master_pid, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+            children = f.read().split()
+        if children:
+            return int(children[0])
+        time.sleep(0.2)
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.25, help='Seconds between PATCH requests.')
+    parser.add_argument('--members', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--client', metavar='CONFIG', help=argparse.SUPPRESS)
+    parser.add_argument('--worker-pid', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # Every connection is a file descriptor on both sides
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if args.client:
+        run_clients(args.port, args.client, args.clients, args.events, args.interval, args.worker_pid)
+        return
+
+    config = setup(args.members)
+    from bench.common import BENCH_DIR
+    config_path = os.path.join(BENCH_DIR, 'realtime.json')
+    with open(config_path, 'w') as f:
+        json.dump(config, f)
+    command = [
+        sys.executable, '-m', 'gunicorn', '-k', 'eventlet', '-w', '1', '--worker-connections', str(args.clients + 100),
+        '--keep-alive', '75', '-b', f'127.0.0.1:{args.port}', 'app:app'
+    ]
+    server = subprocess.Popen(command, cwd=BACKEND, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(args.port)
+        result = subprocess.run(
+            [sys.executable, '-m', 'bench.realtime', '--port', str(args.port), '--clients', str(args.clients),
+             '--events', str(args.events), '--interval', str(args.interval), '--client', config_path,
+             '--worker-pid', str(worker_pid(server.pid) or 0)],
+            cwd=BACKEND, capture_output=True, text=True, check=True
+        )
+    finally:
+        server.terminate()
+        server.wait()
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    print(f'{stats["subscribed"]}/{args.clients} clients subscribed to one eventlet worker in {stats["connect_seconds"]:.1f}s'
+          + (f', worker RSS {stats["rss_kib"] / 1024:.0f} MiB' if stats['rss_kib'] else ''))
+    print(f'{stats["delivered"]}/{stats["expected"]} item_updated deltas delivered  p50 {stats["p50"] or 0:.0f} ms  '
+          f'p99 {stats["p99"] or 0:.0f} ms  max {stats["max"] or 0:.0f} ms  failures {stats["failures"] or 0}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Role creation and permission checks: bitmask roles against per-action Permission rows.
+
+    python -m bench.roles [--repeat N]
+
+The Permission-row path is rebuilt here from ROLE_DEFS the way
+create_roles_and_permissions used to write it: one flush per role, then a
+row per action. A cache miss loaded the member's Permission rows into a set.
+"""
+import argparse
+from bench.common import app, build, db, measure, report
+from controllers import rbac
+from database import ROLE_DEFS, create_roles_and_permissions
+from models.permission import Permission
+from models.project import Project
+from models.project_member import ProjectMember
+from models.role import Role
+
+def create_permission_rows(project):
+    for name, actions in ROLE_DEFS.items():
+        role = Role(name=name, project_id=project.id)
+        db.session.add(role)
+        db.session.flush()
+        for action in actions:
+            db.session.add(Permission(action=action, role_id=role.id))
+    db.session.commit()
+
+def load_permission_rows(user_id, project_id):
+    rows = db.session.query(ProjectMember.role_id, Permission.action).outerjoin(
+        Permission, Permission.role_id == ProjectMember.role_id
+    ).filter(ProjectMember.user_id == user_id, ProjectMember.project_id == project_id).all()
+    return frozenset(r.action for r in rows if r.action)
+
+def new_project():
+    project = Project(name='bench', admin_id=1)
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    build()
+    with app.app_context():
+        projects = [new_project() for _ in range(2 * args.repeat)]
+        rows, masks = iter(projects[:args.repeat]), iter(projects[args.repeat:])
+        print('Roles for a new project')
+        report('Permission rows', *measure(lambda: create_permission_rows(next(rows)), args.repeat))
+        report('bitmask (create_roles_and_permissions)', *measure(lambda: create_roles_and_permissions(next(masks)), args.repeat))
+
+        # Alice administers the demo project; its roles carry masks and the legacy rows are added alongside
+        admin_role = Role.query.filter_by(project_id=1, name='admin').one()
+        db.session.add_all(Permission(action=action, role_id=admin_role.id) for action in ROLE_DEFS['admin'])
+        db.session.commit()
+        print('Loading a member\'s permissions (cache miss)')
+        report('Permission rows -> set', *measure(lambda: load_permission_rows(1, 1), args.repeat * 10))
+        report('bitmask (rbac.load_permissions)', *measure(lambda: rbac.load_permissions(1, 1), args.repeat * 10))
+        # Both versions answer repeat checks from the same LRU; only the final test differs
+        rbac.user_has_permission(1, 1, 'delete_project')
+        report('rbac.user_has_permission (cache hit)', *measure(lambda: rbac.user_has_permission(1, 1, 'delete_project'), args.repeat * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Search latency over a seeded corpus.
+
+    python -m bench.search [--items N] [--probes N]
+
+Generates the corpus with synthetic_data, then signs in as the generated
+user who belongs to the most projects. The same seeded probes are sent to
+/search as single words, two-word queries and prefixes, once across all of
+that user's projects and once scoped to their largest project. Prints
+latency percentiles and the average result total.
+"""
+import argparse
+import random
+import time
+from sqlalchemy import func
+from bench.common import SEED, app, build, db, login, percentile
+from models.item import Item
+from models.project_member import ProjectMember
+from models.user import User
+from synthetic_data import NOUNS, PASSWORD, VERBS, WORDS
+
+def probes(count):
+    rng = random.Random(SEED)
+    vocabulary = [w for w in NOUNS + WORDS if ' ' not in w]
+    queries = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            queries.append(rng.choice(vocabulary))
+        elif kind == 1:
+            queries.append(f'{rng.choice(VERBS).lower()} {rng.choice(NOUNS)}')
+        else:
+            queries.append(rng.choice(vocabulary)[:4])
+    return queries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--probes', type=int, default=60)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    counts = build(args.users, max(1, args.users // 20), args.projects, args.items)
+    print(f'Seeded {sum(counts.values())} rows ({counts.get("item", 0)} items) in {time.perf_counter() - start:.0f}s')
+    with app.app_context():
+        user_id, memberships = db.session.query(ProjectMember.user_id, func.count()).group_by(
+            ProjectMember.user_id
+        ).order_by(func.count().desc()).first()
+        email = db.session.get(User, user_id).email
+        project_id = db.session.query(Item.project_id).join(
+            ProjectMember, (ProjectMember.project_id == Item.project_id) & (ProjectMember.user_id == user_id)
+        ).group_by(Item.project_id).order_by(func.count().desc()).limit(1).scalar()
+    client = app.test_client()
+    headers = login(client, email, PASSWORD)
+    print(f'Searching as {email}, member of {memberships} projects')
+    queries = probes(args.probes)
+    for label, scope in (('all projects', ''), (f'project {project_id}', f'&project_id={project_id}')):
+        latencies, totals = [], []
+        for q in queries:
+            began = time.perf_counter()
+            response = client.get(f'/search?q={q}{scope}', headers=headers)
+            latencies.append(time.perf_counter() - began)
+            assert response.status_code == 200, response.get_json()
+            totals.append(response.get_json()['total'])
+        print(f'{label:<16} p50 {percentile(latencies, 0.5) * 1e3:7.1f} ms  p95 {percentile(latencies, 0.95) * 1e3:7.1f} ms  '
+              f'max {max(latencies) * 1e3:7.1f} ms  avg total {sum(totals) / len(totals):.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Item list payloads: orjson against the stdlib encoder, full rows against ?fields= projection.
+
+    python -m bench.serialization [--items 10000] [--repeat 20]
+
+Generates one project holding --items items and signs in as its admin. Each
+case requests the whole list in one page through the test client, with
+FastJSONProvider on orjson and then with orjson switched off, which is the
+fallback when it is not installed. The last block times the encoders alone
+on the same payload, without the query.
+"""
+import argparse
+import json
+import time
+from sqlalchemy import func
+from bench.common import app, build, db, login, measure, percentile, report
+from controllers import serializers
+from models.item import Item
+from models.project import Project
+from models.user import User
+from synthetic_data import PASSWORD
+
+FIELDS = ('', 'id,title,status,assignee_id')
+
+def timed_gets(client, headers, url, repeat):
+    latencies, size = [], 0
+    for _ in range(repeat):
+        began = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - began)
+        assert response.status_code == 200, response.get_json()
+        size = len(response.data)
+    return latencies, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    build(50, 2, 1, args.items)
+    with app.app_context():
+        project_id = db.session.query(Item.project_id).group_by(Item.project_id).order_by(func.count().desc()).limit(1).scalar()
+        email = db.session.query(User.email).join(Project, Project.admin_id == User.id).filter(Project.id == project_id).scalar()
+    client = app.test_client()
+    headers = login(client, email, PASSWORD)
+    installed = serializers.orjson
+    payload = None
+    for encoder, module in (('orjson', installed), ('stdlib', None)):
+        serializers.orjson = module
+        for fields in FIELDS:
+            url = f'/items/projects/{project_id}/items?limit={args.items}' + (f'&fields={fields}' if fields else '')
+            latencies, size = timed_gets(client, headers, url, args.repeat)
+            report(f'{encoder}, {"fields=" + fields if fields else "all fields"}', percentile(latencies, 0.5),
+                   p95=f'{percentile(latencies, 0.95) * 1e3:.1f} ms', body=f'{size / 1024:.0f} KiB')
+            if payload is None:
+                payload = client.get(url, headers=headers).get_json()
+    serializers.orjson = installed
+
+    print(f'Encoding the full payload alone ({len(payload["items"])} items)')
+    with app.app_context():
+        provider = app.json
+        report('FastJSONProvider.dumps, orjson', *measure(lambda: provider.dumps(payload), args.repeat)[:1])
+        report('json.dumps (stdlib)', *measure(lambda: json.dumps(payload, default=provider.default), args.repeat)[:1])
+
+if __name__ == '__main__':
+    main()
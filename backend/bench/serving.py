@@ -0,0 +1,124 @@
+"""Throughput and latency of sync against eventlet gunicorn workers under concurrent clients.
+
+    python -m bench.serving [--clients 500] [--duration 20] [--workers 4]
+
+Builds a synthetic dataset and starts gunicorn once per worker class, with
+the flags render.yaml uses. Each run holds --clients keep-alive connections
+open against GET /items/projects/<id>/items and GET /notifications, and
+reports requests per second and latency percentiles. The client runs in its
+own process under eventlet, so it never competes with the server for the
+GIL. Set BENCH_DATABASE_URL to a PostgreSQL scratch database to measure the
+case green workers are for. SQLite calls cannot yield, so on SQLite the two
+classes differ only in scheduling.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_CLASSES = ('sync', 'eventlet')
+
+def run_client(port, path, token, clients, duration):
+    import eventlet
+    eventlet.monkey_patch()
+    import http.client
+    latencies, failures = [], {}
+    stop = time.time() + duration
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while time.time() < stop:
+            began = time.perf_counter()
+            try:
+                conn.request('GET', path, headers={'Authorization': f'Bearer {token}'})
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    latencies.append(time.perf_counter() - began)
+                else:
+                    failures[response.status] = failures.get(response.status, 0) + 1
+            except Exception as e:
+                failures[type(e).__name__] = failures.get(type(e).__name__, 0) + 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    pool = eventlet.GreenPool(clients)
+    for _ in range(clients):
+        pool.spawn(client)
+    pool.waitall()
+    latencies.sort()
+    n = len(latencies)
+    print(json.dumps({
+        'rps': n / duration,
+        'p50': latencies[n // 2] * 1e3 if n else None,
+        'p99': latencies[min(n - 1, int(n * 0.99))] * 1e3 if n else None,
+        'failures': failures,
+    }))
+
+def wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not listen on {port}')
+
+def serve(worker_class, workers, port):
+    command = [
+        sys.executable, '-m', 'gunicorn', '-k', worker_class, '-w', str(workers), '--worker-connections', '1000',
+        '--keep-alive', '75', '-b', f'127.0.0.1:{port}', 'app:app'
+    ]
+    return subprocess.Popen(command, cwd=BACKEND, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--client', nargs=2, metavar=('PATH', 'TOKEN'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.client:
+        run_client(args.port, args.client[0], args.client[1], args.clients, args.duration)
+        return
+
+    from sqlalchemy import func
+    from bench.common import app, build, db, login
+    from models.item import Item
+    from models.project import Project
+    from models.user import User
+    from synthetic_data import PASSWORD
+    build(200, 10, 20, args.items)
+    # Read the largest generated project as its admin
+    with app.app_context():
+        project_id = db.session.query(Item.project_id).group_by(Item.project_id).order_by(func.count().desc()).limit(1).scalar()
+        email = db.session.query(User.email).join(Project, Project.admin_id == User.id).filter(Project.id == project_id).scalar()
+    token = login(app.test_client(), email, PASSWORD)['Authorization'].split(' ')[1]
+    paths = (f'/items/projects/{project_id}/items', '/notifications')
+    print(f'{args.clients} clients for {args.duration:.0f}s, gunicorn -w {args.workers}, {os.environ["DATABASE_URL"].split(":")[0]}')
+    for worker_class in WORKER_CLASSES:
+        server = serve(worker_class, args.workers, args.port)
+        try:
+            wait_for(args.port)
+            for path in paths:
+                result = subprocess.run(
+                    [sys.executable, '-m', 'bench.serving', '--port', str(args.port), '--clients', str(args.clients),
+                     '--duration', str(args.duration), '--client', path, token],
+                    cwd=BACKEND, capture_output=True, text=True, check=True
+                )
+                stats = json.loads(result.stdout.strip().splitlines()[-1])
+                print(f'{worker_class:<9} GET {path:<28} {stats["rps"]:7.0f} req/s  p50 {stats["p50"] or 0:7.0f} ms  '
+                      f'p99 {stats["p99"] or 0:7.0f} ms  failures {stats["failures"] or 0}')
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == '__main__':
+    main()
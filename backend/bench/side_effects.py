@@ -0,0 +1,81 @@
+"""Writes per request with activity logs and notifications collected per unit of work.
+
+    python -m bench.side_effects [--repeat N]
+
+Times PATCH /items/<id> and POST /items/<id>/comments through the test client
+with SIDE_EFFECTS_MODE inline and queue. Each request writes an activity row
+and a notification. The request counts include the queue writer's batch
+commits while it keeps up. The last block compares the transaction shapes
+directly: the old three commits per item update (the update, then
+log_activity, then create_notification) against one commit carrying all three.
+Each commit is a log sync on a durable database, which is what this saves.
+"""
+import argparse
+import itertools
+import time
+from bench.common import app, build, counting, db, login, measure, percentile, report
+from controllers import side_effects
+from models.activity_log import ActivityLog
+from models.item import Item
+from models.notification import Notification
+
+STATUSES = ('todo', 'inprogress', 'inreview', 'done')
+
+def run_requests(client, headers, label, requests, repeat):
+    latencies = []
+    with counting() as counter:
+        for call in itertools.islice(itertools.cycle(requests), repeat):
+            start = time.perf_counter()
+            response = call(client, headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code < 300, response.get_json()
+        while not side_effects._queue.empty():
+            time.sleep(0.01)
+    report(label, statements=counter.statements / repeat, commits=counter.commits / repeat,
+           p50=f'{percentile(latencies, 0.5) * 1e3:.2f} ms', p95=f'{percentile(latencies, 0.95) * 1e3:.2f} ms')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+    build()
+    client = app.test_client()
+    alice = login(client)
+    statuses = itertools.cycle(STATUSES)
+    assignees = itertools.cycle((2, 3))
+    requests = {
+        'PATCH /items/1 (status, assignee)': [
+            lambda c, h: c.patch('/items/1', headers=h, json={'status': next(statuses), 'assignee_id': next(assignees)})
+        ],
+        'POST /items/1/comments': [lambda c, h: c.post('/items/1/comments', headers=h, json={'content': 'bench'})],
+    }
+    for mode in ('inline', 'queue'):
+        app.config['SIDE_EFFECTS_MODE'] = mode
+        print(f'SIDE_EFFECTS_MODE={mode}')
+        for label, calls in requests.items():
+            run_requests(client, alice, label, calls, args.repeat)
+    app.config['SIDE_EFFECTS_MODE'] = 'inline'
+
+    with app.app_context():
+        item = db.session.get(Item, 1)
+
+        def three_commits():
+            item.status = next(statuses)
+            db.session.commit()
+            db.session.add(ActivityLog(item_id=item.id, user_id=1, action='updated', changes={'status': [None, item.status]}))
+            db.session.commit()
+            db.session.add(Notification(user_id=2, message='bench'))
+            db.session.commit()
+
+        def one_commit():
+            item.status = next(statuses)
+            side_effects.record_activity(item.id, 1, 'updated', {'status': [None, item.status]})
+            side_effects.record_notification(2, 'bench')
+            db.session.commit()
+
+        print('Item update with one activity row and one notification')
+        report('three commits (before)', *measure(three_commits, args.repeat))
+        report('one commit (side-effect collector)', *measure(one_commit, args.repeat))
+
+if __name__ == '__main__':
+    main()
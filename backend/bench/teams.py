@@ -0,0 +1,85 @@
+"""Team-to-project membership sync on a large team.
+
+    python -m bench.teams [--members 500] [--projects 50]
+
+Alice administers two teams. 'Big' has --members members and is linked to
+all projects but the last. 'Other' shares half of those members and is
+linked to every project. Each team operation is timed through the test
+client, with its statement count, and counters are reconciled at the end to
+show no drift.
+"""
+import argparse
+import time
+from sqlalchemy import insert
+from bench.common import app, build, counting, db, login
+from controllers.stats import reconcile_stats
+from database import create_roles_and_permissions
+from models.project import Project
+from models.project_member import ProjectMember
+from models.project_team import ProjectTeam
+from models.role import Role
+from models.team import Team
+from models.team_member import TeamMember
+from models.user import User
+
+def setup(members, projects):
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {'username': f'member{i}', 'email': f'member{i}@example.com', 'password_hash': 'x', 'role': 'member'}
+            for i in range(members + 100)
+        ])
+        user_ids = [u for (u,) in db.session.query(User.id).filter(User.email.like('member%')).order_by(User.id)]
+        big, other = Team(name='Big', admin_id=1), Team(name='Other', admin_id=1)
+        db.session.add_all([big, other])
+        db.session.commit()
+        shared = members // 2
+        db.session.execute(insert(TeamMember), [{'team_id': big.id, 'user_id': u} for u in user_ids[:members]] +
+                           [{'team_id': other.id, 'user_id': u} for u in user_ids[:shared]])
+        project_ids = []
+        for i in range(projects):
+            project = Project(name=f'Project {i}', admin_id=1)
+            db.session.add(project)
+            db.session.commit()
+            create_roles_and_permissions(project)
+            project_ids.append(project.id)
+        db.session.execute(insert(ProjectTeam), [{'team_id': big.id, 'project_id': p} for p in project_ids[:-1]] +
+                           [{'team_id': other.id, 'project_id': p} for p in project_ids])
+        role = dict(db.session.query(Role.project_id, Role.id).filter(Role.name == 'member', Role.project_id.in_(project_ids)))
+        db.session.execute(insert(ProjectMember), [
+            {'user_id': u, 'project_id': p, 'role_id': role[p]} for p in project_ids[:-1] for u in user_ids[:members]
+        ] + [{'user_id': u, 'project_id': project_ids[-1], 'role_id': role[project_ids[-1]]} for u in user_ids[:shared]])
+        db.session.commit()
+        reconcile_stats()
+        return big.id, user_ids, project_ids
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--projects', type=int, default=50)
+    args = parser.parse_args()
+    build()
+    big, user_ids, project_ids = setup(args.members, args.projects)
+    client = app.test_client()
+    alice = login(client)
+    shared = args.members // 2
+    outsider = user_ids[args.members]
+    operations = [
+        (f'link project ({args.members - shared} members added)', 'post', f'/teams/{big}/projects', {'project_id': project_ids[-1]}),
+        (f'add member ({args.projects} projects)', 'post', f'/teams/{big}/members', {'email': f'member{args.members}@example.com'}),
+        ('remove that member', 'delete', f'/teams/{big}/members/{outsider}', None),
+        ('remove a member another team covers', 'delete', f'/teams/{big}/members/{user_ids[0]}', None),
+        ('remove a member only this team grants', 'delete', f'/teams/{big}/members/{user_ids[-101]}', None),
+        ('unlink project', 'delete', f'/teams/{big}/projects/{project_ids[0]}', None),
+    ]
+    for label, method, url, body in operations:
+        with counting() as counter:
+            began = time.perf_counter()
+            response = getattr(client, method)(url, headers=alice, json=body)
+            elapsed = time.perf_counter() - began
+        assert response.status_code < 300, response.get_json()
+        print(f'{label:<44} {counter.statements:>5} stmts  {elapsed * 1e3:8.1f} ms')
+    with app.app_context():
+        print('counter drift after the run:', reconcile_stats() or 'none')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+import gzip
+import json
+import os
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, func, insert
+from models.db import db
+from models.activity_log import ActivityLog, ActivitySegment, ActivitySegmentItem
+from models import partitions
+from controllers.pagination import decode_cursor, encode_cursor, keyset_page
+
+# Activity rows live in activity_log while hot. Once a month is older than the
+# retention window, archive_month() writes it to a gzipped NDJSON segment
+# under ACTIVITY_ARCHIVE_DIR and removes it from the database. A segment is
+# sorted by item, and each item's rows form their own gzip member, so the file
+# still reads as one NDJSON stream. activity_segment_item records each member's
+# byte range and id range. item_activity() merges the segments back in, so an
+# item's history reads the same whether archived or not. It decompresses only
+# that item's slice, and only for segments the requested page can reach.
+ArchivedActivity = namedtuple('ArchivedActivity', 'id item_id user_id action changes created_at')
+ARCHIVE_COLUMNS = (ActivityLog.id, ActivityLog.item_id, ActivityLog.user_id, ActivityLog.action, ActivityLog.changes, ActivityLog.created_at)
+
+def describe(action, changes):
+    """The human-readable line the UI shows for an entry."""
+    if not changes:
+        return None
+    if 'note' in changes:
+        return changes['note']
+    if action == 'created':
+        kind = 'Subtask' if 'parent_id' in changes else 'Task'
+        return f"{kind} created: {changes.get('title', [None, ''])[1]}"
+    return '; '.join(f'{field}: {old} -> {new}' for field, (old, new) in changes.items())
+
+def archive_dir():
+    return current_app.config.get('ACTIVITY_ARCHIVE_DIR') or os.path.join(current_app.instance_path, 'activity_archive')
+
+def _parse_rows(lines, item_id):
+    for line in lines:
+        row = json.loads(line)
+        if row['item_id'] == item_id:
+            row['created_at'] = datetime.fromisoformat(row['created_at'])
+            yield ArchivedActivity(**row)
+
+def _read_segment(entry, item_id):
+    path = os.path.join(archive_dir(), entry.path)
+    if entry.byte_offset is None:
+        # Segments archived before per-item members: scan the whole file
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return list(_parse_rows(f, item_id))
+    with open(path, 'rb') as f:
+        f.seek(entry.byte_offset)
+        data = f.read(entry.byte_length)
+    return list(_parse_rows(gzip.decompress(data).decode('utf-8').splitlines(), item_id))
+
+def segment_entries(item_id):
+    """Where an item's archived rows are: one entry per segment, oldest first."""
+    return db.session.query(
+        ActivitySegment.path, ActivitySegment.period_start, ActivitySegment.period_end,
+        ActivitySegmentItem.byte_offset, ActivitySegmentItem.byte_length,
+        ActivitySegmentItem.first_id, ActivitySegmentItem.last_id
+    ).join(ActivitySegmentItem, ActivitySegmentItem.segment_id == ActivitySegment.id
+    ).filter(ActivitySegmentItem.item_id == item_id).order_by(ActivitySegment.period_start).all()
+
+def _may_hold(entry, sort_key, low, high):
+    """Whether the entry can hold rows whose sort value lies in [low, high]; None leaves a side open."""
+    if sort_key == 'created_at':
+        first, last = entry.period_start, entry.period_end
+    elif entry.first_id is not None:
+        first, last = entry.first_id, entry.last_id
+    else:
+        return True
+    return (low is None or last >= low) and (high is None or first <= high)
+
+def archived_activity(item_id, entries=None):
+    """Archived entries of an item, oldest first."""
+    entries = segment_entries(item_id) if entries is None else entries
+    rows = [row for entry in entries for row in _read_segment(entry, item_id)]
+    rows.sort(key=lambda r: (r.created_at, r.id))
+    return rows
+
+def item_activity(item_id, sort_columns, sort_key='created_at', descending=False, limit=None, cursor=None):
+    """(rows, next_cursor) over live and archived entries; limit=None returns everything."""
+    query = ActivityLog.query.filter_by(item_id=item_id)
+    entries = segment_entries(item_id)
+    sort_column = sort_columns[sort_key]
+
+    def key(row):
+        return (getattr(row, sort_key), row.id)
+
+    if limit is None:
+        order = [sort_column.desc(), ActivityLog.id.desc()] if descending else [sort_column.asc(), ActivityLog.id.asc()]
+        return sorted(archived_activity(item_id, entries) + query.order_by(*order).all(), key=key, reverse=descending), None
+
+    live, live_cursor = keyset_page(query, sort_columns, ActivityLog.id, sort_key, descending, limit, cursor)
+    after = decode_cursor(cursor, sort_key, sort_column) if cursor else None
+    # The page lies between the cursor and, once live rows fill it, the last live row;
+    # segments wholly outside that window are not opened
+    edge = getattr(live[-1], sort_key) if len(live) >= limit else None
+    start = after[0] if after else None
+    low, high = (edge, start) if descending else (start, edge)
+    needed = [e for e in entries if _may_hold(e, sort_key, low, high)]
+    beyond = edge is not None and any(
+        _may_hold(e, sort_key, None, edge) if descending else _may_hold(e, sort_key, edge, None)
+        for e in entries if e not in needed
+    )
+    archived = archived_activity(item_id, needed)
+    if after:
+        archived = [r for r in archived if (key(r) < after if descending else key(r) > after)]
+    # Each source contributes its first `limit` rows, so the first `limit` merged rows are exact
+    rows = sorted(archived + live, key=key, reverse=descending)
+    more = len(rows) > limit or live_cursor is not None or beyond
+    rows = rows[:limit]
+    next_cursor = encode_cursor(sort_key, getattr(rows[-1], sort_key), rows[-1].id) if more and rows else None
+    return rows, next_cursor
+
+def cold_months(before):
+    """Start of every month that holds activity and ends on or before `before`."""
+    months = []
+    cutoff = partitions.month_start(before)
+    oldest = db.session.query(func.min(ActivityLog.created_at)).scalar()
+    month = partitions.month_start(oldest) if oldest else cutoff
+    while month < cutoff:
+        months.append(month)
+        month = partitions.add_months(month, 1)
+    return months
+
+def archive_month(month):
+    """Move one month of activity into a segment file; returns the number of rows archived."""
+    start, end = month, partitions.add_months(month, 1)
+    in_month = (ActivityLog.created_at >= start, ActivityLog.created_at < end)
+    rows = db.session.query(*ARCHIVE_COLUMNS).filter(*in_month).order_by(
+        ActivityLog.item_id, ActivityLog.created_at, ActivityLog.id
+    ).yield_per(5000)
+
+    directory = archive_dir()
+    os.makedirs(directory, exist_ok=True)
+    # A month archived twice (rows that arrived late) gets a second segment
+    path = f'activity-{start:%Y-%m}-{datetime.utcnow():%Y%m%d%H%M%S%f}.ndjson.gz'
+    tmp = os.path.join(directory, path + '.tmp')
+    count, max_id, members = 0, None, []
+    with open(tmp, 'wb') as f:
+        lines, ids = [], []
+
+        def write_member():
+            # One gzip member per item; mtime=0 keeps the bytes reproducible
+            data = gzip.compress(''.join(lines).encode('utf-8'), mtime=0)
+            members.append({'item_id': item_id, 'byte_offset': f.tell(), 'byte_length': len(data),
+                            'first_id': min(ids), 'last_id': max(ids)})
+            f.write(data)
+            lines.clear()
+            ids.clear()
+
+        item_id = None
+        for row in rows:
+            if row.item_id != item_id and lines:
+                write_member()
+            item_id = row.item_id
+            lines.append(json.dumps({
+                'id': row.id, 'item_id': row.item_id, 'user_id': row.user_id, 'action': row.action,
+                'changes': row.changes, 'created_at': row.created_at.isoformat()
+            }, separators=(',', ':')) + '\n')
+            ids.append(row.id)
+            count += 1
+            max_id = row.id if max_id is None else max(max_id, row.id)
+        if lines:
+            write_member()
+    if not count:
+        os.remove(tmp)
+        return 0
+    os.replace(tmp, os.path.join(directory, path))
+
+    segment_id = db.session.execute(insert(ActivitySegment).returning(ActivitySegment.id), {
+        'period_start': start, 'period_end': end, 'path': path, 'row_count': count, 'archived_at': datetime.utcnow()
+    }).scalar()
+    db.session.execute(insert(ActivitySegmentItem), [dict(member, segment_id=segment_id) for member in members])
+    connection = db.session.connection()
+    name = partitions.partition_name(start)
+    if partitions.is_partitioned(connection) and name in partitions.month_partitions(connection).values():
+        connection.exec_driver_sql(f'ALTER TABLE {partitions.PARENT} DETACH PARTITION {name}')
+        connection.exec_driver_sql(f'DROP TABLE {name}')
+    # Whatever is left: rows in the DEFAULT partition, or the whole month on SQLite.
+    # Rows written since the file was (higher ids) stay for the next run.
+    db.session.execute(delete(ActivityLog).where(*in_month, ActivityLog.id <= max_id), execution_options={'synchronize_session': False})
+    db.session.commit()
+    return count
+
+def archive_activity(older_than_months, now=None, progress=None):
+    """Archive every month that ended more than older_than_months ago, one transaction per month."""
+    cutoff = partitions.add_months(partitions.month_start(now or datetime.utcnow()), -older_than_months)
+    total = 0
+    for month in cold_months(cutoff):
+        count = archive_month(month)
+        total += count
+        if progress:
+            progress(month, count)
+    return total
@@ -3,6 +3,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from models.db import db
 from models.user import User
 from controllers.jwt_utils import generate_jwt
+from controllers import stats
 
 def register_user():
     data = request.get_json()
@@ -21,6 +22,8 @@ def register_user():
     password_hash = generate_password_hash(password)
     user = User(username=username, email=email, password_hash=password_hash, role=role) 
     db.session.add(user)
+    db.session.flush()
+    stats.create_user_stats([user.id])
     db.session.commit()
     return jsonify({'message': 'User registered successfully'}), 201
 
@@ -1,14 +1,63 @@
-from flask import request, jsonify
+from datetime import datetime
+from flask import request, jsonify, make_response
+from sqlalchemy import update
 from models.db import db
 from models.board_column import BoardColumn
+from models.item import Item
+from models.project import Project
 from controllers.rbac import require_project_permission
+from controllers.reporting import member_directory
+from controllers.item_controller import item_summary, place_between, log_activity
+from controllers.changes import next_change_seq
+from controllers import ranking
 
 @require_project_permission('view_tasks')
 def get_columns(project_id):
-    columns = BoardColumn.query.filter_by(project_id=project_id).order_by(BoardColumn.order.asc()).all()
-    result = [{'id': c.id, 'name': c.name, 'order': c.order} for c in columns]
+    columns = BoardColumn.query.filter_by(project_id=project_id).order_by(BoardColumn.rank.asc(), BoardColumn.id.asc()).all()
+    result = [{'id': c.id, 'name': c.name, 'order': c.order, 'rank': c.rank} for c in columns]
     return jsonify({'columns': result})
 
+@require_project_permission('view_tasks')
+def get_board(project_id):
+    """Columns with their cards plus the member directory, in four queries.
+
+    The ETag is the project's change_seq, which every item, column and
+    membership write bumps, so a matching If-None-Match is answered from the
+    project row alone.
+    """
+    # Read the version before the data: a write racing the snapshot only makes the tag older
+    project = db.session.query(Project.id, Project.name, Project.change_seq).filter(Project.id == project_id).first()
+    if not project:
+        return jsonify({'error': 'Project not found'}), 404
+    etag = f'board-{project.id}-{project.change_seq}'
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        columns = BoardColumn.query.filter_by(project_id=project_id).order_by(BoardColumn.rank.asc(), BoardColumn.id.asc()).all()
+        cards = {c.id: [] for c in columns}
+        items = db.session.query(
+            Item.id, Item.title, Item.status, Item.assignee_id, Item.priority,
+            Item.due_date, Item.parent_id, Item.type, Item.column_id, Item.rank
+        ).filter(Item.project_id == project_id).order_by(Item.column_id, Item.rank, Item.id)
+        for i in items:
+            if i.column_id in cards:
+                cards[i.column_id].append(item_summary(i))
+        response = jsonify({
+            'project': {'id': project.id, 'name': project.name},
+            'columns': [{'id': c.id, 'name': c.name, 'order': c.order, 'rank': c.rank, 'items': cards[c.id]} for c in columns],
+            'members': [{
+                'user_id': m.id,
+                'username': m.username,
+                'email': m.email,
+                'role': m.role,
+                'user_role': m.user_role
+            } for m in member_directory(project_id)]
+        })
+    response.set_etag(etag)
+    # Cards depend on the caller's access, so only the browser may keep a copy, and must revalidate
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 @require_project_permission('manage_project')
 def create_column(project_id):
     data = request.get_json()
@@ -19,7 +68,7 @@ def create_column(project_id):
     column = BoardColumn(name=name, order=order, project_id=project_id)
     db.session.add(column)
     db.session.commit()
-    return jsonify({'message': 'Column created', 'column': {'id': column.id, 'name': column.name}}), 201
+    return jsonify({'message': 'Column created', 'column': {'id': column.id, 'name': column.name, 'rank': column.rank}}), 201
 
 @require_project_permission('manage_project')
 def update_column(column_id):
@@ -34,11 +83,54 @@ def update_column(column_id):
     db.session.commit()
     return jsonify({'message': 'Column updated'})
 
+@require_project_permission('manage_project')
+def move_column(column_id):
+    """Put a column between two neighbours; only the moved row is written."""
+    column = BoardColumn.query.get(column_id)
+    if not column:
+        return jsonify({'error': 'Column not found'}), 404
+    data = request.get_json(silent=True) or {}
+    project_id = column.project_id
+    rank, error = place_between(
+        BoardColumn, BoardColumn.project_id == project_id, data.get('before_id'), data.get('after_id'), column.id,
+        lambda: ranking.rebalance_columns(project_id)
+    )
+    if error:
+        return jsonify({'error': error}), 400
+    column.rank = rank
+    db.session.commit()
+    return jsonify({'message': 'Column moved', 'column': {'id': column_id, 'rank': rank}})
+
 @require_project_permission('manage_project')
 def delete_column(column_id):
+    """Delete a column; its cards, if any, go to the end of the column named by move_to."""
     column = BoardColumn.query.get(column_id)
     if not column:
         return jsonify({'error': 'Column not found'}), 404
+    data = request.get_json(silent=True) or {}
+    move_to = data.get('move_to', request.args.get('move_to', type=int))
+    moving = [i for (i,) in db.session.query(Item.id).filter(Item.column_id == column_id).order_by(Item.rank, Item.id)]
+    if moving:
+        if move_to is None:
+            return jsonify({'error': 'Column has items; give move_to to move them to another column', 'items': len(moving)}), 409
+        if not isinstance(move_to, int) or isinstance(move_to, bool):
+            return jsonify({'error': "'move_to' must be a column id"}), 400
+        target = db.session.query(BoardColumn.id).filter(
+            BoardColumn.id == move_to, BoardColumn.project_id == column.project_id, BoardColumn.id != column_id
+        ).first()
+        if not target:
+            return jsonify({'error': f'Column not found: {move_to}'}), 404
+        # Respace the target once with the moved cards appended, in one executemany
+        kept = [i for (i,) in db.session.query(Item.id).filter(Item.column_id == move_to).order_by(Item.rank, Item.id)]
+        seq = next_change_seq(db.session.connection(), column.project_id)
+        now = datetime.utcnow()
+        db.session.execute(update(Item), [
+            {'id': item_id, 'column_id': move_to, 'rank': rank, 'change_seq': seq, 'updated_at': now}
+            for item_id, rank in zip(kept + moving, ranking.spread_ranks(len(kept) + len(moving)))
+        ])
+        user_id = request.user.id
+        for item_id in moving:
+            log_activity(item_id, user_id, 'updated', {'column_id': [column_id, move_to]})
     db.session.delete(column)
     db.session.commit()
-    return jsonify({'message': 'Column deleted'})
\ No newline at end of file
+    return jsonify({'message': 'Column deleted', 'moved': len(moving)})
\ No newline at end of file
@@ -0,0 +1,56 @@
+from sqlalchemy import event, update
+from models.db import db
+from models.item import Item
+from models.item_tombstone import ItemTombstone
+from models.project import Project
+from models.board_column import BoardColumn
+from models.project_member import ProjectMember
+
+# Every flush that creates, modifies or deletes items bumps the owning
+# project's change_seq once and stamps the touched items (or their
+# tombstones) with it. The UPDATE holds the project row lock until commit,
+# so sequence order matches commit order and '?since=' never skips a write.
+# Column and membership changes bump it too: it doubles as the board version.
+BOARD_MODELS = (BoardColumn, ProjectMember)
+
+def next_change_seq(connection, project_id):
+    return connection.execute(
+        update(Project.__table__)
+        .where(Project.__table__.c.id == project_id)
+        .values(change_seq=Project.__table__.c.change_seq + 1)
+        .returning(Project.__table__.c.change_seq)
+    ).scalar()
+
+@event.listens_for(db.session, 'before_flush')
+def _stamp_item_changes(session, flush_context, instances):
+    deleted_projects = {p.id for p in session.deleted if isinstance(p, Project)}
+    touched = {}
+    for obj in session.new:
+        if isinstance(obj, Item) and obj.project_id is not None:
+            touched.setdefault(obj.project_id, []).append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Item) and session.is_modified(obj, include_collections=False):
+            touched.setdefault(obj.project_id, []).append(obj)
+    removed = {}
+    for obj in session.deleted:
+        if isinstance(obj, Item) and obj.project_id not in deleted_projects:
+            removed.setdefault(obj.project_id, []).append(obj)
+    board = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, BOARD_MODELS) and obj.project_id not in deleted_projects:
+            board.add(obj.project_id)
+    for obj in session.dirty:
+        if isinstance(obj, BOARD_MODELS) and session.is_modified(obj, include_collections=False):
+            board.add(obj.project_id)
+    board.discard(None)
+    if not touched and not removed and not board:
+        return
+    connection = session.connection()
+    for project_id in set(touched) | set(removed) | board:
+        seq = next_change_seq(connection, project_id)
+        if seq is None:
+            continue
+        for item in touched.get(project_id, []):
+            item.change_seq = seq
+        for item in removed.get(project_id, []):
+            session.merge(ItemTombstone(item_id=item.id, project_id=project_id, change_seq=seq))
@@ -0,0 +1,168 @@
+import logging
+import queue
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, insert, select, update
+from models.db import db
+from models.item import Item
+from models.comment import Comment
+from models.activity_log import ActivityLog, ActivitySegmentItem
+from models.item_tombstone import ItemTombstone
+from models.item_rollup import ItemRollup
+from models.board_column import BoardColumn
+from models.project import Project
+from models.project_member import ProjectMember, ProjectJoinRequest
+from models.project_team import ProjectTeam
+from models.role import Role
+from models.permission import Permission
+from models.stats import ProjectStats
+from controllers.changes import next_change_seq
+from controllers.hierarchy import invalidate_rollups
+from controllers.rbac import invalidate_permissions
+from controllers import stats
+
+logger = logging.getLogger(__name__)
+
+# Deletes are set-based: rows are never loaded into the session to be removed
+# one by one. The foreign keys say ON DELETE CASCADE (SET NULL for subtasks),
+# so on PostgreSQL removing a project or an item takes its dependents along.
+# SQLite honours that only under PRAGMA foreign_keys=ON, which the app leaves
+# off because batch migrations rebuild tables by dropping them; there the same
+# dependents are removed with explicit bulk DELETEs first.
+#
+# A project with more than INLINE_PROJECT_ITEMS items is soft-deleted instead:
+# deleted_at is set and its memberships go, so nobody can reach it any more,
+# and the rows are purged PURGE_BATCH_SIZE items per transaction by a
+# background worker (or 'flask purge-projects' after a restart).
+INLINE_PROJECT_ITEMS = 1000
+PURGE_BATCH_SIZE = 2000
+
+def _bulk_delete(model, *criteria):
+    result = db.session.execute(delete(model).where(*criteria), execution_options={'synchronize_session': False})
+    return result.rowcount
+
+def cascades_enforced():
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        return bool(connection.exec_driver_sql('PRAGMA foreign_keys').scalar())
+    return True
+
+def _delete_item_rows(ids):
+    if not cascades_enforced():
+        _bulk_delete(Comment, Comment.item_id.in_(ids))
+        _bulk_delete(ActivityLog, ActivityLog.item_id.in_(ids))
+        _bulk_delete(ItemRollup, ItemRollup.item_id.in_(ids))
+    # No foreign key (archived rows outlive their partition), so no cascade either;
+    # a reused id would otherwise inherit the old item's archived history
+    _bulk_delete(ActivitySegmentItem, ActivitySegmentItem.item_id.in_(ids))
+    return _bulk_delete(Item, Item.id.in_(ids))
+
+def delete_items(project_id, item_ids, seq=None):
+    """Delete items with their comments and activity, leaving tombstones for '?since=' readers.
+
+    Subtasks that are not deleted with their parent are detached, as the ORM
+    used to do. Counters and realtime events are left to the caller.
+    """
+    ids = list(item_ids)
+    if not ids:
+        return 0
+    if seq is None:
+        seq = next_change_seq(db.session.connection(), project_id)
+    invalidate_rollups(ids)
+    now = datetime.utcnow()
+    db.session.execute(
+        update(Item).where(Item.parent_id.in_(ids), Item.id.notin_(ids))
+        .values(parent_id=None, change_seq=seq, updated_at=now),
+        execution_options={'synchronize_session': False}
+    )
+    count = _delete_item_rows(ids)
+    # SQLite may hand a freed id out again, so an old tombstone can exist
+    _bulk_delete(ItemTombstone, ItemTombstone.item_id.in_(ids))
+    db.session.execute(insert(ItemTombstone), [
+        {'item_id': item_id, 'project_id': project_id, 'change_seq': seq, 'deleted_at': now} for item_id in ids
+    ])
+    return count
+
+def soft_delete_project(project_id):
+    """Hide a project from everyone: set deleted_at and drop its memberships, team links and join requests."""
+    member_ids = [u for (u,) in db.session.query(ProjectMember.user_id).filter(ProjectMember.project_id == project_id)]
+    db.session.execute(update(Project).where(Project.id == project_id).values(deleted_at=datetime.utcnow()))
+    for model in (ProjectMember, ProjectJoinRequest, ProjectTeam):
+        _bulk_delete(model, model.project_id == project_id)
+    for user_id in member_ids:
+        stats.project_membership_changed(user_id, -1)
+
+def _delete_project_row(project_id):
+    if not cascades_enforced():
+        _bulk_delete(Permission, Permission.role_id.in_(select(Role.id).where(Role.project_id == project_id)))
+        for model in (ProjectMember, ProjectJoinRequest, ProjectTeam, BoardColumn, ProjectStats, ItemTombstone):
+            _bulk_delete(model, model.project_id == project_id)
+        _bulk_delete(Role, Role.project_id == project_id)
+    _bulk_delete(Project, Project.id == project_id)
+
+def purge_project(project_id, batch_size=PURGE_BATCH_SIZE, progress=None):
+    """Delete a soft-deleted project batch_size items per transaction; returns the number of items deleted.
+
+    The project row, and everything else hanging off it, goes with the last batch.
+    """
+    total = 0
+    while True:
+        rows = db.session.query(Item.id, Item.status, Item.reporter_id, Item.assignee_id).filter(
+            Item.project_id == project_id
+        ).limit(batch_size).all()
+        if rows:
+            _delete_item_rows([r.id for r in rows])
+            # Only the users' task counters matter; the project's row goes with the project
+            counters = stats.StatsBatch(None)
+            for r in rows:
+                counters.item_removed(r.status, r.reporter_id, r.assignee_id)
+            counters.apply()
+            total += len(rows)
+        last = len(rows) < batch_size
+        if last:
+            _delete_project_row(project_id)
+        db.session.commit()
+        if progress:
+            progress(total)
+        if last:
+            # Requests made while it was hidden cached 'no access'; a reused id must not inherit that
+            invalidate_permissions(project_id=project_id)
+            return total
+
+def pending_purges():
+    """Ids of soft-deleted projects still waiting to be purged."""
+    return [p for (p,) in db.session.query(Project.id).filter(Project.deleted_at.isnot(None)).order_by(Project.deleted_at)]
+
+def purge_pending_projects(batch_size=PURGE_BATCH_SIZE, progress=None):
+    total = 0
+    for project_id in pending_purges():
+        total += purge_project(project_id, batch_size, progress=(lambda n, p=project_id: progress(p, n)) if progress else None)
+    return total
+
+# Background purging: delete_project queues large projects here
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+def schedule_purge(project_id):
+    global _worker
+    app = current_app._get_current_object()
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_drain, args=(app,), name='project-purger', daemon=True)
+            _worker.start()
+    _queue.put(project_id)
+
+def _drain(app):
+    while True:
+        project_id = _queue.get()
+        with app.app_context():
+            try:
+                total = purge_project(project_id, progress=lambda n: logger.info('Project %s: %d items purged', project_id, n))
+                logger.info('Project %s purged (%d items)', project_id, total)
+            except Exception:
+                logger.exception('Failed to purge project %s; flask purge-projects will retry', project_id)
+                db.session.rollback()
+            finally:
+                db.session.remove()
@@ -0,0 +1,294 @@
+from datetime import datetime
+from sqlalchemy import delete, event, exists, func, inspect, literal, select
+from sqlalchemy.orm import aliased
+from models.db import db, dialect_insert
+from models.item import Item
+from models.item_rollup import ItemRollup
+from controllers.serializers import TreeNodeSchema
+
+# Epics, stories and subtasks form a tree through Item.parent_id. A subtree is
+# read with one recursive CTE. Every item with children keeps an item_rollup
+# row: done/total leaves, story points over the leaves, and the due-date range
+# of the whole subtree. Any write to an item's status, due date, story points or
+# parent marks it and its ancestors, and just before the transaction commits
+# only those rows are recomputed, bottom-up, from their direct children and the
+# children's stored rows. Readers never write and trust a stored row. A row
+# that is missing (data loaded around the write path) is computed in memory on
+# read and stored by the next write to its chain or 'flask refresh-rollups'.
+DEFAULT_TREE_DEPTH = 3
+MAX_TREE_DEPTH = 10
+ROLLUP_FIELDS = ('status', 'due_date', 'story_points', 'parent_id')
+PENDING_ROLLUPS_KEY = 'pending_rollups'
+ROLLUP_VALUES = (
+    'leaves_total', 'leaves_done', 'story_points', 'story_points_done', 'earliest_due_date', 'latest_due_date'
+)
+NODE_COLUMNS = TreeNodeSchema.columns(TreeNodeSchema.fields)
+ROLLUP_COLUMNS = (
+    ItemRollup.leaves_total, ItemRollup.leaves_done, ItemRollup.story_points.label('rollup_points'),
+    ItemRollup.story_points_done, ItemRollup.earliest_due_date, ItemRollup.latest_due_date, ItemRollup.computed_at
+)
+
+def _ancestor_chain(item_ids):
+    up = select(Item.id, Item.parent_id).where(Item.id.in_(item_ids)).cte('ancestors', recursive=True)
+    parent = aliased(Item)
+    # UNION rather than UNION ALL: a parent_id cycle ends the recursion instead of looping
+    return up.union(select(parent.id, parent.parent_id).join(up, parent.id == up.c.parent_id))
+
+def ancestors(item_ids):
+    """SELECT of the given ids and the ids of all their ancestors."""
+    return select(_ancestor_chain(item_ids).c.id)
+
+def parent_links(item_ids):
+    """{id: parent_id} for the given items and all their ancestors, in one query."""
+    chain = _ancestor_chain(item_ids)
+    return dict(db.session.execute(select(chain.c.id, chain.c.parent_id)).tuples().all())
+
+def is_ancestor(item_id, of_id):
+    """Whether item_id is of_id or one of its ancestors."""
+    return item_id in set(db.session.scalars(ancestors([of_id])))
+
+def creates_cycle(item_id, parent_id, links):
+    """Whether putting item_id under parent_id closes a loop, given {id: parent_id} links from parent_links."""
+    seen = set()
+    while parent_id is not None and parent_id not in seen:
+        if parent_id == item_id:
+            return True
+        seen.add(parent_id)
+        parent_id = links.get(parent_id)
+    return False
+
+def invalidate_rollups(item_ids, connection=None):
+    """Mark the rollups of the given items and their ancestors stale; run it before changing the rows.
+
+    The chain is read now, so an item that is about to move still marks its
+    old ancestors. The marked rows are recomputed when the session commits.
+    """
+    ids = {i for i in item_ids if i is not None}
+    if ids:
+        chain = _ancestor_chain(ids)
+        stale = (connection or db.session).execute(select(chain.c.id)).scalars()
+        db.session().info.setdefault(PENDING_ROLLUPS_KEY, set()).update(stale)
+
+@event.listens_for(db.session, 'before_flush')
+def _invalidate_on_flush(session, flush_context, instances):
+    seeds = set()
+    for obj in session.new:
+        if isinstance(obj, Item):
+            seeds.add(obj.parent_id)
+    for obj in session.dirty:
+        if isinstance(obj, Item):
+            attrs = inspect(obj).attrs
+            if any(getattr(attrs, field).history.has_changes() for field in ROLLUP_FIELDS):
+                # The row still has its old parent_id, so obj.id walks the old chain
+                seeds.update((obj.id, obj.parent_id))
+    for obj in session.deleted:
+        if isinstance(obj, Item):
+            seeds.add(obj.id)
+    seeds.discard(None)
+    if seeds:
+        invalidate_rollups(seeds, session.connection())
+
+@event.listens_for(db.session, 'before_commit')
+def _refresh_on_commit(session):
+    if not session.info.get(PENDING_ROLLUPS_KEY):
+        return
+    # Pending item changes may mark more rows
+    session.flush()
+    refresh_chain(session.info.pop(PENDING_ROLLUPS_KEY, ()))
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_pending_rollups(session, previous_transaction):
+    session.info.pop(PENDING_ROLLUPS_KEY, None)
+
+def tree_rows(root_id, depth):
+    """root_id and its descendants down to depth levels, with child counts and cached rollups."""
+    tree = select(Item.id, literal(0).label('depth')).where(Item.id == root_id).cte('tree', recursive=True)
+    child = aliased(Item)
+    tree = tree.union_all(
+        select(child.id, tree.c.depth + 1).join(tree, child.parent_id == tree.c.id).where(tree.c.depth < depth)
+    )
+    grandchild = aliased(Item)
+    child_count = select(func.count(grandchild.id)).where(grandchild.parent_id == Item.id).scalar_subquery()
+    return db.session.execute(
+        select(*NODE_COLUMNS, tree.c.depth, child_count.label('child_count'), *ROLLUP_COLUMNS)
+        .join(tree, tree.c.id == Item.id)
+        .outerjoin(ItemRollup, ItemRollup.item_id == Item.id)
+        .order_by(tree.c.depth, Item.rank, Item.id)
+    ).all()
+
+def _leaf_rollup(status, story_points, due_date):
+    done = status == 'done'
+    points = story_points or 0
+    return {
+        'leaves_total': 1, 'leaves_done': int(done), 'story_points': points, 'story_points_done': points if done else 0,
+        'earliest_due_date': due_date, 'latest_due_date': due_date
+    }
+
+def _combine(due_date, kids):
+    """Rollup of a node from its own due date and its children's rollups."""
+    dues = [d for d in [due_date] + [k['earliest_due_date'] for k in kids] + [k['latest_due_date'] for k in kids] if d]
+    return {
+        'leaves_total': sum(k['leaves_total'] for k in kids),
+        'leaves_done': sum(k['leaves_done'] for k in kids),
+        'story_points': sum(k['story_points'] for k in kids),
+        'story_points_done': sum(k['story_points_done'] for k in kids),
+        'earliest_due_date': min(dues, default=None),
+        'latest_due_date': max(dues, default=None),
+    }
+
+def compute_rollups(root_id):
+    """Rollups for root_id and every descendant that has children, from one recursive CTE."""
+    sub = select(Item.id, Item.parent_id, Item.status, Item.story_points, Item.due_date).where(
+        Item.id == root_id
+    ).cte('subtree', recursive=True)
+    child = aliased(Item)
+    sub = sub.union(
+        select(child.id, child.parent_id, child.status, child.story_points, child.due_date).join(sub, child.parent_id == sub.c.id)
+    )
+    rows = {r.id: r for r in db.session.execute(select(sub)).all()}
+    if root_id not in rows:
+        return {}
+    children = {}
+    for r in rows.values():
+        if r.id != root_id and r.parent_id in rows:
+            children.setdefault(r.parent_id, []).append(r.id)
+
+    rollups, order, stack, seen = {}, [], [root_id], set()
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        order.append(node)
+        stack.extend(children.get(node, ()))
+    for node in reversed(order):
+        r = rows[node]
+        kids = [rollups[k] for k in children.get(node, ()) if k in rollups]
+        if not kids:
+            rollups[node] = _leaf_rollup(r.status, r.story_points, r.due_date)
+            continue
+        rollups[node] = _combine(r.due_date, kids)
+    return {node: rollups[node] for node in rollups if children.get(node)}
+
+def _store(rollups):
+    if rollups:
+        now = datetime.utcnow()
+        insert = dialect_insert(ItemRollup)
+        db.session.execute(
+            insert.on_conflict_do_update(
+                index_elements=[ItemRollup.item_id],
+                set_={c: insert.excluded[c] for c in ROLLUP_VALUES + ('computed_at',)}
+            ),
+            [dict(values, item_id=item_id, computed_at=now) for item_id, values in rollups.items()]
+        )
+
+def refresh_rollups(root_id):
+    """Recompute and store the rollups of root_id's whole subtree in one upsert, in the caller's transaction; returns them."""
+    rollups = compute_rollups(root_id)
+    _store(rollups)
+    return rollups
+
+def refresh_chain(item_ids):
+    """Recompute and store the rollups of the given items and their ancestors only, deepest first; returns them.
+
+    Each node is rebuilt from its direct children: a child outside the chain
+    contributes its stored row, or its own values if it is a leaf. Nodes left
+    without children lose their row.
+    """
+    links = parent_links(list(item_ids)) if item_ids else {}
+    if not links:
+        return {}
+    depth = {}
+    for item_id in links:
+        seen, node = set(), item_id
+        while node in links and node not in seen:
+            seen.add(node)
+            node = links[node]
+        depth[item_id] = len(seen)
+    own_due = dict(db.session.query(Item.id, Item.due_date).filter(Item.id.in_(list(links))))
+    grandchild = aliased(Item)
+    has_children = exists().where(grandchild.parent_id == Item.id)
+    children = {}
+    for r in db.session.execute(
+        select(Item.id, Item.parent_id, Item.status, Item.story_points, Item.due_date, has_children.label('has_children'),
+               *ROLLUP_COLUMNS)
+        .outerjoin(ItemRollup, ItemRollup.item_id == Item.id)
+        .where(Item.parent_id.in_(list(links)))
+    ):
+        children.setdefault(r.parent_id, []).append(r)
+
+    rollups, missing = {}, {}
+    for node in sorted(links, key=depth.get, reverse=True):
+        kids = []
+        for r in children.get(node, ()):
+            if r.id in rollups:
+                kids.append(rollups[r.id])
+            elif not r.has_children:
+                kids.append(_leaf_rollup(r.status, r.story_points, r.due_date))
+            elif r.computed_at is not None:
+                kids.append(_cached_rollup(r))
+            else:
+                # A child subtree with no stored row: rebuild it whole, once
+                missing.update(compute_rollups(r.id))
+                kids.append(missing[r.id])
+        if kids:
+            rollups[node] = _combine(own_due.get(node), kids)
+    _store({**missing, **rollups})
+    leaves = [item_id for item_id in links if item_id not in rollups]
+    if leaves:
+        db.session.execute(delete(ItemRollup).where(ItemRollup.item_id.in_(leaves)))
+    return rollups
+
+def refresh_missing_rollups(batch_size=1000):
+    """Store the rollups of items that have children but no row, batch_size per transaction; returns how many."""
+    total = 0
+    child = aliased(Item)
+    while True:
+        ids = db.session.scalars(
+            select(Item.id).where(exists().where(child.parent_id == Item.id))
+            .where(~exists().where(ItemRollup.item_id == Item.id)).limit(batch_size)
+        ).all()
+        if not ids:
+            return total
+        refresh_chain(ids)
+        db.session.commit()
+        total += len(ids)
+
+def _cached_rollup(row):
+    return {
+        'leaves_total': row.leaves_total, 'leaves_done': row.leaves_done,
+        'story_points': row.rollup_points, 'story_points_done': row.story_points_done,
+        'earliest_due_date': row.earliest_due_date, 'latest_due_date': row.latest_due_date
+    }
+
+def _rollup_summary(rollup):
+    return dict(rollup,
+        earliest_due_date=rollup['earliest_due_date'].isoformat() if rollup['earliest_due_date'] else None,
+        latest_due_date=rollup['latest_due_date'].isoformat() if rollup['latest_due_date'] else None
+    )
+
+def item_tree(root_id, depth=DEFAULT_TREE_DEPTH):
+    """The nested tree under root_id to depth levels, every node with its rollup; None if no such item.
+
+    Nodes below the depth limit are left out; their parent shows them in child_count.
+    """
+    rows = tree_rows(root_id, depth)
+    if not rows:
+        return None
+    fresh = {}
+    if any(r.child_count and r.computed_at is None for r in rows):
+        fresh = compute_rollups(root_id)
+    nodes = {}
+    for r in rows:
+        if r.id in nodes:
+            continue  # reached twice through a parent_id cycle
+        if not r.child_count:
+            rollup = _leaf_rollup(r.status, r.story_points, r.due_date)
+        elif r.computed_at is not None:
+            rollup = _cached_rollup(r)
+        else:
+            rollup = fresh.get(r.id) or _leaf_rollup(r.status, r.story_points, r.due_date)
+        nodes[r.id] = dict(TreeNodeSchema.dump(r), rollup=_rollup_summary(rollup), children=[])
+        if r.depth and r.parent_id in nodes:
+            nodes[r.parent_id]['children'].append(nodes[r.id])
+    return nodes[root_id]
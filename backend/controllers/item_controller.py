@@ -3,24 +3,109 @@ from flask import request, jsonify
 from models.db import db
 from models.item import Item
 from models.project import Project
+from models.board_column import BoardColumn
 from models.user import User
 from models.activity_log import ActivityLog
+from controllers.activity import item_activity
 from datetime import datetime
-from controllers.rbac import require_project_permission
+from types import SimpleNamespace
+from controllers.rbac import require_project_permission, get_permissions, can_modify_item
 from models.comment import Comment
-from sqlalchemy.orm import joinedload
+from models.permission import mask_has
+from sqlalchemy import func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Bundle, aliased
 from controllers.notification_controller import create_notification
+from controllers import stats
+from controllers.side_effects import record_activity
+from controllers.realtime import publish_project
+from controllers import changes  # registers the item change_seq hook
+from controllers import ranking  # registers the rank assignment hook
+from controllers import deletion
+from controllers import hierarchy  # registers the rollup invalidation hook
+from models.item_tombstone import ItemTombstone
+from controllers.pagination import wants_cursor, parse_page_args, keyset_page, InvalidPageRequest
+from controllers.serializers import (
+    ActivitySchema, CommentSchema, InvalidFields, ItemDetailSchema, ItemSchema, SubtaskSchema
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def log_activity(item_id, user_id, action, details=None):
+ITEM_SORTS = {'id': Item.id, 'created_at': Item.created_at, 'updated_at': Item.updated_at, 'rank': Item.rank}
+ITEM_STATUSES = {'todo', 'inprogress', 'done', 'inreview'}
+ITEM_TYPES = {'task', 'bug', 'epic', 'feature', 'story'}
+ITEM_PRIORITIES = {'Low', 'Medium', 'High', 'Critical', None}
+MAX_TITLE_LENGTH = 120
+# Default ?fields= for item lists (same keys as item_summary) and for my-tasks
+ITEM_LIST_FIELDS = ('id', 'title', 'status', 'assignee_id', 'priority', 'due_date', 'parent_id', 'type', 'column_id', 'rank')
+MY_TASK_FIELDS = ('id', 'title', 'description', 'status', 'type', 'priority', 'due_date', 'project_id', 'assignee_id', 'reporter_id', 'created_at', 'updated_at')
+# Fields a client may set directly on create or update (due_date is parsed separately)
+ITEM_FIELDS = ('title', 'description', 'status', 'assignee_id', 'column_id', 'priority', 'parent_id', 'type', 'severity', 'story_points')
+ACTIVITY_SORTS = {'id': ActivityLog.id, 'created_at': ActivityLog.created_at}
+ITEM_ACTIVITY_FIELDS = ('id', 'user_id', 'action', 'changes', 'details', 'created_at')
+DELETE_ITEM_COLUMNS = (Item.id, Item.project_id, Item.status, Item.reporter_id, Item.assignee_id, Item.parent_id)
+
+def include_total():
+    return request.args.get('include_total', '').lower() in ('1', 'true')
+
+def project_references(project_id, written):
+    """{'column': ids, 'item': ids} of the columns and parents named in written that belong to the project."""
+    column_refs = {f['column_id'] for f in written if isinstance(f.get('column_id'), int)}
+    parent_refs = {f['parent_id'] for f in written if isinstance(f.get('parent_id'), int)}
+    in_project = {'column': set(), 'item': set()}
+    if column_refs or parent_refs:
+        for kind, ref_id in db.session.execute(union_all(
+            select(literal('column'), BoardColumn.id).where(BoardColumn.project_id == project_id, BoardColumn.id.in_(column_refs)),
+            select(literal('item'), Item.id).where(Item.project_id == project_id, Item.id.in_(parent_refs))
+        )):
+            in_project[kind].add(ref_id)
+    return in_project
+
+def reference_error(fields, in_project):
+    """Error for a column_id or parent_id outside the project, or None; in_project comes from project_references."""
+    if 'column_id' in fields and fields['column_id'] not in in_project['column']:
+        return f'Invalid column_id: {fields["column_id"]}'
+    if fields.get('parent_id') is not None and fields['parent_id'] not in in_project['item']:
+        return f'Invalid parent_id: {fields["parent_id"]}'
+    return None
+
+def validate_item_fields(data, creating=False):
+    """Return an error message for invalid item fields, or None.
+
+    On create, missing status/type fall back to their defaults; on update only
+    the fields present are checked.
+    """
+    if creating and (not data.get('title') or not data.get('column_id')):
+        return 'Title and column_id required'
+    if 'title' in data:
+        if not data['title']:
+            return 'Title required'
+        if len(data['title']) > MAX_TITLE_LENGTH:
+            return f'Title too long (max {MAX_TITLE_LENGTH} chars)'
+    for field, allowed, default in (('status', ITEM_STATUSES, 'todo'), ('type', ITEM_TYPES, 'task'), ('priority', ITEM_PRIORITIES, None)):
+        if creating or field in data:
+            value = data.get(field, default)
+            if value not in allowed:
+                return f'Invalid {field}: {value}'
+    points = data.get('story_points')
+    if points is not None and (isinstance(points, bool) or not isinstance(points, int) or points < 0):
+        return f'Invalid story_points: {points}'
+    if data.get('due_date'):
+        try:
+            parse_due_date(data['due_date'])
+        except (TypeError, ValueError):
+            return f'Invalid due_date: {data["due_date"]}'
+    return None
+
+def parse_due_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+def log_activity(item_id, user_id, action, changes=None):
+    """changes: {field: [old, new]} with JSON-serializable values."""
     if item_id is None:
         logger.warning("Tried to log activity with null item_id. Skipping log entry.")
         return
-    log = ActivityLog(item_id=item_id, user_id=user_id, action=action, details=details)
-    db.session.add(log)
-    db.session.commit()
+    record_activity(item_id, user_id, action, changes)
 
 def get_recent_activity():
     user = getattr(request, 'user', None)
@@ -30,21 +115,14 @@ def get_recent_activity():
     logs = ActivityLog.query.join(Item, ActivityLog.item_id == Item.id)
     logs = logs.filter((Item.reporter_id == user_id) | (Item.assignee_id == user_id))
     logs = logs.order_by(ActivityLog.created_at.desc()).limit(20).all()
-    result = []
-    for log in logs:
-        result.append({
-            'id': log.id,
-            'item_id': log.item_id,
-            'user_id': log.user_id,
-            'action': log.action,
-            'details': log.details,
-            'created_at': log.created_at.isoformat()
-        })
-    return jsonify({'activity': result})
+    return jsonify({'activity': ActivitySchema.dump_all(logs)})
 
 @require_project_permission('create_task')
 def create_item(project_id):
     data = request.get_json()
+    error = validate_item_fields(data, creating=True) or reference_error(data, project_references(project_id, [data]))
+    if error:
+        return jsonify({'error': error}), 400
     title = data.get('title')
     description = data.get('description')
     type = data.get('type', 'task')
@@ -56,20 +134,7 @@ def create_item(project_id):
     priority = data.get('priority')
     parent_id = data.get('parent_id')
     severity = data.get('severity')
-    # --- Field validation ---
-    allowed_status = {'todo', 'inprogress', 'done', 'inreview'}
-    allowed_types = {'task', 'bug', 'epic', 'feature'}
-    allowed_priority = {'Low', 'Medium', 'High', 'Critical', None}
-    if not title or not column_id:
-        return jsonify({'error': 'Title and column_id required'}), 400
-    if len(title) > 120:
-        return jsonify({'error': 'Title too long (max 120 chars)'}), 400
-    if status not in allowed_status:
-        return jsonify({'error': f'Invalid status: {status}'}), 400
-    if type not in allowed_types:
-        return jsonify({'error': f'Invalid type: {type}'}), 400
-    if priority not in allowed_priority:
-        return jsonify({'error': f'Invalid priority: {priority}'}), 400
+    story_points = data.get('story_points')
     item = Item(
         title=title,
         description=description,
@@ -79,19 +144,23 @@ def create_item(project_id):
         project_id=project_id,
         reporter_id=reporter_id,
         assignee_id=assignee_id,
-        due_date=datetime.strptime(due_date, '%Y-%m-%d').date() if due_date else None,
+        due_date=parse_due_date(due_date),
         priority=priority,
         parent_id=parent_id,
-        severity=severity
+        severity=severity,
+        story_points=story_points
     )
     db.session.add(item)
-    db.session.commit()
-    log_activity(item.id, reporter_id, 'created', f'Task created: {title}')
+    stats.item_added(project_id, status, reporter_id, assignee_id)
+    db.session.flush()
+    log_activity(item.id, reporter_id, 'created', {'title': [None, title]})
     # Notify assignee if assigned (task creation)
     if assignee_id:
         assignee = User.query.get(assignee_id)
         if assignee:
             create_notification(assignee_id, f"You have been assigned to task '{title}'")
+    publish_project(project_id, 'item_created', item_summary(item))
+    db.session.commit()
     return jsonify({'message': 'Item created', 'item': {'id': item.id, 'title': item.title}}), 201
 
 @require_project_permission('view_tasks')
@@ -99,12 +168,67 @@ def get_items(project_id=None, **kwargs):
     item_type = request.args.get('type')
     limit = int(request.args.get('limit', 50))
     offset = int(request.args.get('offset', 0))
-    query = Item.query.filter_by(project_id=project_id)
+    criteria = [Item.project_id == project_id]
     if item_type:
-        query = query.filter_by(type=item_type)
-    total = query.count()
-    items = query.offset(offset).limit(limit).all()
-    result = [{
+        criteria.append(Item.type == item_type)
+    try:
+        fields = ItemSchema.requested(ITEM_LIST_FIELDS)
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    if wants_cursor():
+        try:
+            sort_key, descending, limit, cursor = parse_page_args(ITEM_SORTS)
+            query = db.session.query(*ItemSchema.columns(fields, 'id', sort_key)).filter(*criteria)
+            items, next_cursor = keyset_page(query, ITEM_SORTS, Item.id, sort_key, descending, limit, cursor)
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        response = {'items': ItemSchema.dump_all(items, fields), 'next_cursor': next_cursor, 'limit': limit}
+        if include_total():
+            response['total'] = db.session.query(func.count(Item.id)).filter(*criteria).scalar()
+        return jsonify(response)
+    total = db.session.query(func.count(Item.id)).filter(*criteria).scalar()
+    items = db.session.query(*ItemSchema.columns(fields)).filter(*criteria).offset(offset).limit(limit).all()
+    return jsonify({'items': ItemSchema.dump_all(items, fields), 'total': total, 'limit': limit, 'offset': offset})
+
+MAX_SYNC_CHANGES = 5000
+
+@require_project_permission('view_tasks')
+def get_project_changes(project_id):
+    """Items created, updated or deleted since the client's sync token.
+
+    Without a token (or when too much changed) the client is told to reset
+    and load the full list, then continue from next_token.
+    """
+    project = db.session.query(Project.id, Project.change_seq).filter(Project.id == project_id).first()
+    if not project:
+        return jsonify({'error': 'Project not found'}), 404
+    since = request.args.get('since')
+    if not since:
+        return jsonify({'reset': True, 'items': [], 'deleted': [], 'next_token': str(project.change_seq)})
+    try:
+        since = int(since)
+    except ValueError:
+        return jsonify({'error': 'Invalid sync token'}), 400
+    # Only return changes up to the sequence read above, so next_token never skips a concurrent write
+    upto = project.change_seq
+    items = Item.query.filter(
+        Item.project_id == project_id, Item.change_seq > since, Item.change_seq <= upto
+    ).order_by(Item.change_seq, Item.id).limit(MAX_SYNC_CHANGES + 1).all()
+    if len(items) > MAX_SYNC_CHANGES:
+        return jsonify({'reset': True, 'items': [], 'deleted': [], 'next_token': str(upto)})
+    live_ids = {i.id for i in items}
+    deleted = [t.item_id for t in db.session.query(ItemTombstone.item_id).filter(
+        ItemTombstone.project_id == project_id, ItemTombstone.change_seq > since, ItemTombstone.change_seq <= upto
+    ) if t.item_id not in live_ids]
+    return jsonify({
+        'reset': False,
+        'items': [item_summary(i) for i in items],
+        'deleted': deleted,
+        'next_token': str(upto)
+    })
+
+def item_summary(i):
+    return {
         'id': i.id,
         'title': i.title,
         'status': i.status,
@@ -112,74 +236,50 @@ def get_items(project_id=None, **kwargs):
         'priority': i.priority,
         'due_date': i.due_date.isoformat() if i.due_date else None,
         'parent_id': i.parent_id,
-        'type': i.type
-    } for i in items]
-    return jsonify({'items': result, 'total': total, 'limit': limit, 'offset': offset})
+        'type': i.type,
+        'column_id': i.column_id,
+        'rank': i.rank
+    }
+
+def load_item_detail(item_id):
+    """Load an item with its parent, subtasks, comments and referenced usernames in at most three queries."""
+    Assignee = aliased(User)
+    Reporter = aliased(User)
+    Parent = aliased(Item)
+    row = db.session.query(
+        Item,
+        Assignee.username.label('assignee_name'),
+        Reporter.username.label('reporter_name'),
+        Bundle('parent', *(getattr(Parent, name) for name in SubtaskSchema.fields))
+    ).outerjoin(Assignee, Assignee.id == Item.assignee_id
+    ).outerjoin(Reporter, Reporter.id == Item.reporter_id
+    ).outerjoin(Parent, Parent.id == Item.parent_id
+    ).filter(Item.id == item_id).first()
+    if not row:
+        return None
+    subtasks = db.session.query(
+        *SubtaskSchema.columns(SubtaskSchema.fields)
+    ).filter(Item.parent_id == item_id).order_by(Item.id).all()
+    comments = db.session.query(
+        *CommentSchema.columns(CommentSchema.fields), User.username.label('author_name')
+    ).outerjoin(User, User.id == Comment.user_id
+    ).filter(Comment.item_id == item_id).order_by(Comment.id).all()
+    return row, subtasks, comments
 
 @require_project_permission('view_tasks')
 def get_item(item_id):
-    item = Item.query.options(
-        joinedload(Item.comments),
-        joinedload(Item.subtasks)
-    ).get(item_id)
-    if not item:
+    detail = load_item_detail(item_id)
+    if not detail:
         return jsonify({'error': f'Item not found: {item_id}'}), 404
-    assignee = User.query.get(item.assignee_id) if item.assignee_id else None
-    reporter = User.query.get(item.reporter_id) if item.reporter_id else None
-    # Fetch comments
-    comments = []
-    for c in item.comments.all() if hasattr(item, 'comments') else []:
-        author = User.query.get(c.user_id) if c.user_id else None
-        comments.append({
-            'id': c.id,
-            'author_name': author.username if author else None,
-            'content': c.content,
-            'user_id': c.user_id,
-            'created_at': c.created_at.isoformat() if hasattr(c, 'created_at') and c.created_at else None
-        })
-    # Fetch subtasks (children)
-    subtasks = []
-    if hasattr(item, 'subtasks'):
-        for s in item.subtasks:
-            subtasks.append({
-                'id': s.id,
-                'title': s.title,
-                'status': s.status,
-                'priority': s.priority,
-                'due_date': s.due_date.isoformat() if s.due_date else None
-            })
-    # Fetch parent epic (if any)
-    parent_epic = None
-    if item.parent_id:
-        parent = Item.query.get(item.parent_id)
-        if parent:
-            parent_epic = {
-                'id': parent.id,
-                'title': parent.title,
-                'status': parent.status,
-                'priority': parent.priority,
-                'due_date': parent.due_date.isoformat() if parent.due_date else None
-            }
-    return jsonify({'item': {
-        'id': item.id,
-        'title': item.title,
-        'description': item.description,
-        'status': item.status,
-        'priority': item.priority,
-        'due_date': item.due_date.isoformat() if item.due_date else None,
-        'parent_id': item.parent_id,
-        'assignee_id': item.assignee_id,
-        'assignee_name': assignee.username if assignee else None,
-        'reporter_id': item.reporter_id,
-        'reporter_name': reporter.username if reporter else None,
-        'type': item.type,
-        'column_id': item.column_id,
-        'created_at': item.created_at.isoformat() if item.created_at else None,
-        'updated_at': item.updated_at.isoformat() if item.updated_at else None,
-        'comments': comments,
-        'subtasks': subtasks,
-        'parent_epic': parent_epic
-    }})
+    row, subtask_rows, comment_rows = detail
+    return jsonify({'item': dict(
+        ItemDetailSchema.dump(row.Item),
+        assignee_name=row.assignee_name,
+        reporter_name=row.reporter_name,
+        comments=CommentSchema.dump_all(comment_rows),
+        subtasks=SubtaskSchema.dump_all(subtask_rows),
+        parent_epic=SubtaskSchema.dump(row.parent) if row.parent.id is not None else None
+    )})
 
 @require_project_permission('edit_any_task', allow_own='edit_own_task')
 def update_item(item_id):
@@ -187,75 +287,344 @@ def update_item(item_id):
     if not item:
         return jsonify({'error': f'Item not found: {item_id}'}), 404
     data = request.get_json()
-    changes = []
-    allowed_status = {'todo', 'inprogress', 'done', 'inreview'}
-    allowed_types = {'task', 'bug', 'epic', 'story'}
-    allowed_priority = {'Low', 'Medium', 'High', 'Critical', None}
-    for field in ['title', 'description', 'status', 'assignee_id', 'column_id', 'priority', 'parent_id', 'type', 'severity']:
+    error = validate_item_fields(data) or reference_error(data, project_references(item.project_id, [data]))
+    if error:
+        return jsonify({'error': error}), 400
+    if data.get('parent_id') is not None and data['parent_id'] != item.parent_id and hierarchy.is_ancestor(item.id, data['parent_id']):
+        return jsonify({'error': 'An item cannot be moved under itself or its own subtasks'}), 400
+    diff = {}
+    old_status = item.status
+    old_assignee = item.assignee_id
+    for field in ITEM_FIELDS:
         if field in data:
-            if field == 'title' and len(data['title']) > 120:
-                return jsonify({'error': 'Title too long (max 120 chars)'}), 400
-            if field == 'status' and data['status'] not in allowed_status:
-                return jsonify({'error': f'Invalid status: {data["status"]}'}), 400
-            if field == 'type' and data['type'] not in allowed_types:
-                return jsonify({'error': f'Invalid type: {data["type"]}'}), 400
-            if field == 'priority' and data['priority'] not in allowed_priority:
-                return jsonify({'error': f'Invalid priority: {data["priority"]}'}), 400
             old = getattr(item, field)
             new = data[field]
             if old != new:
-                changes.append(f'{field}: {old} -> {new}')
+                diff[field] = [old, new]
             setattr(item, field, new)
     if 'due_date' in data:
         old = item.due_date.isoformat() if item.due_date else None
         new = data['due_date']
         if old != new:
-            changes.append(f'due_date: {old} -> {new}')
-        item.due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date() if data['due_date'] else None
+            diff['due_date'] = [old, new]
+        item.due_date = parse_due_date(data['due_date'])
+    stats.item_changed(item.project_id, item.reporter_id, old_status, item.status, old_assignee, item.assignee_id)
+    if diff:
+        log_activity(item.id, getattr(request.user, 'id', None), 'updated', diff)
+    if 'assignee_id' in data and data['assignee_id'] != old_assignee:
+        new_assignee = data['assignee_id']
+        if new_assignee:
+            assignee_user = User.query.get(new_assignee)
+            if assignee_user:
+                create_notification(new_assignee, f"You have been assigned to task '{item.title}'")
+    db.session.flush()  # a column change picks up its new rank here
+    publish_project(item.project_id, 'item_updated', item_summary(item))
     db.session.commit()
-    if changes:
-        log_activity(item.id, getattr(request.user, 'id', None), 'updated', '; '.join(changes))
-    old_assignee = item.assignee_id
-    for field in ['title', 'description', 'status', 'assignee_id', 'column_id', 'priority', 'parent_id', 'type', 'severity']:
-        if field in data:
-            if field == 'assignee_id' and data['assignee_id'] != old_assignee:
-                new_assignee = data['assignee_id']
-                if new_assignee:
-                    assignee_user = User.query.get(new_assignee)
-                    if assignee_user:
-                        create_notification(new_assignee, f"You have been assigned to task '{item.title}'")
     return jsonify({'message': 'Item updated'})
 
+def place_between(model, scope, before_id, after_id, exclude_id, rebalance):
+    """Rank for a row going between the rows before_id and after_id within scope.
+
+    Returns (rank, error). With neither neighbour the row goes to the end. Ties
+    left behind by concurrent appends, or a key that has outgrown the column,
+    are resolved by respacing the scope once.
+    """
+    ids = [i for i in (before_id, after_id) if i is not None]
+    if exclude_id in ids:
+        return None, 'A row cannot be its own neighbour'
+    for attempt in range(2):
+        ranks = dict(db.session.query(model.id, model.rank).filter(scope, model.id.in_(ids))) if ids else {}
+        if any(i not in ranks for i in ids):
+            return None, 'Neighbour not found'
+        if not ids:
+            last = db.session.query(func.max(model.rank)).filter(scope, model.id != exclude_id).scalar()
+            return ranking.rank_between(last), None
+        try:
+            rank = ranking.rank_between(ranks.get(before_id), ranks.get(after_id))
+            if len(rank) > ranking.MAX_RANK_LENGTH:
+                raise ValueError('Rank key too long')
+            return rank, None
+        except ValueError:
+            if attempt:
+                return None, 'Neighbours are out of order'
+            rebalance()
+    return None, 'Neighbours are out of order'
+
+@require_project_permission('edit_any_task', allow_own='edit_own_task')
+def move_item(item_id):
+    """Put a card between two neighbours, optionally in another column.
+
+    before_id/after_id name the cards that end up directly above and below it;
+    give one of them at either end of the column, or neither to append. Only
+    the moved row is written.
+    """
+    item = Item.query.get(item_id)
+    if not item:
+        return jsonify({'error': f'Item not found: {item_id}'}), 404
+    data = request.get_json(silent=True) or {}
+    column_id = data.get('column_id', item.column_id)
+    if column_id != item.column_id and not db.session.query(BoardColumn.id).filter(
+        BoardColumn.id == column_id, BoardColumn.project_id == item.project_id
+    ).first():
+        return jsonify({'error': f'Column not found: {column_id}'}), 404
+    rank, error = place_between(
+        Item, Item.column_id == column_id, data.get('before_id'), data.get('after_id'), item.id,
+        lambda: ranking.rebalance_column(column_id)
+    )
+    if error:
+        return jsonify({'error': error}), 400
+    old_column = item.column_id
+    item.rank = rank
+    item.column_id = column_id
+    if column_id != old_column:
+        log_activity(item.id, getattr(request.user, 'id', None), 'updated', {'column_id': [old_column, column_id]})
+    db.session.flush()
+    summary = item_summary(item)
+    publish_project(item.project_id, 'item_updated', summary)
+    db.session.commit()
+    if len(rank) > ranking.REBALANCE_RANK_LENGTH:
+        ranking.schedule_rebalance(column_id)
+    return jsonify({'message': 'Item moved', 'item': summary})
+
 @require_project_permission('delete_any_task', allow_own='delete_own_task')
 def delete_item(item_id):
-    item = Item.query.get(item_id)
+    item = db.session.query(*DELETE_ITEM_COLUMNS).filter(Item.id == item_id).first()
     if not item:
         return jsonify({'error': f'Item not found: {item_id}'}), 404
-    log_activity(item_id, getattr(request.user, 'id', None), 'deleted', 'Task deleted')
-    for log in item.activity_logs.all():
-        db.session.delete(log)
-    db.session.delete(item)
+    deletion.delete_items(item.project_id, [item.id])
+    stats.item_removed(item.project_id, item.status, item.reporter_id, item.assignee_id)
+    publish_project(item.project_id, 'item_deleted', {'id': item.id, 'parent_id': item.parent_id})
     db.session.commit()
     return jsonify({'message': 'Item deleted'})
 
+MAX_BATCH_OPERATIONS = 500
+BATCH_ITEM_COLUMNS = (Item.id, Item.reporter_id, Item.due_date, Item.rank) + tuple(getattr(Item, f) for f in ITEM_FIELDS)
+BATCH_OPS = {
+    'update': ('edit_any_task', 'edit_own_task'),
+    'delete': ('delete_any_task', 'delete_own_task'),
+}
+
+def _describe(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+@require_project_permission('view_tasks')
+def batch_items(project_id):
+    """Apply a list of create/update/delete operations in one transaction.
+
+    Each operation is authorised and validated on its own and reports its own
+    status; a failed operation does not stop the others. Accepted writes go
+    out as one INSERT, one bulk UPDATE and one DELETE per table, with activity
+    logs and notifications written by executemany at commit.
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations list required'}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({'error': f'Too many operations (max {MAX_BATCH_OPERATIONS})'}), 400
+    user_id = request.user.id
+    mask = get_permissions(user_id, project_id)
+
+    # One query for every item the batch touches, one for the subtasks of those being deleted
+    target_ids = {op.get('id') for op in operations if isinstance(op, dict) and op.get('op') in BATCH_OPS}
+    target_ids = [i for i in target_ids if isinstance(i, int)]
+    originals = {row.id: row for row in db.session.query(*BATCH_ITEM_COLUMNS).filter(
+        Item.project_id == project_id, Item.id.in_(target_ids)
+    )} if target_ids else {}
+    current = {item_id: row._asdict() for item_id, row in originals.items()}
+    children = {}
+    delete_ids = [op['id'] for op in operations if isinstance(op, dict) and op.get('op') == 'delete' and op.get('id') in originals]
+    if delete_ids:
+        for child_id, parent_id in db.session.query(Item.id, Item.parent_id).filter(Item.parent_id.in_(delete_ids)):
+            children.setdefault(parent_id, set()).add(child_id)
+
+    # Columns and parents named by creates and updates must belong to this project; one query for both
+    written = [op.get('data') for op in operations if isinstance(op, dict) and op.get('op') in ('create', 'update')]
+    written = [fields for fields in written if isinstance(fields, dict)]
+    in_project = project_references(project_id, written)
+    parent_refs = {f['parent_id'] for f in written if isinstance(f.get('parent_id'), int)}
+    # Parent chains of every parent an update names, to refuse moves that would close a loop
+    links = hierarchy.parent_links(parent_refs) if parent_refs and target_ids else {}
+
+    results = []
+    allowed = {}
+    creates = []
+    updated = set()
+    deleted = {}
+    for index, op in enumerate(operations):
+        kind = op.get('op') if isinstance(op, dict) else None
+        result = {'index': index, 'op': kind}
+        results.append(result)
+        if kind == 'create':
+            fields = op.get('data') or {}
+            error = validate_item_fields(fields, creating=True) or reference_error(fields, in_project)
+            if not mask_has(mask, 'create_task'):
+                result.update(status=403, error="Forbidden: You lack 'create_task' permission.")
+            elif error:
+                result.update(status=400, error=error)
+            else:
+                row = {f: fields.get(f) for f in ITEM_FIELDS}
+                row.update(
+                    type=fields.get('type', 'task'),
+                    status=fields.get('status', 'todo'),
+                    due_date=parse_due_date(fields.get('due_date')),
+                    project_id=project_id,
+                    reporter_id=user_id
+                )
+                creates.append((result, row))
+            continue
+        if kind not in BATCH_OPS:
+            result.update(status=400, error=f'Invalid op: {kind}')
+            continue
+        item_id = op.get('id')
+        result['id'] = item_id
+        if item_id not in originals or item_id in deleted:
+            result.update(status=404, error=f'Item not found: {item_id}')
+            continue
+        action, own_action = BATCH_OPS[kind]
+        if (item_id, kind) not in allowed:
+            allowed[(item_id, kind)] = can_modify_item(mask, user_id, action, own_action, originals[item_id])
+        if not allowed[(item_id, kind)]:
+            result.update(status=403, error=f"Forbidden: You lack '{action}' permission.")
+            continue
+        if kind == 'update':
+            fields = op.get('data') or {}
+            error = validate_item_fields(fields) or reference_error(fields, in_project)
+            if not error and fields.get('parent_id') is not None and fields['parent_id'] != current[item_id]['parent_id']:
+                if hierarchy.creates_cycle(item_id, fields['parent_id'], links):
+                    error = 'An item cannot be moved under itself or its own subtasks'
+                else:
+                    # Later ops in the batch see this move when they walk up the tree
+                    links[item_id] = fields['parent_id']
+            if error:
+                result.update(status=400, error=error)
+                continue
+            state = current[item_id]
+            for field in ITEM_FIELDS:
+                if field in fields:
+                    state[field] = fields[field]
+            if 'due_date' in fields:
+                state['due_date'] = parse_due_date(fields['due_date'])
+            updated.add(item_id)
+            result['status'] = 200
+        else:
+            deleted[item_id] = result
+            result['status'] = 200
+
+    # A parent can only go if all of its subtasks go in the same batch
+    blocked = True
+    while blocked:
+        blocked = [i for i in deleted if not children.get(i, set()) <= set(deleted)]
+        for item_id in blocked:
+            deleted.pop(item_id).update(status=409, error='Item has subtasks; delete them in the same batch')
+
+    # New cards, and cards moved to another column, go to the end of that column
+    kept = updated - set(deleted)
+    placed = [row for _, row in creates] + [current[i] for i in kept if current[i]['column_id'] != originals[i].column_id]
+    last = ranking.last_ranks(Item, Item.column_id, {row['column_id'] for row in placed})
+    for row in placed:
+        row['rank'] = last[row['column_id']] = ranking.rank_between(last.get(row['column_id']))
+
+    update_rows = []
+    for item_id in kept:
+        old, new = originals[item_id], current[item_id]
+        changed = {f: v for f, v in new.items() if v != getattr(old, f)}
+        if changed:
+            update_rows.append((item_id, changed))
+    if not (creates or update_rows or deleted):
+        return jsonify({'results': results})
+
+    seq = changes.next_change_seq(db.session.connection(), project_id)
+    now = datetime.utcnow()
+    counters = stats.StatsBatch(project_id)
+    # Bulk statements skip the session hook; drop the rollups above every touched row first
+    touched = [row['parent_id'] for _, row in creates]
+    for item_id, changed in update_rows:
+        if set(changed) & set(hierarchy.ROLLUP_FIELDS):
+            touched += [item_id, current[item_id]['parent_id']]
+    hierarchy.invalidate_rollups(touched)
+    assignments = []
+
+    if creates:
+        rows = [dict(row, change_seq=seq, created_at=now, updated_at=now) for _, row in creates]
+        new_ids = db.session.scalars(insert(Item).returning(Item.id, sort_by_parameter_order=True), rows).all()
+        for (result, row), new_id in zip(creates, new_ids):
+            row['id'] = new_id
+            result.update(status=201, id=new_id)
+            counters.item_added(row['status'], user_id, row['assignee_id'])
+            log_activity(new_id, user_id, 'created', {'title': [None, row['title']]})
+            if row['assignee_id']:
+                assignments.append((row['assignee_id'], row['title']))
+            publish_project(project_id, 'item_created', item_summary(SimpleNamespace(**row)))
+
+    if update_rows:
+        db.session.execute(update(Item), [
+            dict(changed, id=item_id, change_seq=seq, updated_at=now) for item_id, changed in update_rows
+        ])
+        for item_id, changed in update_rows:
+            old, new = originals[item_id], current[item_id]
+            counters.item_changed(old.reporter_id, old.status, new['status'], old.assignee_id, new['assignee_id'])
+            log_activity(item_id, user_id, 'updated', {
+                field: [_describe(getattr(old, field)), _describe(value)] for field, value in changed.items() if field != 'rank'
+            })
+            if 'assignee_id' in changed and new['assignee_id']:
+                assignments.append((new['assignee_id'], new['title']))
+            publish_project(project_id, 'item_updated', item_summary(SimpleNamespace(**new)))
+
+    if deleted:
+        ids = list(deleted)
+        deletion.delete_items(project_id, ids, seq)
+        for item_id in ids:
+            old = originals[item_id]
+            counters.item_removed(old.status, old.reporter_id, old.assignee_id)
+            publish_project(project_id, 'item_deleted', {'id': item_id, 'parent_id': old.parent_id})
+
+    if assignments:
+        known = {u for (u,) in db.session.query(User.id).filter(User.id.in_({a for a, _ in assignments}))}
+        for assignee_id, title in assignments:
+            if assignee_id in known:
+                create_notification(assignee_id, f"You have been assigned to task '{title}'")
+    counters.apply()
+    db.session.commit()
+    return jsonify({'results': results})
+
 @require_project_permission('view_tasks')
 def get_subtasks(item_id):
     parent = Item.query.get(item_id)
     if not parent:
         return jsonify({'error': 'Parent task not found'}), 404
+    if wants_cursor():
+        query = Item.query.filter_by(parent_id=parent.id)
+        try:
+            sort_key, descending, limit, cursor = parse_page_args(ITEM_SORTS)
+            subtasks, next_cursor = keyset_page(query, ITEM_SORTS, Item.id, sort_key, descending, limit, cursor)
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        response = {'subtasks': SubtaskSchema.dump_all(subtasks), 'next_cursor': next_cursor, 'limit': limit}
+        if include_total():
+            response['total'] = query.count()
+        return jsonify(response)
     limit = int(request.args.get('limit', 50))
     offset = int(request.args.get('offset', 0))
     subtasks_query = parent.subtasks.offset(offset).limit(limit)
-    result = [{
-        'id': s.id,
-        'title': s.title,
-        'status': s.status,
-        'priority': s.priority,
-        'due_date': s.due_date.isoformat() if s.due_date else None
-    } for s in subtasks_query]
+    result = SubtaskSchema.dump_all(subtasks_query)
     total = parent.subtasks.count()
     return jsonify({'subtasks': result, 'total': total, 'limit': limit, 'offset': offset})
 
+@require_project_permission('view_tasks')
+def get_item_tree(item_id):
+    """An item with its descendants to ?depth= levels, each with rollups of its whole subtree."""
+    try:
+        depth = int(request.args.get('depth', hierarchy.DEFAULT_TREE_DEPTH))
+    except ValueError:
+        return jsonify({'error': 'depth must be an integer'}), 400
+    if not 0 <= depth <= hierarchy.MAX_TREE_DEPTH:
+        return jsonify({'error': f'depth must be between 0 and {hierarchy.MAX_TREE_DEPTH}'}), 400
+    tree = hierarchy.item_tree(item_id, depth)
+    if tree is None:
+        return jsonify({'error': f'Item not found: {item_id}'}), 404
+    return jsonify({'tree': tree, 'depth': depth})
+
 @require_project_permission('create_task')
 def create_subtask(item_id):
     parent = Item.query.get(item_id)
@@ -265,6 +634,9 @@ def create_subtask(item_id):
     title = data.get('title')
     if not title:
         return jsonify({'error': 'Subtask title required'}), 400
+    error = validate_item_fields({'story_points': data.get('story_points')})
+    if error:
+        return jsonify({'error': error}), 400
     subtask = Item(
         title=title,
         description=data.get('description'),
@@ -274,17 +646,21 @@ def create_subtask(item_id):
         project_id=parent.project_id,
         reporter_id=getattr(request.user, 'id', None),
         assignee_id=data.get('assignee_id'),
-        due_date=datetime.strptime(data['due_date'], '%Y-%m-%d').date() if data.get('due_date') else None,
+        due_date=parse_due_date(data.get('due_date')),
         priority=data.get('priority'),
-        parent_id=parent.id
+        parent_id=parent.id,
+        story_points=data.get('story_points')
     )
     db.session.add(subtask)
-    db.session.commit()
-    log_activity(subtask.id, getattr(request.user, 'id', None), 'created', f'Subtask created: {title}')
+    stats.item_added(subtask.project_id, subtask.status, subtask.reporter_id, subtask.assignee_id)
+    db.session.flush()
+    log_activity(subtask.id, getattr(request.user, 'id', None), 'created', {'title': [None, title], 'parent_id': [None, parent.id]})
     if data.get('assignee_id'):
         assignee = User.query.get(data.get('assignee_id'))
         if assignee:
             create_notification(data.get('assignee_id'), f"You have been assigned to subtask '{title}'")
+    publish_project(subtask.project_id, 'item_created', item_summary(subtask))
+    db.session.commit()
     return jsonify({'message': 'Subtask created', 'subtask': {'id': subtask.id, 'title': subtask.title}}), 201
 
 @require_project_permission('edit_any_task')
@@ -293,14 +669,18 @@ def update_subtask(subtask_id):
     if not subtask or not subtask.parent_id:
         return jsonify({'error': 'Subtask not found'}), 404
     data = request.get_json()
-    changes = []
+    error = validate_item_fields({'story_points': data.get('story_points')})
+    if error:
+        return jsonify({'error': error}), 400
+    diff = {}
+    old_status = subtask.status
     old_assignee = subtask.assignee_id
-    for field in ['title', 'description', 'status', 'assignee_id', 'priority', 'type']:
+    for field in ['title', 'description', 'status', 'assignee_id', 'priority', 'type', 'story_points']:
         if field in data:
             old = getattr(subtask, field)
             new = data[field]
             if old != new:
-                changes.append(f'{field}: {old} -> {new}')
+                diff[field] = [old, new]
             setattr(subtask, field, new)
             if field == 'assignee_id' and new != old_assignee:
                 if new:
@@ -311,66 +691,70 @@ def update_subtask(subtask_id):
         old = subtask.due_date.isoformat() if subtask.due_date else None
         new = data['due_date']
         if old != new:
-            changes.append(f'due_date: {old} -> {new}')
-        subtask.due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date() if data['due_date'] else None
+            diff['due_date'] = [old, new]
+        subtask.due_date = parse_due_date(data['due_date'])
+    stats.item_changed(subtask.project_id, subtask.reporter_id, old_status, subtask.status, old_assignee, subtask.assignee_id)
+    if diff:
+        log_activity(subtask.id, getattr(request.user, 'id', None), 'updated', diff)
+    publish_project(subtask.project_id, 'item_updated', item_summary(subtask))
     db.session.commit()
-    if changes:
-        log_activity(subtask.id, getattr(request.user, 'id', None), 'updated', '; '.join(changes))
     return jsonify({'message': 'Subtask updated'})
 
 @require_project_permission('delete_any_task')
 def delete_subtask(subtask_id):
-    subtask = Item.query.get(subtask_id)
+    subtask = db.session.query(*DELETE_ITEM_COLUMNS).filter(Item.id == subtask_id).first()
     if not subtask or not subtask.parent_id:
         return jsonify({'error': 'Subtask not found'}), 404
-    db.session.delete(subtask)
+    deletion.delete_items(subtask.project_id, [subtask.id])
+    stats.item_removed(subtask.project_id, subtask.status, subtask.reporter_id, subtask.assignee_id)
+    publish_project(subtask.project_id, 'item_deleted', {'id': subtask.id, 'parent_id': subtask.parent_id})
     db.session.commit()
-    log_activity(subtask_id, getattr(request.user, 'id', None), 'deleted', 'Subtask deleted')
     return jsonify({'message': 'Subtask deleted'})
 
 @require_project_permission('view_tasks')
 def get_activity_logs(item_id):
-    logs = ActivityLog.query.filter_by(item_id=item_id).order_by(ActivityLog.created_at.asc()).all()
-    result = [{
-        'id': log.id,
-        'user_id': log.user_id,
-        'action': log.action,
-        'details': log.details,
-        'created_at': log.created_at.isoformat()
-    } for log in logs]
+    # Archived months are merged back in, so the history is complete either way
+    if wants_cursor():
+        try:
+            sort_key, descending, limit, cursor = parse_page_args(ACTIVITY_SORTS, default_sort='created_at')
+            logs, next_cursor = item_activity(item_id, ACTIVITY_SORTS, sort_key, descending, limit, cursor)
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+    else:
+        logs, _ = item_activity(item_id, ACTIVITY_SORTS)
+    result = ActivitySchema.dump_all(logs, ITEM_ACTIVITY_FIELDS)
+    if wants_cursor():
+        return jsonify({'activity_logs': result, 'next_cursor': next_cursor, 'limit': limit})
     return jsonify({'activity_logs': result})
 
 def get_my_tasks():
-    print('[get_my_tasks] Called')
     user = getattr(request, 'user', None)
     if not user:
-        print('[get_my_tasks] No user found')
         return jsonify({'error': 'User not found'}), 401
     user_id = user.id
     try:
-        tasks = Item.query.filter(
-            (Item.assignee_id == user_id) | (Item.reporter_id == user_id)
-        ).order_by(Item.created_at.desc()).all()
-        result = []
-        for task in tasks:
-            result.append({
-                'id': task.id,
-                'title': task.title,
-                'description': task.description,
-                'status': task.status,
-                'type': task.type,
-                'priority': task.priority,
-                'due_date': task.due_date.isoformat() if task.due_date else None,
-                'project_id': task.project_id,
-                'assignee_id': task.assignee_id,
-                'reporter_id': task.reporter_id,
-                'created_at': task.created_at.isoformat(),
-                'updated_at': task.updated_at.isoformat() if task.updated_at else None,
-            })
-        print(f'[get_my_tasks] Returning {len(result)} tasks')
+        fields = ItemSchema.requested(MY_TASK_FIELDS)
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        mine = (Item.assignee_id == user_id) | (Item.reporter_id == user_id)
+        next_cursor = None
+        if wants_cursor():
+            try:
+                sort_key, descending, limit, cursor = parse_page_args(ITEM_SORTS, default_sort='created_at', default_direction='desc')
+                query = db.session.query(*ItemSchema.columns(fields, 'id', sort_key)).filter(mine)
+                tasks, next_cursor = keyset_page(query, ITEM_SORTS, Item.id, sort_key, descending, limit, cursor)
+            except InvalidPageRequest as e:
+                return jsonify({'error': str(e)}), 400
+        else:
+            tasks = db.session.query(*ItemSchema.columns(fields)).filter(mine).order_by(Item.created_at.desc()).all()
+        result = ItemSchema.dump_all(tasks, fields)
+        logger.debug('get_my_tasks: returning %d tasks for user %s', len(result), user_id)
+        if wants_cursor():
+            return jsonify({'tasks': result, 'next_cursor': next_cursor, 'limit': limit})
         return jsonify({'tasks': result})
-    except Exception as e:
-        print(f'[get_my_tasks] Exception: {e}')
+    except Exception:
+        logger.exception('get_my_tasks failed for user %s', user_id)
         return jsonify({'error': 'Internal server error'}), 500
 
 def add_comment(item_id):
@@ -383,7 +767,6 @@ def add_comment(item_id):
         return jsonify({'error': 'Content required'}), 400
     comment = Comment(item_id=item_id, user_id=user.id, content=content)
     db.session.add(comment)
-    db.session.commit()
     item = Item.query.get(item_id)
     if item:
         notified_users = set()
@@ -392,7 +775,11 @@ def add_comment(item_id):
             notified_users.add(item.assignee_id)
         if item.reporter_id and item.reporter_id != user.id and item.reporter_id not in notified_users:
             create_notification(item.reporter_id, f"New comment on task '{item.title}'")
-    return jsonify({'message': 'Comment added', 'comment': {'id': comment.id, 'content': comment.content, 'user_id': comment.user_id, 'author_name': user.username, 'created_at': comment.created_at.isoformat()}}), 201
+    if item:
+        db.session.flush()
+        publish_project(item.project_id, 'comment_added', {'item_id': item.id, 'comment': {'id': comment.id, 'content': content, 'user_id': user.id, 'author_name': user.username, 'created_at': comment.created_at.isoformat()}})
+    db.session.commit()
+    return jsonify({'message': 'Comment added', 'comment': dict(CommentSchema.dump(comment, CommentSchema.fields), author_name=user.username)}), 201
 
 @require_project_permission('edit_any_comment', allow_own='edit_own_comment')
 def edit_comment(item_id, comment_id): 
@@ -412,5 +799,6 @@ def edit_comment(item_id, comment_id):
         return jsonify({'error': 'Content required'}), 400
         
     comment.content = content
+    publish_project(comment.item.project_id, 'comment_updated', {'item_id': comment.item_id, 'comment': {'id': comment.id, 'content': content, 'user_id': comment.user_id}})
     db.session.commit()
-    return jsonify({'message': 'Comment updated', 'comment': {'id': comment.id, 'content': comment.content, 'user_id': comment.user_id, 'created_at': comment.created_at.isoformat()}})
+    return jsonify({'message': 'Comment updated', 'comment': CommentSchema.dump(comment, CommentSchema.fields)})
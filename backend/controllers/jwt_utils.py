@@ -1,10 +1,27 @@
 import jwt
+import time
+from collections import OrderedDict, namedtuple
 from datetime import datetime, timedelta
 from flask import request, jsonify, current_app
 from functools import wraps
+from itertools import chain
+from threading import Lock
+from sqlalchemy import event
+from models.db import db
 from models.user import User
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
+# Immutable view of the authenticated user; carries the same fields as the token claims
+Principal = namedtuple('Principal', ['id', 'username', 'email', 'role'])
+
+# Principals keyed by user_id -> (principal, loaded_at). The short TTL bounds how long a
+# deleted or renamed user keeps authenticating with the values loaded before the change.
+PRINCIPAL_CACHE_SIZE = 4096
+PRINCIPAL_CACHE_TTL = 30
+STALE_PRINCIPALS_KEY = 'stale_principals'
+_principal_cache = OrderedDict()
+_principal_cache_lock = Lock()
+
 # =====================
 # 🔐 Generate JWT Token
 # =====================
@@ -46,6 +63,96 @@ def decode_jwt(token):
         return None
 
 
+# =============================
+# 👤 Principal Lookup
+# =============================
+def get_principal(user_id):
+    """Return the Principal for user_id, or None if the user no longer exists."""
+    user_id = int(user_id)
+    now = time.monotonic()
+    with _principal_cache_lock:
+        entry = _principal_cache.get(user_id)
+        if entry and now - entry[1] < PRINCIPAL_CACHE_TTL:
+            _principal_cache.move_to_end(user_id)
+            return entry[0]
+    row = db.session.query(User.id, User.username, User.email, User.role).filter(User.id == user_id).first()
+    principal = Principal(*row) if row else None
+    with _principal_cache_lock:
+        _principal_cache[user_id] = (principal, now)
+        _principal_cache.move_to_end(user_id)
+        while len(_principal_cache) > PRINCIPAL_CACHE_SIZE:
+            _principal_cache.popitem(last=False)
+    return principal
+
+def invalidate_principal(user_id=None):
+    with _principal_cache_lock:
+        if user_id is None:
+            _principal_cache.clear()
+        else:
+            _principal_cache.pop(int(user_id), None)
+
+# A User row written through the session drops its cached principal once the
+# change commits, so the TTL only covers changes made outside the ORM. New rows
+# count too: SQLite can hand a deleted user's id, cached as missing, to a new one.
+@event.listens_for(db.session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    user_ids = {obj.id for obj in chain(session.new, session.dirty, session.deleted) if isinstance(obj, User)}
+    if user_ids:
+        session.info.setdefault(STALE_PRINCIPALS_KEY, set()).update(user_ids)
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop(STALE_PRINCIPALS_KEY, ()):
+        invalidate_principal(user_id)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_changed_users(session, previous_transaction):
+    session.info.pop(STALE_PRINCIPALS_KEY, None)
+
+
+# =============================
+# 🔑 Request Authentication
+# =============================
+def authenticate_request():
+    """before_request hook: verify the bearer token once and attach request.user.
+
+    Requests without an Authorization header pass through anonymously; the
+    outcome is left on the request for jwt_required to enforce.
+    """
+    request.user = None
+    request.auth_error = ('Missing or invalid token', 401)
+    if request.method == 'OPTIONS':
+        return
+
+    auth_header = request.headers.get('Authorization', None)
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return
+
+    payload = decode_jwt(auth_header.split(' ')[1])
+    if not payload:
+        request.auth_error = ('Invalid or expired token', 401)
+        return
+
+    user_id = payload.get('sub') or payload.get('user_id')
+    if not user_id:
+        request.auth_error = ('Invalid token: missing user ID', 401)
+        return
+
+    principal = get_principal(user_id)
+    if not principal:
+        request.auth_error = ('User not found', 404)
+        return
+
+    request.user = principal
+    request.auth_error = None
+
+def current_user_id():
+    """Id of the authenticated user, authenticating on first use if the hook did not run."""
+    if not hasattr(request, 'auth_error'):
+        authenticate_request()
+    return request.user.id if request.user else None
+
+
 # =============================
 # 🛡️ JWT Authentication Wrapper
 # =============================
@@ -55,29 +162,9 @@ def jwt_required(f):
         if request.method == 'OPTIONS':
             return '', 200
 
-        auth_header = request.headers.get('Authorization', None)
-
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Missing or invalid token'}), 401
-
-        token = auth_header.split(' ')[1]
-        payload = decode_jwt(token)
-
-        if not payload:
-            return jsonify({'error': 'Invalid or expired token'}), 401
-
-        user_id = payload.get('sub') or payload.get('user_id')
-
-        if not user_id:
-            return jsonify({'error': 'Invalid token: missing user ID'}), 401
-
-        user = User.query.get(user_id)
-
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-
-        # Attach user to request context
-        request.user = user
+        if current_user_id() is None:
+            error, code = request.auth_error
+            return jsonify({'error': error}), code
 
         return f(*args, **kwargs)
     return decorated
@@ -0,0 +1,123 @@
+from collections import Counter
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.orm import aliased
+from models.db import db, dialect_insert
+from models.project import Project
+from models.project_member import ProjectMember
+from models.project_team import ProjectTeam
+from models.role import Role
+from models.team_member import TeamMember
+from controllers import stats
+from controllers.rbac import invalidate_permissions
+
+# Linking a team to a project makes every team member a project member.
+# Memberships are synchronised as sets: the (user, project) pairs a team
+# grants come from one join of team_member and project_team, missing pairs go
+# in with a single INSERT ... ON CONFLICT DO NOTHING, and pairs no other linked
+# team still grants leave with a single DELETE. Membership does not record
+# which team granted it, so unlinking removes a member that only this team
+# grants, unless they administer the project.
+DEFAULT_ROLE = 'member'
+
+class UnknownRole(ValueError):
+    pass
+
+def team_grants(team_id, project_ids=None, user_ids=None):
+    """The (user_id, project_id) pairs team_id grants, optionally narrowed to some projects or users."""
+    query = select(TeamMember.user_id, ProjectTeam.project_id).join(
+        ProjectTeam, ProjectTeam.team_id == TeamMember.team_id
+    ).where(TeamMember.team_id == team_id)
+    if project_ids is not None:
+        query = query.where(ProjectTeam.project_id.in_(project_ids))
+    if user_ids is not None:
+        query = query.where(TeamMember.user_id.in_(user_ids))
+    return set(db.session.execute(query).tuples())
+
+def resolve_roles(project_ids, names):
+    """{(project_id, role name): role_id} for the given projects, in one query."""
+    rows = db.session.query(Role.project_id, Role.name, Role.id).filter(
+        Role.project_id.in_(project_ids), Role.name.in_(names)
+    )
+    return {(project_id, name): role_id for project_id, name, role_id in rows}
+
+def _applied(pairs, delta):
+    """Counters and board versions for memberships just added or removed."""
+    if not pairs:
+        return
+    counts = Counter(user_id for user_id, _ in pairs)
+    stats.project_memberships_changed({user_id: n * delta for user_id, n in counts.items()})
+    # The member directory is part of the board, whose version is the project's change_seq
+    db.session.execute(
+        update(Project).where(Project.id.in_({project_id for _, project_id in pairs}))
+        .values(change_seq=Project.change_seq + 1),
+        execution_options={'synchronize_session': False}
+    )
+
+def grant_team_access(team_id, project_ids=None, user_ids=None, roles=None):
+    """Add the memberships team_id grants and that are missing; returns the pairs added.
+
+    roles maps user_id to a role name, DEFAULT_ROLE otherwise. Raises
+    UnknownRole, before writing anything, for a name a project does not have.
+    """
+    roles = roles or {}
+    wanted = team_grants(team_id, project_ids, user_ids)
+    if not wanted:
+        return []
+    projects = {project_id for _, project_id in wanted}
+    users = {user_id for user_id, _ in wanted}
+    existing = set(db.session.execute(select(ProjectMember.user_id, ProjectMember.project_id).where(
+        ProjectMember.project_id.in_(projects), ProjectMember.user_id.in_(users)
+    )).tuples())
+    missing = sorted(wanted - existing)
+    if not missing:
+        return []
+    names = {roles.get(user_id, DEFAULT_ROLE) for user_id, _ in missing}
+    role_ids = resolve_roles(projects, names)
+    rows = []
+    for user_id, project_id in missing:
+        name = roles.get(user_id, DEFAULT_ROLE)
+        if (project_id, name) not in role_ids:
+            raise UnknownRole(f'Role {name} not found for project {project_id}')
+        rows.append({'user_id': user_id, 'project_id': project_id, 'role_id': role_ids[(project_id, name)]})
+    # A membership created concurrently wins; RETURNING only reports the rows really inserted
+    added = db.session.execute(
+        dialect_insert(ProjectMember).on_conflict_do_nothing().returning(ProjectMember.user_id, ProjectMember.project_id),
+        rows
+    ).tuples().all()
+    _applied(added, 1)
+    return added
+
+def revoke_team_access(team_id, project_ids=None, user_ids=None):
+    """Remove the memberships only team_id grants; returns the pairs removed.
+
+    Call it before or after unlinking the team or removing the member; the
+    team's own rows are ignored when looking for other grants.
+    """
+    projects = select(ProjectTeam.project_id).where(ProjectTeam.team_id == team_id)
+    if project_ids is not None:
+        projects = projects.where(ProjectTeam.project_id.in_(project_ids))
+    users = select(TeamMember.user_id).where(TeamMember.team_id == team_id)
+    if user_ids is not None:
+        users = users.where(TeamMember.user_id.in_(user_ids))
+    other_tm = aliased(TeamMember)
+    other_pt = aliased(ProjectTeam)
+    granted_elsewhere = exists().where(
+        other_tm.team_id == other_pt.team_id,
+        other_pt.project_id == ProjectMember.project_id,
+        other_tm.user_id == ProjectMember.user_id,
+        other_tm.team_id != team_id
+    )
+    is_admin = exists().where(Project.id == ProjectMember.project_id, Project.admin_id == ProjectMember.user_id)
+    removed = db.session.execute(
+        delete(ProjectMember).where(
+            ProjectMember.project_id.in_(projects), ProjectMember.user_id.in_(users),
+            ~granted_elsewhere, ~is_admin
+        ).returning(ProjectMember.user_id, ProjectMember.project_id),
+        execution_options={'synchronize_session': False}
+    ).tuples().all()
+    _applied(removed, -1)
+    return removed
+
+def forget_permissions(pairs):
+    for user_id, project_id in pairs:
+        invalidate_permissions(user_id, project_id)
@@ -1,30 +1,108 @@
+from datetime import datetime, timedelta
 from flask import request, jsonify
+from sqlalchemy import update, delete
 from models.notification import Notification
 from models.db import db
 from controllers.jwt_utils import jwt_required
+from controllers.side_effects import record_notification
+from controllers.realtime import publish_user
+from controllers.pagination import wants_cursor, parse_page_args, keyset_page, InvalidPageRequest
+from controllers.stats import get_user_stats, notifications_read
 
-@jwt_required
-def get_notifications():
-    user_id = request.user.id
-    notifs = Notification.query.filter_by(user_id=user_id).order_by(Notification.created_at.desc()).all()
-    return jsonify([{
+NOTIFICATION_SORTS = {'id': Notification.id, 'created_at': Notification.created_at}
+MAX_MARK_READ_IDS = 1000
+PURGE_BATCH_SIZE = 5000
+
+def notification_summary(n):
+    return {
         'id': n.id,
         'message': n.message,
         'is_read': n.is_read,
         'created_at': n.created_at.isoformat()
-    } for n in notifs])
+    }
+
+@jwt_required
+def get_notifications():
+    user_id = request.user.id
+    query = Notification.query.filter_by(user_id=user_id)
+    if wants_cursor():
+        try:
+            sort_key, descending, limit, cursor = parse_page_args(NOTIFICATION_SORTS, default_sort='created_at', default_direction='desc')
+            notifs, next_cursor = keyset_page(query, NOTIFICATION_SORTS, Notification.id, sort_key, descending, limit, cursor)
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'notifications': [notification_summary(n) for n in notifs], 'next_cursor': next_cursor, 'limit': limit})
+    notifs = query.order_by(Notification.created_at.desc()).all()
+    return jsonify([notification_summary(n) for n in notifs])
+
+@jwt_required
+def get_unread_count():
+    return jsonify({'unread': get_user_stats(request.user.id).unread_notifications})
+
+def _mark_read(user_id, *criteria):
+    """Mark the caller's unread notifications matching criteria read in one UPDATE; returns the count."""
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == False, *criteria)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        notifications_read(user_id, result.rowcount)
+    return result.rowcount
 
 @jwt_required
 def mark_as_read(notif_id):
-    notif = Notification.query.get(notif_id)
-    if notif and notif.user_id == request.user.id:
-        notif.is_read = True
+    user_id = request.user.id
+    exists = db.session.query(Notification.id).filter_by(id=notif_id, user_id=user_id).first()
+    if not exists:
+        return jsonify({'error': 'Not found'}), 404
+    _mark_read(user_id, Notification.id == notif_id)
+    db.session.commit()
+    return jsonify({'success': True})
+
+@jwt_required
+def mark_many_as_read():
+    """Body: {"ids": [...]} or {"up_to_id": n} - every notification with id <= n."""
+    data = request.get_json(silent=True) or {}
+    ids, up_to_id = data.get('ids'), data.get('up_to_id')
+    if (ids is None) == (up_to_id is None):
+        return jsonify({'error': "Provide either 'ids' or 'up_to_id'"}), 400
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({'error': "'ids' must be a list of integers"}), 400
+        if len(ids) > MAX_MARK_READ_IDS:
+            return jsonify({'error': f'At most {MAX_MARK_READ_IDS} ids per request'}), 400
+        criteria = Notification.id.in_(set(ids))
+    else:
+        if not isinstance(up_to_id, int) or isinstance(up_to_id, bool):
+            return jsonify({'error': "'up_to_id' must be an integer"}), 400
+        criteria = Notification.id <= up_to_id
+    user_id = request.user.id
+    updated = _mark_read(user_id, criteria)
+    db.session.commit()
+    return jsonify({'updated': updated, 'unread': get_user_stats(user_id).unread_notifications})
+
+def purge_read_notifications(older_than_days, batch_size=PURGE_BATCH_SIZE, progress=None):
+    """Delete read notifications older than the cutoff, batch_size rows per transaction."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    total = 0
+    while True:
+        ids = [i for (i,) in db.session.query(Notification.id).filter(
+            Notification.is_read == True, Notification.created_at < cutoff
+        ).order_by(Notification.created_at).limit(batch_size)]
+        if not ids:
+            break
+        db.session.execute(delete(Notification).where(Notification.id.in_(ids)).execution_options(synchronize_session=False))
         db.session.commit()
-        return jsonify({'success': True})
-    return jsonify({'error': 'Not found'}), 404
+        total += len(ids)
+        if progress:
+            progress(total)
+        if len(ids) < batch_size:
+            break
+    return total
 
 def create_notification(user_id, message):
-    notif = Notification(user_id=user_id, message=message)
-    db.session.add(notif)
-    db.session.commit()
-    return notif 
\ No newline at end of file
+    """Queue a notification; it is written when the current transaction commits."""
+    row = record_notification(user_id, message)
+    publish_user(user_id, 'notification', {'message': message, 'is_read': False, 'created_at': row['created_at'].isoformat()})
\ No newline at end of file
@@ -0,0 +1,79 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidPageRequest(ValueError):
+    pass
+
+def wants_cursor():
+    """Cursor mode is opt-in: clients send ?cursor= (empty for the first page)."""
+    return 'cursor' in request.args
+
+def encode_cursor(sort_key, sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_key, sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, sort_key, sort_column):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        cursor_sort, sort_value, row_id = json.loads(raw)
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidPageRequest('Invalid cursor')
+    if cursor_sort != sort_key:
+        raise InvalidPageRequest('Cursor does not match the requested sort order')
+    try:
+        if sort_value is not None and sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        row_id = int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidPageRequest('Invalid cursor')
+    return sort_value, row_id
+
+def parse_page_args(sort_columns, default_sort='id', default_direction='asc'):
+    """Read sort, direction, limit and cursor from the query string."""
+    sort_key = request.args.get('sort', default_sort)
+    if sort_key not in sort_columns:
+        raise InvalidPageRequest(f'Invalid sort: {sort_key}')
+    direction = request.args.get('direction', default_direction)
+    if direction not in ('asc', 'desc'):
+        raise InvalidPageRequest(f'Invalid direction: {direction}')
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise InvalidPageRequest('Invalid limit')
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return sort_key, direction == 'desc', limit, request.args.get('cursor') or None
+
+def keyset_page(query, sort_columns, id_column, sort_key, descending, limit, cursor=None):
+    """Return (rows, next_cursor) for a page ordered by (sort column, id).
+
+    Rows must expose the sort column and id under their column keys.
+    """
+    sort_column = sort_columns[sort_key]
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_key, sort_column)
+        if sort_column is id_column:
+            query = query.filter(id_column < row_id if descending else id_column > row_id)
+        elif descending:
+            query = query.filter(or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < row_id)))
+        else:
+            query = query.filter(or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > row_id)))
+    if sort_column is id_column:
+        order = [id_column.desc() if descending else id_column.asc()]
+    else:
+        order = [sort_column.desc(), id_column.desc()] if descending else [sort_column.asc(), id_column.asc()]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_key, getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
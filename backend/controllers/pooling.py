@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import threading
+import time
+from flask import request, jsonify
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+from models.db import db
+from models.routing import router
+
+logger = logging.getLogger(__name__)
+
+# Engine settings, all overridable from the environment:
+#   DB_POOL_MODE          'queue' (default) or 'null' - one connection per checkout,
+#                         for running behind PgBouncer in transaction mode
+#   DB_POOL_SIZE          connections kept open per worker (default 5)
+#   DB_MAX_OVERFLOW       extra connections allowed under bursts (default 10)
+#   DB_POOL_TIMEOUT       seconds to wait for a free connection (default 30)
+#   DB_POOL_RECYCLE       reopen connections older than this many seconds (default 1800),
+#                         ahead of the provider dropping idle ones
+#   DB_POOL_PRE_PING      test connections on checkout (default on)
+#   DB_POOL_LOG_INTERVAL  seconds between pool log lines per worker, 0 disables (default 60)
+POOL_DEFAULTS = {
+    'DB_POOL_MODE': 'queue',
+    'DB_POOL_SIZE': '5',
+    'DB_MAX_OVERFLOW': '10',
+    'DB_POOL_TIMEOUT': '30',
+    'DB_POOL_RECYCLE': '1800',
+    'DB_POOL_PRE_PING': '1',
+    'DB_POOL_LOG_INTERVAL': '60',
+}
+
+def _setting(env, name):
+    return env.get(name) or POOL_DEFAULTS[name]
+
+def _flag(value):
+    return value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+class PoolStats:
+    """Checkout wait times for this worker, cumulative and since the last log line."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.window_checkouts = 0
+        self.window_wait_total = 0.0
+        self.window_wait_max = 0.0
+        self.logged_at = time.monotonic()
+
+    def record(self, wait, timed_out=False):
+        with self.lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.window_checkouts += 1
+            self.window_wait_total += wait
+            self.window_wait_max = max(self.window_wait_max, wait)
+
+    def snapshot(self, reset_window=False):
+        with self.lock:
+            data = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+                'window_seconds': round(time.monotonic() - self.logged_at, 1),
+                'window_checkouts': self.window_checkouts,
+                'window_wait_avg_ms': round(self.window_wait_total / self.window_checkouts * 1000, 3) if self.window_checkouts else 0.0,
+                'window_wait_max_ms': round(self.window_wait_max * 1000, 3),
+            }
+            if reset_window:
+                self.window_checkouts = 0
+                self.window_wait_total = 0.0
+                self.window_wait_max = 0.0
+                self.logged_at = time.monotonic()
+        return data
+
+pool_stats = PoolStats()
+
+class TimedPoolMixin:
+    """Times how long each checkout waits for a connection, including connect time."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record(time.perf_counter() - start)
+        return conn
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+class TimedNullPool(TimedPoolMixin, NullPool):
+    pass
+
+def engine_options(database_url, env=os.environ):
+    """SQLALCHEMY_ENGINE_OPTIONS for database_url from DB_POOL_* variables."""
+    if not database_url:
+        return {}
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory SQLite must stay on the single shared connection Flask-SQLAlchemy gives it
+        return {}
+    mode = _setting(env, 'DB_POOL_MODE').lower()
+    if mode == 'null':
+        # The bouncer owns pooling; connections are fresh, so pre-ping and recycle are moot
+        return {'poolclass': TimedNullPool}
+    if mode != 'queue':
+        raise ValueError(f"DB_POOL_MODE must be 'queue' or 'null', not {mode!r}")
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': int(_setting(env, 'DB_POOL_SIZE')),
+        'max_overflow': int(_setting(env, 'DB_MAX_OVERFLOW')),
+        'pool_timeout': float(_setting(env, 'DB_POOL_TIMEOUT')),
+        'pool_recycle': int(_setting(env, 'DB_POOL_RECYCLE')),
+        'pool_pre_ping': _flag(_setting(env, 'DB_POOL_PRE_PING')),
+    }
+
+def pool_occupancy(pool):
+    data = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        data.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    return data
+
+def pool_status():
+    """Live pool occupancy plus wait-time counters for this worker.
+
+    Wait times cover checkouts from the primary and replica pools together.
+    """
+    data = {'pid': os.getpid(), **pool_occupancy(db.engine.pool)}
+    if router.keys:
+        engines = db.engines
+        data['replicas'] = [
+            {**replica, **pool_occupancy(engines[replica['bind']].pool)} for replica in router.status()
+        ]
+    return data
+
+def log_pool_stats(response):
+    """after_request hook: emit one JSON pool line per worker every DB_POOL_LOG_INTERVAL seconds."""
+    interval = float(_setting(os.environ, 'DB_POOL_LOG_INTERVAL'))
+    if interval > 0 and time.monotonic() - pool_stats.logged_at >= interval:
+        data = pool_status()
+        data.update(pool_stats.snapshot(reset_window=True))
+        logger.info('db_pool %s', json.dumps(data, sort_keys=True))
+    return response
+
+def get_pool_stats():
+    if request.user.role != 'admin':
+        return jsonify({'error': 'Forbidden: admin only'}), 403
+    data = pool_status()
+    data.update(pool_stats.snapshot())
+    return jsonify(data)
@@ -1,4 +1,5 @@
 from flask import request, jsonify
+from sqlalchemy import func
 from models.db import db
 from models.project import Project
 from models.user import User
@@ -10,7 +11,9 @@ from models.project_team import ProjectTeam
 from models.team_member import TeamMember
 from models.role import Role 
 from controllers.jwt_utils import jwt_required
-from controllers.rbac import require_project_permission
+from controllers.rbac import require_project_permission, invalidate_permissions
+from controllers import stats, deletion
+from controllers.changes import next_change_seq
 
 
 @jwt_required
@@ -27,6 +30,8 @@ def create_project():
     
     project = Project(name=name, description=description, admin_id=user.id)
     db.session.add(project)
+    db.session.flush()
+    stats.create_project_stats([project.id])
     db.session.commit()
     # add default columns
     default_columns = ["To Do", "In Progress", "In Review", "Done"]
@@ -36,14 +41,15 @@ def create_project():
     db.session.commit()
     
     # Add default project roles and permissions
-    from generate_demo_data import create_roles_and_permissions
-    create_roles_and_permissions(project)
+    from database import create_roles_and_permissions
+    roles = create_roles_and_permissions(project)
     
     # Assign creator as project admin using the correct role_id
-    admin_role = Role.query.filter_by(name='admin', project_id=project.id).first()
+    admin_role = roles.get('admin')
     if admin_role: 
         member = ProjectMember(project_id=project.id, user_id=user.id, role_id=admin_role.id)
         db.session.add(member)
+        stats.project_membership_changed(user.id, 1)
         db.session.commit()
 
     return jsonify({'message': 'Project created', 'project': {'id': project.id, 'name': project.name, 'description': project.description, 'admin_id': project.admin_id}}), 201
@@ -59,7 +65,7 @@ def get_projects():
 
 @jwt_required
 def get_all_projects():
-    projects = Project.query.all()
+    projects = Project.query.filter(Project.deleted_at.is_(None)).all()
     result = [{'id': p.id, 'name': p.name, 'description': p.description, 'admin_id': p.admin_id} for p in projects]
     return jsonify({'projects': result})
 
@@ -69,14 +75,11 @@ def get_dashboard_stats():
     if not user:
         return jsonify({'error': 'User not found'}), 401
 
-    project_count = ProjectMember.query.filter_by(user_id=user.id).count()
-    task_count = Item.query.filter((Item.reporter_id == user.id) | (Item.assignee_id == user.id)).count()
-    team_count = TeamMember.query.filter_by(user_id=user.id).count()
-
+    user_stats = stats.get_user_stats(user.id)
     return jsonify({
-        'projectCount': project_count,
-        'taskCount': task_count,
-        'teamCount': team_count
+        'projectCount': user_stats.project_count,
+        'taskCount': user_stats.task_count,
+        'teamCount': user_stats.team_count
     })
 
 @require_project_permission('view_tasks')
@@ -84,13 +87,12 @@ def get_project_progress(project_id):
     user = getattr(request, 'user', None)
     if not user:
         return jsonify({'error': 'User not found'}), 401
-    total = Item.query.filter_by(project_id=project_id).count()
-    completed = Item.query.filter_by(project_id=project_id, status='done').count()
+    project_stats = stats.get_project_stats(project_id)
     return jsonify({
-        'total': total,
-        'completed': completed,
-        'in_progress': Item.query.filter_by(project_id=project_id, status='inprogress').count(),
-        'todo': Item.query.filter_by(project_id=project_id, status='todo').count()
+        'total': project_stats.total,
+        'completed': project_stats.done,
+        'in_progress': project_stats.inprogress,
+        'todo': project_stats.todo
     })
 
 @require_project_permission('manage_project')
@@ -99,22 +101,43 @@ def update_project(project_id):
     project = Project.query.get(project_id)
     if not project:
         return jsonify({'error': 'Project not found'}), 404
-    if 'name' in data:
-        project.name = data['name']
-    if 'description' in data:
-        project.description = data['description']
+    changed = False
+    for field in ('name', 'description'):
+        if field in data and data[field] != getattr(project, field):
+            setattr(project, field, data[field])
+            changed = True
+    if changed:
+        # The board payload carries the project, so its ETag version moves with it
+        next_change_seq(db.session.connection(), project_id)
     db.session.commit()
     return jsonify({'message': 'Project updated', 'project': {'id': project.id, 'name': project.name, 'description': project.description}})
 
 @require_project_permission('delete_project')
 def delete_project(project_id):
-
-    project = Project.query.get(project_id)
+    """Small projects are deleted now; larger ones are hidden at once and purged in the background."""
+    project = db.session.query(Project.id).filter(Project.id == project_id, Project.deleted_at.is_(None)).first()
     if not project:
         return jsonify({'error': 'Project not found'}), 404
-    db.session.delete(project)
+    item_count = db.session.query(func.count(Item.id)).filter(Item.project_id == project_id).scalar()
+    deletion.soft_delete_project(project_id)
     db.session.commit()
-    return jsonify({'message': 'Project deleted'})
+    invalidate_permissions(project_id=project_id)
+    if item_count <= deletion.INLINE_PROJECT_ITEMS:
+        deletion.purge_project(project_id, batch_size=deletion.INLINE_PROJECT_ITEMS + 1)
+        return jsonify({'message': 'Project deleted'})
+    deletion.schedule_purge(project_id)
+    return jsonify({'message': 'Project scheduled for deletion', 'items': item_count}), 202
+
+@jwt_required
+def get_project_deletion(project_id):
+    """Progress of a background purge, for the project's admin."""
+    project = db.session.query(Project.admin_id, Project.deleted_at).filter(Project.id == project_id).first()
+    if not project or not project.deleted_at:
+        return jsonify({'error': 'Project not found or not being deleted'}), 404
+    if request.user.id != project.admin_id and request.user.role != 'admin':
+        return jsonify({'error': 'Forbidden'}), 403
+    remaining = db.session.query(func.count(Item.id)).filter(Item.project_id == project_id).scalar()
+    return jsonify({'project_id': project_id, 'deleted_at': project.deleted_at.isoformat(), 'items_remaining': remaining})
 
 @require_project_permission('transfer_admin')
 def transfer_admin(project_id):
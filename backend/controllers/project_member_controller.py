@@ -4,11 +4,10 @@ from models.project_member import ProjectMember
 from models.user import User
 from models.project import Project
 from models.role import Role
-from controllers.rbac import require_project_permission
+from controllers.rbac import require_project_permission, invalidate_permissions
 from models.project_member import ProjectJoinRequest
-from flask_jwt_extended import get_jwt_identity
-from flask_jwt_extended import jwt_required
 from controllers.notification_controller import create_notification
+from controllers import stats
 
 @require_project_permission('add_remove_members')
 def add_member(project_id):
@@ -34,8 +33,8 @@ def add_member(project_id):
         status='pending'
     )
     db.session.add(invite)
-    db.session.commit()
     create_notification(user.id, f"You have been invited to join project {project_id}.")
+    db.session.commit()
     return jsonify({'message': 'Invitation sent'})
 
 @require_project_permission('add_remove_members')
@@ -44,7 +43,9 @@ def remove_member(project_id, user_id):
     if not member:
         return jsonify({'error': 'Member not found'}), 404
     db.session.delete(member)
+    stats.project_membership_changed(user_id, -1)
     db.session.commit()
+    invalidate_permissions(user_id, project_id)
     return jsonify({'message': 'Member removed'})
 
 @require_project_permission('add_remove_members')
@@ -61,6 +62,7 @@ def update_member_role(project_id, user_id):
         return jsonify({'error': f'Role {new_role_name} not found for this project'}), 400
     member.role_id = role.id
     db.session.commit()
+    invalidate_permissions(user_id, project_id)
     return jsonify({'message': 'Role updated'})
 
 @require_project_permission('view_project_settings')
@@ -90,13 +92,13 @@ def request_to_join_project(project_id, user_id):
         status='pending'
     )
     db.session.add(join_request)
-    db.session.commit()
     managers = ProjectMember.query.filter(
         ProjectMember.project_id == project_id,
         ProjectMember.role.has(Role.name.in_(['admin', 'manager']))
     ).all()
     for m in managers:
         create_notification(m.user_id, f"New join request for project {project_id}.")
+    db.session.commit()
     return jsonify({'message': 'Join request submitted'})
 
 @require_project_permission('add_remove_members')
@@ -129,9 +131,11 @@ def accept_join_request(project_id, request_id):
         return jsonify({'error': 'Default role not found'}), 400
     member = ProjectMember(project_id=project_id, user_id=req.user_id, role_id=role.id)
     db.session.add(member)
+    stats.project_membership_changed(req.user_id, 1)
     req.status = 'accepted'
-    db.session.commit()
     create_notification(req.user_id, f"Your join request for project {project_id} was accepted.")
+    db.session.commit()
+    invalidate_permissions(req.user_id, project_id)
     return jsonify({'message': 'Request accepted, user added'})
 
 @require_project_permission('add_remove_members')
@@ -140,9 +144,9 @@ def reject_join_request(project_id, request_id):
     if not req:
         return jsonify({'error': 'Request not found'}), 404
     req.status = 'rejected'
-    db.session.commit()
     # Notify user
     create_notification(req.user_id, f"Your join request for project {project_id} was rejected.")
+    db.session.commit()
     return jsonify({'message': 'Request rejected'})
 
 def list_my_invitations(user_id):
@@ -171,8 +175,8 @@ def accept_invitation(project_id, invite_id, user_id):
         return jsonify({'error': 'Default role not found'}), 400
     member = ProjectMember(project_id=project_id, user_id=user_id, role_id=role.id)
     db.session.add(member)
+    stats.project_membership_changed(user_id, 1)
     inv.status = 'accepted'
-    db.session.commit()
     # Notify all managers/admins
     managers = ProjectMember.query.filter(
         ProjectMember.project_id == project_id,
@@ -180,6 +184,8 @@ def accept_invitation(project_id, invite_id, user_id):
     ).all()
     for m in managers:
         create_notification(m.user_id, f"User {user_id} accepted invitation to project {project_id}.")
+    db.session.commit()
+    invalidate_permissions(user_id, project_id)
     return jsonify({'message': 'Invitation accepted, user added'})
 
 def reject_invitation(project_id, invite_id, user_id):
@@ -187,7 +193,6 @@ def reject_invitation(project_id, invite_id, user_id):
     if not inv:
         return jsonify({'error': 'Invitation not found'}), 404
     inv.status = 'rejected'
-    db.session.commit()
     # Notify all managers/admins
     managers = ProjectMember.query.filter(
         ProjectMember.project_id == project_id,
@@ -195,4 +200,5 @@ def reject_invitation(project_id, invite_id, user_id):
     ).all()
     for m in managers:
         create_notification(m.user_id, f"User {user_id} rejected invitation to project {project_id}.")
+    db.session.commit()
     return jsonify({'message': 'Invitation rejected'})
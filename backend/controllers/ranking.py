@@ -0,0 +1,162 @@
+import logging
+import queue
+import threading
+from flask import current_app
+from sqlalchemy import event, func, inspect, update
+from models.db import db
+from models.item import Item
+from models.board_column import BoardColumn
+from controllers.changes import next_change_seq
+
+logger = logging.getLogger(__name__)
+
+# Rank keys are base-36 strings compared byte-wise: a card sorts by
+# (column_id, rank), a column by (project_id, rank). Appends step a fixed-width
+# key forward; inserts take the midpoint of their neighbours, so a move only
+# rewrites the moved row. Midpoints grow the key by a character now and then,
+# and a background job respaces a column once its keys get longer than
+# REBALANCE_RANK_LENGTH.
+RANK_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+RANK_BASE = len(RANK_DIGITS)
+RANK_WIDTH = 6
+RANK_SPACE = RANK_BASE ** RANK_WIDTH
+RANK_STEP = RANK_BASE ** 3
+REBALANCE_RANK_LENGTH = 16
+MAX_RANK_LENGTH = 64  # Item.rank / BoardColumn.rank column width
+
+def _to_int(key):
+    value = 0
+    for ch in key[:RANK_WIDTH].ljust(RANK_WIDTH, '0'):
+        value = value * RANK_BASE + RANK_DIGITS.index(ch)
+    return value
+
+def _from_int(value):
+    digits = []
+    for _ in range(RANK_WIDTH):
+        value, digit = divmod(value, RANK_BASE)
+        digits.append(RANK_DIGITS[digit])
+    # Trailing zeros carry no order and would leave no room below the key
+    return ''.join(reversed(digits)).rstrip('0')
+
+def midpoint(a, b):
+    """A key strictly between a and b (b=None means unbounded); neither may end in '0'."""
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else '0') == b[n]:
+            n += 1
+        if n:
+            return b[:n] + midpoint(a[n:], b[n:])
+    lo = RANK_DIGITS.index(a[0]) if a else 0
+    hi = RANK_DIGITS.index(b[0]) if b else RANK_BASE
+    if hi - lo > 1:
+        return RANK_DIGITS[(lo + hi) // 2]
+    if b and len(b) > 1:
+        return b[0]
+    return RANK_DIGITS[lo] + midpoint(a[1:], None)
+
+def rank_between(before=None, after=None):
+    """Key for a row placed after `before` and before `after` (either may be None)."""
+    if before is None and after is None:
+        return _from_int(RANK_SPACE // 2)
+    if after is None:
+        value = _to_int(before) + RANK_STEP
+        return _from_int(value) if value < RANK_SPACE else midpoint(before, None)
+    if before is None:
+        value = _to_int(after) - RANK_STEP
+        return _from_int(value) if value > 0 else midpoint('', after)
+    if before >= after:
+        raise ValueError(f'Rank {before!r} is not before {after!r}')
+    return midpoint(before, after)
+
+def spread_ranks(count):
+    """count evenly spaced fixed-width keys, for seeding or respacing a column."""
+    step = RANK_SPACE // (count + 1)
+    return [_from_int(step * (i + 1)) for i in range(count)]
+
+def last_ranks(model, group_column, keys):
+    """Highest rank per group key, in one query."""
+    if not keys:
+        return {}
+    return dict(db.session.query(group_column, func.max(model.rank)).filter(group_column.in_(keys)).group_by(group_column))
+
+@event.listens_for(db.session, 'before_flush')
+def _assign_ranks(session, flush_context, instances):
+    """Append new rows, and cards moved to another column without a rank, at the end."""
+    pending = {Item: [], BoardColumn: []}
+    for obj in session.new:
+        if isinstance(obj, (Item, BoardColumn)) and obj.rank is None:
+            pending[type(obj)].append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Item) and obj.rank is not None:
+            attrs = inspect(obj).attrs
+            if attrs.column_id.history.has_changes() and not attrs.rank.history.has_changes():
+                pending[Item].append(obj)
+    for model, group in ((Item, 'column_id'), (BoardColumn, 'project_id')):
+        # New columns keep the order their legacy 'order' value asked for
+        objs = sorted((o for o in pending[model] if getattr(o, group) is not None), key=lambda o: getattr(o, 'order', None) or 0)
+        if not objs:
+            continue
+        with session.no_autoflush:
+            last = last_ranks(model, getattr(model, group), {getattr(o, group) for o in objs})
+        for obj in objs:
+            key = getattr(obj, group)
+            obj.rank = last[key] = rank_between(last.get(key))
+
+def rebalance_column(column_id):
+    """Respace the card ranks of a column; one executemany, one change_seq bump."""
+    column = db.session.query(BoardColumn.project_id).filter(BoardColumn.id == column_id).first()
+    if not column:
+        return 0
+    ids = [i for (i,) in db.session.query(Item.id).filter(Item.column_id == column_id).order_by(Item.rank, Item.id)]
+    if ids:
+        seq = next_change_seq(db.session.connection(), column.project_id)
+        db.session.execute(update(Item), [
+            {'id': item_id, 'rank': rank, 'change_seq': seq} for item_id, rank in zip(ids, spread_ranks(len(ids)))
+        ])
+    return len(ids)
+
+def rebalance_columns(project_id):
+    """Respace the column ranks of a project."""
+    ids = [c for (c,) in db.session.query(BoardColumn.id).filter(BoardColumn.project_id == project_id).order_by(BoardColumn.rank, BoardColumn.id)]
+    if ids:
+        next_change_seq(db.session.connection(), project_id)
+        db.session.execute(update(BoardColumn), [
+            {'id': column_id, 'rank': rank} for column_id, rank in zip(ids, spread_ranks(len(ids)))
+        ])
+    return len(ids)
+
+def long_rank_columns(threshold=REBALANCE_RANK_LENGTH):
+    """Ids of columns holding a card key longer than threshold."""
+    return [c for (c,) in db.session.query(Item.column_id).filter(func.length(Item.rank) > threshold).distinct()]
+
+# Background respacing: moves that produce a long key queue their column here
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+def schedule_rebalance(column_id):
+    global _worker
+    app = current_app._get_current_object()
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_drain, args=(app,), name='rank-rebalancer', daemon=True)
+            _worker.start()
+    _queue.put(column_id)
+
+def _drain(app):
+    while True:
+        column_ids = {_queue.get()}
+        while True:
+            try:
+                column_ids.add(_queue.get_nowait())
+            except queue.Empty:
+                break
+        with app.app_context():
+            for column_id in column_ids:
+                try:
+                    rebalance_column(column_id)
+                    db.session.commit()
+                except Exception:
+                    logger.exception('Failed to rebalance ranks of column %s', column_id)
+                    db.session.rollback()
+            db.session.remove()
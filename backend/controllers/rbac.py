@@ -1,47 +1,108 @@
+import time
+from collections import OrderedDict
 from functools import wraps
+from threading import Lock
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from controllers.jwt_utils import current_user_id
+from models.db import db
 from models.project_member import ProjectMember
 from models.role import Role
-from models.permission import Permission
+from models.permission import Permission, ACTION_BITS, mask_for, mask_has
 from models.item import Item
+from models.board_column import BoardColumn
+
+# Effective permission masks, keyed by (user_id, project_id) -> (role_id, mask, loaded_at).
+# Bounded LRU shared across requests; membership changes call invalidate_permissions().
+PERMISSION_CACHE_SIZE = 4096
+PERMISSION_CACHE_TTL = 60
+_permission_cache = OrderedDict()
+_permission_cache_lock = Lock()
+
+def load_permissions(user_id, project_id):
+    """Return (role_id, permission mask) for a member, or (None, 0) if not a member."""
+    row = db.session.query(ProjectMember.role_id, Role.permission_mask).join(
+        Role, Role.id == ProjectMember.role_id
+    ).filter(
+        ProjectMember.user_id == user_id,
+        ProjectMember.project_id == project_id
+    ).first()
+    if not row:
+        return None, 0
+    if row.permission_mask is not None:
+        return row.role_id, row.permission_mask
+    # Role created before the bitmask column was backfilled: compile its Permission rows
+    actions = db.session.query(Permission.action).filter(Permission.role_id == row.role_id)
+    return row.role_id, mask_for(a for (a,) in actions if a in ACTION_BITS)
+
+def get_permissions(user_id, project_id):
+    key = (int(user_id), int(project_id))
+    now = time.monotonic()
+    with _permission_cache_lock:
+        entry = _permission_cache.get(key)
+        if entry and now - entry[2] < PERMISSION_CACHE_TTL:
+            _permission_cache.move_to_end(key)
+            return entry[1]
+    role_id, mask = load_permissions(*key)
+    with _permission_cache_lock:
+        _permission_cache[key] = (role_id, mask, now)
+        _permission_cache.move_to_end(key)
+        while len(_permission_cache) > PERMISSION_CACHE_SIZE:
+            _permission_cache.popitem(last=False)
+    return mask
+
+def invalidate_permissions(user_id=None, project_id=None):
+    """Drop cached masks for a member, a whole project, or everything when called without arguments."""
+    with _permission_cache_lock:
+        if user_id is not None and project_id is not None:
+            _permission_cache.pop((int(user_id), int(project_id)), None)
+            return
+        for key in list(_permission_cache):
+            if (user_id is None or key[0] == int(user_id)) and (project_id is None or key[1] == int(project_id)):
+                del _permission_cache[key]
 
 def user_has_permission(user_id, project_id, action):
-    member = ProjectMember.query.filter_by(user_id=user_id, project_id=project_id).first()
-    if not member or not member.role:
-        return False
-    return any(p.action == action for p in member.role.permissions)
+    return mask_has(get_permissions(user_id, project_id), action)
+
+def can_modify_item(mask, user_id, action, own_action, item):
+    """Whether a member with this mask may apply action to item (any, or own as reporter/assignee)."""
+    if mask_has(mask, action):
+        return True
+    return mask_has(mask, own_action) and int(user_id) in (item.reporter_id, item.assignee_id)
 
 def require_project_permission(action, allow_own=None):
     def decorator(f):
-        @jwt_required()
         @wraps(f)
         def wrapper(*args, **kwargs):
-            user_id = get_jwt_identity()
+            user_id = current_user_id()
             if not user_id:
                 return jsonify({"error": "Unauthorized: No user ID found."}), 401
             project_id = kwargs.get('project_id') or (getattr(request, 'view_args', {}) or {}).get('project_id')
             item_id = kwargs.get('item_id') or (getattr(request, 'view_args', {}) or {}).get('item_id')
-            if not project_id and item_id:
-                item = Item.query.get(item_id)
-                if item:
-                    project_id = item.project_id
+            column_id = kwargs.get('column_id') or (getattr(request, 'view_args', {}) or {}).get('column_id')
+            if column_id and not project_id:
+                project_id = db.session.query(BoardColumn.project_id).filter(BoardColumn.id == column_id).scalar()
+            item = None
+            if item_id and (not project_id or allow_own):
+                # One lightweight lookup serves both the project resolution and the ownership check
+                item = db.session.query(Item.project_id, Item.reporter_id, Item.assignee_id).filter(Item.id == item_id).first()
+            if not project_id and item:
+                project_id = item.project_id
             if not project_id:
                 return jsonify({"error": "Project ID not found in request."}), 400
+            mask = get_permissions(user_id, project_id)
             # Check main permission
-            if user_has_permission(user_id, project_id, action):
+            if mask_has(mask, action):
                 return f(*args, **kwargs)
             # Check 'own' permission if allowed
             if allow_own:
                 own_action = allow_own if isinstance(allow_own, str) else action.replace('any', 'own')
-                if user_has_permission(user_id, project_id, own_action):
+                if mask_has(mask, own_action):
                     # Check if user is the owner (reporter or assignee) of the item
                     if item_id:
-                        item = Item.query.get(item_id)
                         if item and int(user_id) in [item.reporter_id, item.assignee_id]:
                             return f(*args, **kwargs)
                         else:
                             return jsonify({"error": "Forbidden: You are not the reporter or assignee of this item."}), 403
             return jsonify({"error": f"Forbidden: You lack '{action}' permission."}), 403
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
@@ -0,0 +1,107 @@
+from flask import request, session
+from flask_socketio import SocketIO, Namespace, ConnectionRefusedError, join_room, leave_room
+from sqlalchemy import event
+from models.db import db
+from models.permission import mask_has
+from models.project import Project
+from models.project_member import ProjectMember
+from models.role import Role
+from controllers.jwt_utils import decode_jwt, get_principal
+from controllers.rbac import user_has_permission
+
+# Clients connect to NAMESPACE with auth={'token': <jwt>} and land in their
+# user room; they then emit 'subscribe' with a project_id to join their room
+# for that project. Events are queued on the DB session and emitted only after
+# a successful commit. Project events are addressed just before the commit to
+# the members who may view tasks at that point, so a removed member or a
+# deleted project stops receiving them without touching any socket.
+NAMESPACE = '/realtime'
+PENDING_KEY = 'pending_realtime_events'
+VIEW_ACTION = 'view_tasks'
+
+socketio = SocketIO()
+
+def member_room(project_id, user_id):
+    return f'project:{project_id}:user:{user_id}'
+
+def user_room(user_id):
+    return f'user:{user_id}'
+
+def publish(room, name, payload):
+    db.session().info.setdefault(PENDING_KEY, []).append((room, None, name, payload))
+
+def publish_project(project_id, name, payload):
+    db.session().info.setdefault(PENDING_KEY, []).append((None, project_id, name, payload))
+
+def publish_user(user_id, name, payload):
+    publish(user_room(user_id), name, payload)
+
+def project_viewers(project_ids):
+    """{project_id: [user_id]} of the members who may view tasks; deleted projects have none."""
+    rows = db.session.query(ProjectMember.project_id, ProjectMember.user_id, Role.permission_mask).join(
+        Role, Role.id == ProjectMember.role_id
+    ).join(Project, Project.id == ProjectMember.project_id).filter(
+        ProjectMember.project_id.in_(project_ids), Project.deleted_at.is_(None)
+    )
+    viewers = {}
+    for project_id, user_id, mask in rows:
+        # A role without a backfilled mask goes through rbac, which compiles its Permission rows
+        allowed = mask_has(mask, VIEW_ACTION) if mask is not None else user_has_permission(user_id, project_id, VIEW_ACTION)
+        if allowed:
+            viewers.setdefault(project_id, []).append(user_id)
+    return viewers
+
+@event.listens_for(db.session, 'before_commit')
+def _address_pending(db_session):
+    pending = db_session.info.get(PENDING_KEY)
+    project_ids = {project_id for _, project_id, _, _ in pending or () if project_id is not None}
+    if not project_ids:
+        return
+    viewers = project_viewers(project_ids)
+    db_session.info[PENDING_KEY] = [
+        (room if project_id is None else [member_room(project_id, u) for u in viewers.get(project_id, ())], None, name, payload)
+        for room, project_id, name, payload in pending
+    ]
+
+@event.listens_for(db.session, 'after_commit')
+def _emit_pending(db_session):
+    pending = db_session.info.pop(PENDING_KEY, None)
+    if not pending or socketio.server is None:
+        return
+    for room, _, name, payload in pending:
+        if room:
+            socketio.emit(name, payload, to=room, namespace=NAMESPACE)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_pending(db_session, previous_transaction):
+    db_session.info.pop(PENDING_KEY, None)
+
+class RealtimeNamespace(Namespace):
+    def on_connect(self, auth=None):
+        token = (auth or {}).get('token') or request.args.get('token')
+        payload = decode_jwt(token) if token else None
+        user_id = payload and (payload.get('sub') or payload.get('user_id'))
+        if not user_id:
+            raise ConnectionRefusedError('Invalid or expired token')
+        if not get_principal(user_id):
+            raise ConnectionRefusedError('User not found')
+        session['user_id'] = int(user_id)
+        join_room(user_room(user_id))
+
+    def on_subscribe(self, data):
+        try:
+            project_id = int((data or {}).get('project_id'))
+        except (TypeError, ValueError):
+            return {'error': 'project_id required'}
+        if not user_has_permission(session['user_id'], project_id, VIEW_ACTION):
+            return {'error': "Forbidden: You lack 'view_tasks' permission."}
+        join_room(member_room(project_id, session['user_id']))
+        return {'subscribed': project_id}
+
+    def on_unsubscribe(self, data):
+        try:
+            project_id = int((data or {}).get('project_id'))
+        except (TypeError, ValueError):
+            return {'error': 'project_id required'}
+        leave_room(member_room(project_id, session['user_id']))
+        return {'unsubscribed': project_id}
@@ -1,9 +1,7 @@
 from flask import request, jsonify
 from models.project import Project
-from models.item import Item
-from models.project_member import ProjectMember
-from models.user import User
 from controllers.rbac import require_project_permission 
+from controllers.reporting import item_breakdown, member_directory, column_names
 
 @require_project_permission('view_tasks')
 def get_project_report(project_id):
@@ -11,27 +9,51 @@ def get_project_report(project_id):
     project = Project.query.get(project_id)
     if not project:
         return jsonify({'error': 'Project not found'}), 404
-    items = Item.query.filter_by(project_id=project_id).all()
-    members = ProjectMember.query.filter_by(project_id=project_id).all()
-    member_details = []
-    for m in members:
-        user = User.query.get(m.user_id)
-        if user:
-            member_details.append({
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'role': m.role.name if m.role else None
-            })
-    status_counts = {}
-    for item in items:
-        status_counts[item.status] = status_counts.get(item.status, 0) + 1
+    try:
+        days = int(request.args.get('days', 30))
+    except ValueError:
+        return jsonify({'error': 'Invalid days'}), 400
+    members = member_directory(project_id)
+    usernames = {m.id: m.username for m in members}
+    member_details = [{
+        'id': m.id,
+        'username': m.username,
+        'email': m.email,
+        'role': m.role
+    } for m in members]
+    breakdown = item_breakdown(project_id, throughput_days=days)
+    columns = column_names(project_id)
+    by_status = breakdown['by_status']
     report = {
-        'project': { 'id': project.id, 'name': project.name },
+        'project': { 'id': project.id, 'name': project.name, 'description': project.description },
         'members': member_details,
         'stats': {
-            'total': len(items),
-            'done': status_counts.get('done', 0),
+            'total': breakdown['total'],
+            'done': by_status.get('done', 0),
+            'inprogress': by_status.get('inprogress', 0),
+            'inreview': by_status.get('inreview', 0),
+            'todo': by_status.get('todo', 0),
+            'by_status': by_status,
+            'by_type': breakdown['by_type'],
+            'by_priority': {str(k) if k is not None else 'none': v for k, v in breakdown['by_priority'].items()},
+            'by_assignee': [{
+                'user_id': user_id,
+                'username': usernames.get(user_id),
+                **counts
+            } for user_id, counts in breakdown['by_assignee'].items()]
+        },
+        'throughput': {
+            'days': days,
+            'columns': [{
+                'id': column_id,
+                'name': columns.get(column_id),
+                **counts
+            } for column_id, counts in breakdown['by_column'].items()],
+            'assignees': [{
+                'user_id': user_id,
+                'username': usernames.get(user_id),
+                'done_recent': counts['done_recent']
+            } for user_id, counts in breakdown['by_assignee'].items()]
         }
     }
-    return jsonify({'report': report})
\ No newline at end of file
+    return jsonify({'report': report})
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, and_
+from models.db import db
+from models.item import Item
+from models.board_column import BoardColumn
+from models.project_member import ProjectMember
+from models.role import Role
+from models.user import User
+
+def item_breakdown(project_id, throughput_days=30):
+    """Aggregate a project's items in a single GROUP BY pass.
+
+    The result size depends on the number of distinct (status, type, priority,
+    assignee, column) combinations, not on the number of items. Items have no
+    completion timestamp, so 'done' items updated inside the window count as
+    throughput.
+    """
+    since = datetime.utcnow() - timedelta(days=throughput_days)
+    recent_done = func.sum(case((and_(Item.status == 'done', Item.updated_at >= since), 1), else_=0))
+    rows = db.session.query(
+        Item.status, Item.type, Item.priority, Item.assignee_id, Item.column_id,
+        func.count(Item.id), recent_done
+    ).filter(
+        Item.project_id == project_id
+    ).group_by(Item.status, Item.type, Item.priority, Item.assignee_id, Item.column_id).all()
+    breakdown = {'total': 0, 'by_status': {}, 'by_type': {}, 'by_priority': {}, 'by_assignee': {}, 'by_column': {}}
+    for status, type, priority, assignee_id, column_id, count, done_recent in rows:
+        done_recent = int(done_recent or 0)
+        breakdown['total'] += count
+        for key, value in (('by_status', status), ('by_type', type), ('by_priority', priority)):
+            breakdown[key][value] = breakdown[key].get(value, 0) + count
+        for key, value in (('by_assignee', assignee_id), ('by_column', column_id)):
+            entry = breakdown[key].setdefault(value, {'total': 0, 'open': 0, 'done_recent': 0})
+            entry['total'] += count
+            entry['done_recent'] += done_recent
+            if status != 'done':
+                entry['open'] += count
+    return breakdown
+
+def member_directory(project_id):
+    return db.session.query(
+        User.id, User.username, User.email, User.role.label('user_role'), Role.name.label('role')
+    ).join(
+        ProjectMember, ProjectMember.user_id == User.id
+    ).outerjoin(
+        Role, Role.id == ProjectMember.role_id
+    ).filter(ProjectMember.project_id == project_id).order_by(User.id).all()
+
+def column_names(project_id):
+    return dict(db.session.query(BoardColumn.id, BoardColumn.name).filter(BoardColumn.project_id == project_id).all())
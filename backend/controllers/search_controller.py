@@ -0,0 +1,119 @@
+import re
+from flask import request, jsonify
+from sqlalchemy import text
+from models.db import db
+from models.item import Item
+from models.comment import Comment
+from controllers.rbac import user_has_permission
+from controllers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+MAX_SEARCH_TERMS = 8
+SNIPPET_LENGTH = 160
+
+# Both queries return (kind, id, item_id, project_id, score, total), best match first.
+# :scope is the set of projects the caller may search, as a subquery on project_member.
+POSTGRES_SEARCH = """
+WITH query AS (SELECT to_tsquery('english', :terms) AS q),
+hits AS (
+    SELECT 'item' AS kind, i.id AS id, i.id AS item_id, i.project_id AS project_id,
+           ts_rank_cd(i.search_vector, query.q) AS score
+    FROM item i, query
+    WHERE i.search_vector @@ query.q AND i.project_id IN ({scope})
+    UNION ALL
+    SELECT 'comment', c.id, c.item_id, i.project_id, ts_rank_cd(c.search_vector, query.q)
+    FROM comment c JOIN item i ON i.id = c.item_id, query
+    WHERE c.search_vector @@ query.q AND i.project_id IN ({scope})
+)
+SELECT kind, id, item_id, project_id, score, count(*) OVER () AS total
+FROM hits ORDER BY score DESC, kind DESC, id DESC LIMIT :limit OFFSET :offset
+"""
+
+# bm25() is lower-is-better; title hits weigh most, like the A/B/C weights on PostgreSQL
+SQLITE_SEARCH = """
+WITH hits AS (
+    SELECT 'item' AS kind, i.id AS id, i.id AS item_id, i.project_id AS project_id,
+           -bm25(item_fts, 10.0, 4.0, 1.0) AS score
+    FROM item_fts JOIN item i ON i.id = item_fts.rowid
+    WHERE item_fts MATCH :terms AND i.project_id IN ({scope})
+    UNION ALL
+    SELECT 'comment', c.id, c.item_id, i.project_id, -bm25(comment_fts)
+    FROM comment_fts JOIN comment c ON c.id = comment_fts.rowid JOIN item i ON i.id = c.item_id
+    WHERE comment_fts MATCH :terms AND i.project_id IN ({scope})
+)
+SELECT kind, id, item_id, project_id, score, count(*) OVER () AS total
+FROM hits ORDER BY score DESC, kind DESC, id DESC LIMIT :limit OFFSET :offset
+"""
+
+def search_terms(q, dialect_name):
+    """Turn free text into an AND query of word tokens, the last one as a prefix.
+
+    Only \\w+ tokens are kept, so user input can never inject query operators.
+    """
+    words = re.findall(r'\w+', q)[:MAX_SEARCH_TERMS]
+    if not words:
+        return None
+    if dialect_name == 'postgresql':
+        return ' & '.join(words[:-1] + [words[-1] + ':*'])
+    return ' '.join([f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*'])
+
+def snippet(value):
+    value = ' '.join((value or '').split())
+    return value if len(value) <= SNIPPET_LENGTH else value[:SNIPPET_LENGTH - 1] + '…'
+
+def search():
+    dialect_name = db.session.get_bind().dialect.name
+    if dialect_name == 'postgresql':
+        statement = POSTGRES_SEARCH
+    elif dialect_name == 'sqlite':
+        statement = SQLITE_SEARCH
+    else:
+        return jsonify({'error': 'Search is not supported on this database'}), 501
+
+    terms = search_terms(request.args.get('q', ''), dialect_name)
+    if not terms:
+        return jsonify({'error': 'Search query is required'}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+        offset = max(0, int(request.args.get('offset', 0)))
+        project_id = request.args.get('project_id', type=int)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or offset'}), 400
+
+    user_id = request.user.id
+    params = {'terms': terms, 'limit': limit, 'offset': offset, 'user_id': user_id}
+    if project_id:
+        if not user_has_permission(user_id, project_id, 'view_tasks'):
+            return jsonify({'error': "Forbidden: You lack 'view_tasks' permission."}), 403
+        scope = ':project_id'
+        params['project_id'] = project_id
+    else:
+        scope = 'SELECT project_id FROM project_member WHERE user_id = :user_id'
+    hits = db.session.execute(text(statement.format(scope=scope)), params).all()
+
+    # Decorate only the page: one query for the items, one for the matching comments
+    items = {i.id: i for i in db.session.query(
+        Item.id, Item.title, Item.type, Item.status, Item.description
+    ).filter(Item.id.in_({h.item_id for h in hits}))} if hits else {}
+    comment_ids = [h.id for h in hits if h.kind == 'comment']
+    comments = dict(db.session.query(Comment.id, Comment.content).filter(
+        Comment.id.in_(comment_ids)
+    ).all()) if comment_ids else {}
+
+    results = []
+    for h in hits:
+        item = items.get(h.item_id)
+        if not item:
+            continue
+        results.append({
+            'type': h.kind,
+            'id': h.id,
+            'item_id': h.item_id,
+            'project_id': h.project_id,
+            'title': item.title,
+            'item_type': item.type,
+            'status': item.status,
+            'snippet': snippet(comments.get(h.id) if h.kind == 'comment' else item.description),
+            'score': round(float(h.score), 4)
+        })
+    total = hits[0].total if hits else 0
+    return jsonify({'results': results, 'total': total, 'limit': limit, 'offset': offset})
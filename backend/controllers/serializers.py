@@ -0,0 +1,118 @@
+from datetime import date
+from decimal import Decimal
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from models.activity_log import ActivityLog
+from models.comment import Comment
+from models.item import Item
+from controllers.activity import describe
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder is used without it
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() backend: orjson when installed, the stdlib encoder otherwise.
+
+    Both write dates and datetimes as ISO 8601, so schemas hand over raw
+    column values instead of calling isoformat() on every row.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        if isinstance(o, Decimal):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+    def _options(self, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+class InvalidFields(ValueError):
+    pass
+
+class Schema:
+    """Serializable fields of a model, each backed by a column of the same name.
+
+    Controllers select only the requested columns and dump the resulting rows,
+    so ?fields= trims the SQL column list as well as the payload. extra names
+    are read from the row as they are (labels the query adds, such as a joined
+    username); computed maps a name to a function of the row. Neither can be
+    requested with ?fields=.
+    """
+
+    def __init__(self, model, fields, extra=(), computed=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.extra = tuple(extra)
+        self.computed = dict(computed or {})
+        self.names = self.fields + self.extra + tuple(self.computed)
+
+    def requested(self, default):
+        """Field names from ?fields=a,b,c, or default when absent."""
+        raw = request.args.get('fields')
+        if not raw:
+            return list(default)
+        names = list(dict.fromkeys(n.strip() for n in raw.split(',') if n.strip()))
+        unknown = [n for n in names if n not in self.fields]
+        if unknown or not names:
+            raise InvalidFields(f"Invalid fields: {', '.join(unknown) or raw}")
+        return names
+
+    def columns(self, names, *required):
+        """Columns to select for names, plus any the query itself needs (id, sort key)."""
+        return [getattr(self.model, n) for n in dict.fromkeys(list(required) + list(names))]
+
+    def dump(self, row, names=None):
+        """The named fields of row, every field by default."""
+        computed = self.computed
+        return {n: computed[n](row) if n in computed else getattr(row, n) for n in (self.names if names is None else names)}
+
+    def dump_all(self, rows, names=None):
+        return [self.dump(row, names) for row in rows]
+
+ItemSchema = Schema(Item, (
+    'id', 'title', 'description', 'type', 'status', 'priority', 'severity', 'due_date',
+    'project_id', 'column_id', 'parent_id', 'story_points', 'rank', 'assignee_id', 'reporter_id',
+    'steps_to_reproduce', 'start_date', 'created_at', 'updated_at'
+))
+
+# The item page: its own columns, then its subtasks and comments
+ItemDetailSchema = Schema(Item, (
+    'id', 'title', 'description', 'status', 'priority', 'due_date', 'parent_id', 'assignee_id', 'reporter_id',
+    'type', 'story_points', 'column_id', 'created_at', 'updated_at'
+))
+
+# Subtasks, and the parent epic shown above an item
+SubtaskSchema = Schema(Item, ('id', 'title', 'status', 'priority', 'due_date'))
+
+CommentSchema = Schema(Comment, ('id', 'content', 'user_id', 'created_at'), extra=('author_name',))
+
+ActivitySchema = Schema(ActivityLog, ('id', 'item_id', 'user_id', 'action', 'changes', 'created_at'), computed={
+    'details': lambda log: describe(log.action, log.changes)
+})
+
+# A node of an epic tree; rows also carry child_count from the tree query
+TreeNodeSchema = Schema(Item, (
+    'id', 'parent_id', 'title', 'type', 'status', 'priority', 'assignee_id', 'due_date', 'story_points'
+), extra=('child_count',))
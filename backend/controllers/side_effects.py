@@ -0,0 +1,108 @@
+import logging
+import queue
+import threading
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, insert
+from models.db import db
+from models.activity_log import ActivityLog
+from models.notification import Notification
+from controllers.stats import notifications_added
+
+logger = logging.getLogger(__name__)
+
+# Activity-log and notification rows recorded during a unit of work are kept on
+# the session and written with one executemany per table when it commits.
+# SIDE_EFFECTS_MODE='inline' (default) writes them inside the committing
+# transaction; 'queue' hands them to a background writer after the commit.
+PENDING_KEY = 'pending_side_effects'
+QUEUE_BATCH_SIZE = 1000
+
+def _pending(session):
+    return session.info.setdefault(PENDING_KEY, {ActivityLog: [], Notification: []})
+
+def record_activity(item_id, user_id, action, changes=None):
+    _pending(db.session())[ActivityLog].append({
+        'item_id': item_id,
+        'user_id': user_id,
+        'action': action,
+        'changes': changes,
+        'created_at': datetime.utcnow()
+    })
+
+def record_notification(user_id, message):
+    row = {
+        'user_id': user_id,
+        'message': message,
+        'is_read': False,
+        'created_at': datetime.utcnow()
+    }
+    _pending(db.session())[Notification].append(row)
+    return row
+
+def _take(session):
+    pending = session.info.pop(PENDING_KEY, None) or {}
+    return {model: rows for model, rows in pending.items() if rows}
+
+def _write(session, batches):
+    for model, rows in batches.items():
+        session.execute(insert(model), rows)
+    if Notification in batches:
+        notifications_added(Counter(row['user_id'] for row in batches[Notification]))
+
+def _queue_mode():
+    return current_app.config.get('SIDE_EFFECTS_MODE') == 'queue'
+
+@event.listens_for(db.session, 'before_commit')
+def _write_inline(session):
+    if PENDING_KEY in session.info and not _queue_mode():
+        batches = _take(session)
+        if batches:
+            _write(session, batches)
+
+@event.listens_for(db.session, 'after_commit')
+def _hand_off(session):
+    if PENDING_KEY in session.info and _queue_mode():
+        batches = _take(session)
+        if batches:
+            _enqueue(current_app._get_current_object(), batches)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+def _enqueue(app, batches):
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_drain, args=(app,), name='side-effects-writer', daemon=True)
+            _worker.start()
+    _queue.put(batches)
+
+def _drain(app):
+    while True:
+        merged = {}
+        batches = _queue.get()
+        while True:
+            for model, rows in batches.items():
+                merged.setdefault(model, []).extend(rows)
+            if sum(len(rows) for rows in merged.values()) >= QUEUE_BATCH_SIZE:
+                break
+            try:
+                batches = _queue.get_nowait()
+            except queue.Empty:
+                break
+        with app.app_context():
+            try:
+                _write(db.session, merged)
+                db.session.commit()
+            except Exception:
+                logger.exception('Failed to write %d queued side-effect rows', sum(len(rows) for rows in merged.values()))
+                db.session.rollback()
+            finally:
+                db.session.remove()
@@ -0,0 +1,188 @@
+from sqlalchemy import bindparam, func, update
+from models.db import db, dialect_insert
+from models.item import Item
+from models.project import Project
+from models.project_member import ProjectMember
+from models.team_member import TeamMember
+from models.notification import Notification
+from models.user import User
+from models.stats import ProjectStats, UserStats
+
+# Counter rows are created on the write path, when a user or project is created
+# (or by 'flask reconcile-stats' for older data); writes only adjust rows that
+# already exist, inside the caller's transaction. Reads never write: a missing
+# row is counted from the source tables, so it is never wrong, just slower.
+STATUS_COUNTERS = ('todo', 'inprogress', 'inreview', 'done')
+
+def _bump(model, key_column, key, deltas):
+    values = {name: getattr(model, name) + delta for name, delta in deltas.items() if delta}
+    if key is None or not values:
+        return
+    db.session.execute(update(model).where(key_column == key).values(**values))
+
+class StatsBatch:
+    """Counter deltas accumulated over item writes; apply() issues one UPDATE per counter row."""
+
+    def __init__(self, project_id):
+        self.project_id = project_id
+        self.project_deltas = {}
+        self.user_deltas = {}
+
+    def _add(self, deltas, key, delta):
+        deltas[key] = deltas.get(key, 0) + delta
+
+    def item_added(self, status, reporter_id, assignee_id, sign=1):
+        self._add(self.project_deltas, 'total', sign)
+        if status in STATUS_COUNTERS:
+            self._add(self.project_deltas, status, sign)
+        for user_id in {reporter_id, assignee_id}:
+            if user_id is not None:
+                self._add(self.user_deltas, user_id, sign)
+
+    def item_removed(self, status, reporter_id, assignee_id):
+        self.item_added(status, reporter_id, assignee_id, sign=-1)
+
+    def item_changed(self, reporter_id, old_status, new_status, old_assignee_id, new_assignee_id):
+        if old_status != new_status:
+            if old_status in STATUS_COUNTERS:
+                self._add(self.project_deltas, old_status, -1)
+            if new_status in STATUS_COUNTERS:
+                self._add(self.project_deltas, new_status, 1)
+        if old_assignee_id != new_assignee_id:
+            # The reporter counts the item once whether or not they are also the assignee
+            if old_assignee_id is not None and old_assignee_id != reporter_id:
+                self._add(self.user_deltas, old_assignee_id, -1)
+            if new_assignee_id is not None and new_assignee_id != reporter_id:
+                self._add(self.user_deltas, new_assignee_id, 1)
+
+    def apply(self):
+        _bump(ProjectStats, ProjectStats.project_id, self.project_id, self.project_deltas)
+        for user_id, delta in self.user_deltas.items():
+            _bump(UserStats, UserStats.user_id, user_id, {'task_count': delta})
+
+def item_added(project_id, status, reporter_id, assignee_id):
+    batch = StatsBatch(project_id)
+    batch.item_added(status, reporter_id, assignee_id)
+    batch.apply()
+
+def item_removed(project_id, status, reporter_id, assignee_id):
+    batch = StatsBatch(project_id)
+    batch.item_removed(status, reporter_id, assignee_id)
+    batch.apply()
+
+def item_changed(project_id, reporter_id, old_status, new_status, old_assignee_id, new_assignee_id):
+    batch = StatsBatch(project_id)
+    batch.item_changed(reporter_id, old_status, new_status, old_assignee_id, new_assignee_id)
+    batch.apply()
+
+def project_membership_changed(user_id, delta):
+    _bump(UserStats, UserStats.user_id, user_id, {'project_count': delta})
+
+def project_memberships_changed(counts):
+    """counts: {user_id: change in project memberships}; one executemany for all users."""
+    table = UserStats.__table__
+    params = [{'key': user_id, 'delta': delta} for user_id, delta in counts.items() if delta]
+    if params:
+        db.session.execute(
+            update(table).where(table.c.user_id == bindparam('key')).values(project_count=table.c.project_count + bindparam('delta')),
+            params
+        )
+
+def team_membership_changed(user_id, delta):
+    _bump(UserStats, UserStats.user_id, user_id, {'team_count': delta})
+
+def notifications_added(counts):
+    """counts: {user_id: number of new unread notifications}."""
+    for user_id, count in counts.items():
+        _bump(UserStats, UserStats.user_id, user_id, {'unread_notifications': count})
+
+def notifications_read(user_id, count):
+    _bump(UserStats, UserStats.user_id, user_id, {'unread_notifications': -count})
+
+def compute_project_stats(project_ids=None):
+    query = db.session.query(Item.project_id, Item.status, func.count(Item.id))
+    if project_ids is not None:
+        query = query.filter(Item.project_id.in_(project_ids))
+    counts = {}
+    for project_id, status, count in query.group_by(Item.project_id, Item.status):
+        entry = counts.setdefault(project_id, dict.fromkeys(('total',) + STATUS_COUNTERS, 0))
+        entry['total'] += count
+        if status in STATUS_COUNTERS:
+            entry[status] += count
+    return counts
+
+def compute_user_stats(user_ids=None):
+    def grouped(column, *criteria):
+        query = db.session.query(column, func.count()).filter(*criteria)
+        if user_ids is not None:
+            query = query.filter(column.in_(user_ids))
+        return query.group_by(column).all()
+    counts = {}
+    def add(rows, field):
+        for user_id, count in rows:
+            entry = counts.setdefault(user_id, {'project_count': 0, 'task_count': 0, 'team_count': 0, 'unread_notifications': 0})
+            entry[field] += count
+    add(grouped(ProjectMember.user_id), 'project_count')
+    add(grouped(TeamMember.user_id), 'team_count')
+    add(grouped(Item.reporter_id), 'task_count')
+    add(grouped(Item.assignee_id, Item.assignee_id != Item.reporter_id), 'task_count')
+    add(grouped(Notification.user_id, Notification.is_read == False), 'unread_notifications')
+    return counts
+
+def _counter_values(model, keys, compute):
+    key_name = model.__mapper__.primary_key[0].key
+    fields = [c.key for c in model.__table__.columns if c.key not in (key_name, 'updated_at')]
+    computed = compute(keys)
+    return [dict(dict.fromkeys(fields, 0), **computed.get(key, {}), **{key_name: key}) for key in keys]
+
+def _create(model, keys, compute):
+    """Insert counter rows computed from the source tables, in the caller's transaction; existing rows are kept."""
+    keys = [key for key in keys if key is not None]
+    if keys:
+        insert = dialect_insert(model)
+        db.session.execute(
+            insert.on_conflict_do_nothing(index_elements=[model.__mapper__.primary_key[0].key]),
+            _counter_values(model, keys, compute)
+        )
+
+def create_project_stats(project_ids):
+    _create(ProjectStats, project_ids, compute_project_stats)
+
+def create_user_stats(user_ids):
+    _create(UserStats, user_ids, compute_user_stats)
+
+def _load(model, key, compute):
+    stats = model.query.get(key)
+    if stats is not None:
+        return stats
+    # Not created yet: count it now, unsaved, and leave storing it to the write path
+    return model(**_counter_values(model, [key], compute)[0])
+
+def get_project_stats(project_id):
+    return _load(ProjectStats, project_id, compute_project_stats)
+
+def get_user_stats(user_id):
+    return _load(UserStats, user_id, compute_user_stats)
+
+def reconcile_stats():
+    """Recompute every counter row from the source tables, fix it, and return the drift found."""
+    drift = []
+    for model, key_name, keys, expected, fields in (
+        (ProjectStats, 'project_id', [p for (p,) in db.session.query(Project.id)], compute_project_stats(), ('total',) + STATUS_COUNTERS),
+        (UserStats, 'user_id', [u for (u,) in db.session.query(User.id)], compute_user_stats(), ('project_count', 'task_count', 'team_count', 'unread_notifications')),
+    ):
+        stored = {getattr(s, key_name): s for s in model.query.all()}
+        for key in keys:
+            values = expected.get(key, {})
+            stats = stored.get(key)
+            if stats is None:
+                db.session.add(model(**{key_name: key}, **values))
+                continue
+            for field in fields:
+                actual = getattr(stats, field)
+                wanted = values.get(field, 0)
+                if actual != wanted:
+                    drift.append({'table': model.__tablename__, key_name: key, 'field': field, 'stored': actual, 'expected': wanted})
+                    setattr(stats, field, wanted)
+    db.session.commit()
+    return drift
@@ -1,51 +1,63 @@
 from models.db import db
 from models import User, Team, Project, ProjectMember, BoardColumn, Item, Comment, TeamMember, ProjectTeam, ActivityLog, Notification, Role, Permission
+from models.permission import ACTION_BITS, mask_for
+from controllers import stats
+from controllers.jwt_utils import invalidate_principal
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
 from flask import current_app
 
+ROLE_DEFS = {
+    'admin': [
+        'view_tasks', 'create_task', 'edit_any_task', 'edit_own_task', 'delete_any_task', 'delete_own_task',
+        'manage_project', 'add_remove_members', 'change_roles', 'view_project_settings', 'delete_project', 'transfer_admin',
+        'add_comment', 'edit_any_comment', 'delete_any_comment'
+    ],
+    'manager': [
+        'view_tasks', 'create_task', 'edit_any_task', 'edit_own_task', 'delete_any_task', 'delete_own_task',
+        'manage_project', 'add_remove_members', 'change_roles', 'view_project_settings',
+        'add_comment', 'edit_any_comment', 'delete_any_comment'
+    ],
+    'member': [
+        'view_tasks', 'create_task', 'edit_own_task', 'delete_own_task', 'view_project_settings',
+        'add_comment', 'edit_own_comment'
+    ],
+    'visitor': [
+        'view_tasks', 'view_project_settings'
+    ]
+}
+ROLE_MASKS = {name: mask_for(actions) for name, actions in ROLE_DEFS.items()}
+
 def create_roles_and_permissions(project=None):
-    role_defs = {
-        'admin': [
-            'view_tasks', 'create_task', 'edit_any_task', 'edit_own_task', 'delete_any_task', 'delete_own_task',
-            'manage_project', 'add_remove_members', 'change_roles', 'view_project_settings', 'delete_project', 'transfer_admin',
-            'add_comment', 'edit_any_comment', 'delete_any_comment'
-        ],
-        'manager': [
-            'view_tasks', 'create_task', 'edit_any_task', 'edit_own_task', 'delete_any_task', 'delete_own_task',
-            'manage_project', 'add_remove_members', 'change_roles', 'view_project_settings',
-            'add_comment', 'edit_any_comment', 'delete_any_comment'
-        ],
-        'member': [
-            'view_tasks', 'create_task', 'edit_own_task', 'delete_own_task', 'view_project_settings',
-            'add_comment', 'edit_own_comment'
-        ],
-        'visitor': [
-            'view_tasks', 'view_project_settings'
-        ]
+    roles = {
+        name: Role(name=name, project_id=project.id if project else None, permission_mask=mask)
+        for name, mask in ROLE_MASKS.items()
     }
-    roles = {}
-    for role_name, actions in role_defs.items():
-        role = Role(name=role_name, project_id=project.id if project else None)
-        db.session.add(role)
-        db.session.flush()
-        for action in actions:
-            perm = Permission(action=action, role_id=role.id)
-            db.session.add(perm)
-        roles[role_name] = role
+    db.session.add_all(roles.values())
     db.session.commit()
     return roles
 
+def backfill_permission_masks():
+    """Compile legacy Permission rows into Role.permission_mask for roles that predate the bitmask column."""
+    roles = Role.query.filter(Role.permission_mask.is_(None)).all()
+    for role in roles:
+        role.permission_mask = mask_for(p.action for p in role.permissions if p.action in ACTION_BITS)
+    db.session.commit()
+    return len(roles)
+
 def reset_and_seed_db():
     with current_app.app_context():
         db.drop_all()
         db.create_all()
+        invalidate_principal()
 
+        # One hash for all demo users; each generate_password_hash call costs a full key derivation
+        password_hash = generate_password_hash('password')
         users = [
-            User(username='alice', email='alice@example.com', password_hash=generate_password_hash('password'), role='member'),
-            User(username='bob', email='bob@example.com', password_hash=generate_password_hash('password'), role='member'),
-            User(username='carol', email='carol@example.com', password_hash=generate_password_hash('password'), role='member'),
-            User(username='dave', email='dave@example.com', password_hash=generate_password_hash('password'), role='visitor'),
+            User(username='alice', email='alice@example.com', password_hash=password_hash, role='member'),
+            User(username='bob', email='bob@example.com', password_hash=password_hash, role='member'),
+            User(username='carol', email='carol@example.com', password_hash=password_hash, role='member'),
+            User(username='dave', email='dave@example.com', password_hash=password_hash, role='visitor'),
         ]
         db.session.add_all(users)
         db.session.commit()
@@ -93,11 +105,13 @@ def reset_and_seed_db():
             Notification(user_id=users[2].id, message='You have been assigned a new task.', is_read=False)
         ])
         db.session.add_all([
-            ActivityLog(item_id=item1.id, user_id=users[0].id, action='created', details='Created task', created_at=datetime.utcnow()),
-            ActivityLog(item_id=item2.id, user_id=users[1].id, action='created', details='Created task', created_at=datetime.utcnow())
+            ActivityLog(item_id=item1.id, user_id=users[0].id, action='created', changes={'title': [None, item1.title]}, created_at=datetime.utcnow()),
+            ActivityLog(item_id=item2.id, user_id=users[1].id, action='created', changes={'title': [None, item2.title]}, created_at=datetime.utcnow())
         ])
 
         db.session.add(ProjectTeam(project_id=project.id, team_id=team.id))
+        stats.create_user_stats([u.id for u in users])
+        stats.create_project_stats([project.id])
         db.session.commit()
 
         print("✅ Demo database seeded successfully.")
@@ -0,0 +1,41 @@
+"""Cooperative database I/O for the eventlet serving mode.
+
+Under `gunicorn -k eventlet` every request runs in a green thread, and the
+worker monkey-patches the standard library before loading the app. psycopg2
+is a C extension, so it would still block the whole worker while a query
+runs. Installing a wait callback makes it poll the socket through the
+eventlet hub instead, and other requests run meanwhile.
+
+psycopg2 refuses COPY in this mode. That only affects code run inside a
+green worker; CLI commands never patch.
+"""
+import sys
+
+def green_mode_active():
+    """True inside an eventlet worker (or any process that monkey-patched sockets)."""
+    if 'eventlet' not in sys.modules:
+        return False
+    from eventlet import patcher
+    return patcher.is_monkey_patched('socket')
+
+def patch_psycopg():
+    try:
+        from psycopg2 import extensions, OperationalError
+    except ImportError:
+        return False
+    from eventlet.hubs import trampoline
+
+    def eventlet_wait_callback(conn, timeout=-1):
+        while True:
+            state = conn.poll()
+            if state == extensions.POLL_OK:
+                break
+            elif state == extensions.POLL_READ:
+                trampoline(conn.fileno(), read=True)
+            elif state == extensions.POLL_WRITE:
+                trampoline(conn.fileno(), write=True)
+            else:
+                raise OperationalError(f'Bad result from poll: {state!r}')
+
+    extensions.set_wait_callback(eventlet_wait_callback)
+    return True
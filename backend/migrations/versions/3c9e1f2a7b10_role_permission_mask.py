@@ -0,0 +1,26 @@
+"""role permission mask
+
+Revision ID: 3c9e1f2a7b10
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e1f2a7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('role', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('permission_mask', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('role', schema=None) as batch_op:
+        batch_op.drop_column('permission_mask')
@@ -0,0 +1,97 @@
+"""cascading deletes and project soft delete
+
+Revision ID: 7e3c1a9d5b26
+Revises: d6f2b9a4c1e3
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e3c1a9d5b26'
+down_revision = 'd6f2b9a4c1e3'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table, ON DELETE action)
+FOREIGN_KEYS = [
+    ('item', 'project_id', 'project', 'CASCADE'),
+    ('item', 'parent_id', 'item', 'SET NULL'),
+    ('board_column', 'project_id', 'project', 'CASCADE'),
+    ('project_member', 'project_id', 'project', 'CASCADE'),
+    ('project_join_request', 'project_id', 'project', 'CASCADE'),
+    ('project_team', 'project_id', 'project', 'CASCADE'),
+    ('role', 'project_id', 'project', 'CASCADE'),
+    ('permission', 'role_id', 'role', 'CASCADE'),
+    ('comment', 'item_id', 'item', 'CASCADE'),
+    ('activity_log', 'item_id', 'item', 'CASCADE'),
+]
+
+# SQLite reports these foreign keys unnamed; batch mode names them by this convention
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+# SQLite batch mode rebuilds item and comment, which drops the full-text search
+# triggers from e4a9c7d2b815; they are put back after the rebuild.
+SQLITE_SEARCH_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS item_fts_ai AFTER INSERT ON item BEGIN
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_ad AFTER DELETE ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_au AFTER UPDATE OF title, description, steps_to_reproduce ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comment_fts_ai AFTER INSERT ON comment BEGIN
+        INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comment_fts_ad AFTER DELETE ON comment BEGIN
+        INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comment_fts_au AFTER UPDATE OF content ON comment BEGIN
+        INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+]
+
+
+def fk_name(postgres, table, column, referred):
+    return f'{table}_{column}_fkey' if postgres else f'fk_{table}_{column}_{referred}'
+
+
+def replace_foreign_keys(cascade):
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    tables = {}
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        tables.setdefault(table, []).append((column, referred, ondelete))
+    for table, keys in tables.items():
+        with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            for column, referred, ondelete in keys:
+                name = fk_name(postgres, table, column, referred)
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete if cascade else None)
+    if not postgres:
+        for statement in SQLITE_SEARCH_TRIGGERS:
+            op.execute(statement)
+
+
+def upgrade():
+    replace_foreign_keys(cascade=True)
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_project_deleted_at', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    # Projects still waiting to be purged would reappear; run 'flask purge-projects' first
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_deleted_at')
+        batch_op.drop_column('deleted_at')
+    replace_foreign_keys(cascade=False)
@@ -0,0 +1,49 @@
+"""hot path indexes
+
+Revision ID: 8d4b6a0e52c3
+Revises: 3c9e1f2a7b10
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4b6a0e52c3'
+down_revision = '3c9e1f2a7b10'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_item_project_status', 'item', ['project_id', 'status'], {}),
+    ('ix_item_project_type', 'item', ['project_id', 'type'], {}),
+    ('ix_item_assignee_id', 'item', ['assignee_id'], {}),
+    ('ix_item_reporter_id', 'item', ['reporter_id'], {}),
+    ('ix_item_parent_id', 'item', ['parent_id'], {}),
+    ('ix_activity_log_item_created', 'activity_log', ['item_id', 'created_at'], {}),
+    ('ix_notification_user_created', 'notification', ['user_id', 'created_at'], {}),
+    ('ix_notification_user_unread', 'notification', ['user_id', 'created_at'], {
+        'postgresql_where': sa.text('is_read = false'),
+        'sqlite_where': sa.text('is_read = 0'),
+    }),
+    ('ix_project_member_project_id', 'project_member', ['project_id'], {}),
+    ('ix_project_join_request_project_type_status', 'project_join_request', ['project_id', 'type', 'status'], {}),
+    ('ix_project_join_request_user_type_status', 'project_join_request', ['user_id', 'type', 'status'], {}),
+    ('ix_comment_item_id', 'comment', ['item_id'], {}),
+    ('ix_board_column_project_order', 'board_column', ['project_id', 'order'], {}),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL;
+    # it avoids holding a write lock on item/notification while the index builds.
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""per-item byte ranges in activity segments
+
+Revision ID: a7c2e5f1d083
+Revises: b4d8f0e6a2c9
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e5f1d083'
+down_revision = 'b4d8f0e6a2c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing segments keep NULLs and are still read whole
+    with op.batch_alter_table('activity_segment_item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('byte_offset', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('byte_length', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('first_id', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('last_id', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('activity_segment_item', schema=None) as batch_op:
+        batch_op.drop_column('last_id')
+        batch_op.drop_column('first_id')
+        batch_op.drop_column('byte_length')
+        batch_op.drop_column('byte_offset')
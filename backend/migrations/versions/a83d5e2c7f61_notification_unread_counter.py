@@ -0,0 +1,39 @@
+"""notification unread counter
+
+Revision ID: a83d5e2c7f61
+Revises: f19b3e6c8a42
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a83d5e2c7f61'
+down_revision = 'f19b3e6c8a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unread_notifications', sa.Integer(), server_default='0', nullable=False))
+
+    # Seed counters for rows that already exist; missing rows are computed on first read
+    user_stats = sa.table('user_stats', sa.column('user_id'), sa.column('unread_notifications'))
+    notification = sa.table('notification', sa.column('user_id'), sa.column('is_read'))
+    op.execute(user_stats.update().values(unread_notifications=sa.select(sa.func.count()).where(
+        notification.c.user_id == user_stats.c.user_id, notification.c.is_read == sa.false()
+    ).scalar_subquery()))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notification_read_created', 'notification', ['created_at'], postgresql_concurrently=True,
+                        postgresql_where=sa.text('is_read = true'), sqlite_where=sa.text('is_read = 1'))
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notification_read_created', table_name='notification', postgresql_concurrently=True)
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.drop_column('unread_notifications')
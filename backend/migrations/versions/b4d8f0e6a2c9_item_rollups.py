@@ -0,0 +1,66 @@
+"""story points and cached item rollups
+
+Revision ID: b4d8f0e6a2c9
+Revises: 7e3c1a9d5b26
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d8f0e6a2c9'
+down_revision = '7e3c1a9d5b26'
+branch_labels = None
+depends_on = None
+
+
+# SQLite batch mode rebuilds the item table, which drops the full-text search
+# triggers from e4a9c7d2b815; they are put back after the downgrade rebuilds it.
+SQLITE_ITEM_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS item_fts_ai AFTER INSERT ON item BEGIN
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_ad AFTER DELETE ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_au AFTER UPDATE OF title, description, steps_to_reproduce ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+]
+
+
+def restore_search_triggers():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SQLITE_ITEM_TRIGGERS:
+            op.execute(statement)
+
+
+def upgrade():
+    # A plain ADD COLUMN: SQLite does not rebuild item, so its search triggers stay
+    op.add_column('item', sa.Column('story_points', sa.Integer(), nullable=True))
+    op.create_table('item_rollup',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('leaves_total', sa.Integer(), nullable=False),
+    sa.Column('leaves_done', sa.Integer(), nullable=False),
+    sa.Column('story_points', sa.Integer(), nullable=False),
+    sa.Column('story_points_done', sa.Integer(), nullable=False),
+    sa.Column('earliest_due_date', sa.Date(), nullable=True),
+    sa.Column('latest_due_date', sa.Date(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['item.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('item_id')
+    )
+
+
+def downgrade():
+    op.drop_table('item_rollup')
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.drop_column('story_points')
+    restore_search_triggers()
@@ -0,0 +1,44 @@
+"""project and user stats
+
+Revision ID: b71f3d9c4e28
+Revises: 8d4b6a0e52c3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71f3d9c4e28'
+down_revision = '8d4b6a0e52c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_stats',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('todo', sa.Integer(), nullable=False),
+    sa.Column('inprogress', sa.Integer(), nullable=False),
+    sa.Column('inreview', sa.Integer(), nullable=False),
+    sa.Column('done', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('project_count', sa.Integer(), nullable=False),
+    sa.Column('task_count', sa.Integer(), nullable=False),
+    sa.Column('team_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_stats')
+    op.drop_table('project_stats')
@@ -0,0 +1,45 @@
+"""item change sequence
+
+Revision ID: c52a8e1d9f47
+Revises: b71f3d9c4e28
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52a8e1d9f47'
+down_revision = 'b71f3d9c4e28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.create_index('ix_item_project_change_seq', ['project_id', 'change_seq'], unique=False)
+    op.create_table('item_tombstone',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('item_id')
+    )
+    with op.batch_alter_table('item_tombstone', schema=None) as batch_op:
+        batch_op.create_index('ix_item_tombstone_project_change_seq', ['project_id', 'change_seq'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('item_tombstone', schema=None) as batch_op:
+        batch_op.drop_index('ix_item_tombstone_project_change_seq')
+    op.drop_table('item_tombstone')
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.drop_index('ix_item_project_change_seq')
+        batch_op.drop_column('change_seq')
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_column('change_seq')
@@ -0,0 +1,135 @@
+"""partitioned activity log
+
+Revision ID: d6f2b9a4c1e3
+Revises: a83d5e2c7f61
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6f2b9a4c1e3'
+down_revision = 'a83d5e2c7f61'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 2
+
+# Snapshot of models/partitions.py at this revision
+PARTITION_DDL = [
+    "ALTER TABLE activity_log RENAME TO activity_log_unpartitioned",
+    "ALTER TABLE activity_log_unpartitioned RENAME CONSTRAINT activity_log_pkey TO activity_log_unpartitioned_pkey",
+    "ALTER INDEX ix_activity_log_item_created RENAME TO ix_activity_log_unpartitioned_item_created",
+    "ALTER INDEX ix_activity_log_created RENAME TO ix_activity_log_unpartitioned_created",
+    "CREATE TABLE activity_log (LIKE activity_log_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)",
+    "ALTER TABLE activity_log ADD CONSTRAINT activity_log_pkey PRIMARY KEY (id, created_at)",
+    "ALTER TABLE activity_log ADD CONSTRAINT activity_log_item_id_fkey FOREIGN KEY (item_id) REFERENCES item (id)",
+    'ALTER TABLE activity_log ADD CONSTRAINT activity_log_user_id_fkey FOREIGN KEY (user_id) REFERENCES "user" (id)',
+    "CREATE INDEX ix_activity_log_item_created ON activity_log (item_id, created_at)",
+    "CREATE INDEX ix_activity_log_created ON activity_log USING brin (created_at)",
+    "CREATE TABLE activity_log_default PARTITION OF activity_log DEFAULT",
+]
+
+UNPARTITION_DDL = [
+    "ALTER TABLE activity_log RENAME TO activity_log_partitioned",
+    "ALTER TABLE activity_log_partitioned RENAME CONSTRAINT activity_log_pkey TO activity_log_partitioned_pkey",
+    "ALTER INDEX ix_activity_log_item_created RENAME TO ix_activity_log_partitioned_item_created",
+    "ALTER INDEX ix_activity_log_created RENAME TO ix_activity_log_partitioned_created",
+    "CREATE TABLE activity_log (LIKE activity_log_partitioned INCLUDING DEFAULTS)",
+    "ALTER TABLE activity_log ADD CONSTRAINT activity_log_pkey PRIMARY KEY (id)",
+    "ALTER TABLE activity_log ADD CONSTRAINT activity_log_item_id_fkey FOREIGN KEY (item_id) REFERENCES item (id)",
+    'ALTER TABLE activity_log ADD CONSTRAINT activity_log_user_id_fkey FOREIGN KEY (user_id) REFERENCES "user" (id)',
+    "CREATE INDEX ix_activity_log_item_created ON activity_log (item_id, created_at)",
+    "CREATE INDEX ix_activity_log_created ON activity_log USING brin (created_at)",
+    "INSERT INTO activity_log SELECT * FROM activity_log_partitioned",
+    "ALTER SEQUENCE activity_log_id_seq OWNED BY activity_log.id",
+    "DROP TABLE activity_log_partitioned",
+]
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition(bind):
+    for statement in PARTITION_DDL:
+        bind.exec_driver_sql(statement)
+    months = {datetime(m.year, m.month, 1) for m in bind.exec_driver_sql(
+        "SELECT DISTINCT date_trunc('month', created_at) FROM activity_log_unpartitioned"
+    ).scalars()}
+    now = datetime.utcnow()
+    months.update(add_months(datetime(now.year, now.month, 1), offset) for offset in range(MONTHS_AHEAD + 1))
+    for month in sorted(months):
+        bind.exec_driver_sql(
+            f"CREATE TABLE activity_log_{month:%Y_%m} PARTITION OF activity_log "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+        )
+    bind.exec_driver_sql("INSERT INTO activity_log SELECT * FROM activity_log_unpartitioned")
+    bind.exec_driver_sql("ALTER SEQUENCE activity_log_id_seq OWNED BY activity_log.id")
+    bind.exec_driver_sql("DROP TABLE activity_log_unpartitioned")
+
+
+def upgrade():
+    bind = op.get_bind()
+    postgres = bind.dialect.name == 'postgresql'
+    with op.batch_alter_table('activity_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('changes', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True))
+
+    # Free-text details become {"note": details}; the API still renders them as before
+    build = 'jsonb_build_object' if postgres else 'json_object'
+    op.execute(f"UPDATE activity_log SET changes = {build}('note', details) WHERE details IS NOT NULL")
+    op.execute("UPDATE activity_log SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+
+    with op.batch_alter_table('activity_log', schema=None) as batch_op:
+        batch_op.drop_column('details')
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_activity_log_created', ['created_at'], unique=False, postgresql_using='brin')
+
+    op.create_table('activity_segment',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('period_start', sa.DateTime(), nullable=False),
+    sa.Column('period_end', sa.DateTime(), nullable=False),
+    sa.Column('path', sa.String(length=255), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('activity_segment_item',
+    sa.Column('segment_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['segment_id'], ['activity_segment.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('segment_id', 'item_id')
+    )
+    with op.batch_alter_table('activity_segment_item', schema=None) as batch_op:
+        batch_op.create_index('ix_activity_segment_item_item_id', ['item_id'], unique=False)
+
+    if postgres:
+        partition(bind)
+
+
+def downgrade():
+    # Archived segments are not restored, and only migrated notes survive as details
+    bind = op.get_bind()
+    postgres = bind.dialect.name == 'postgresql'
+    if postgres:
+        for statement in UNPARTITION_DDL:
+            bind.exec_driver_sql(statement)
+
+    with op.batch_alter_table('activity_segment_item', schema=None) as batch_op:
+        batch_op.drop_index('ix_activity_segment_item_item_id')
+    op.drop_table('activity_segment_item')
+    op.drop_table('activity_segment')
+
+    with op.batch_alter_table('activity_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('details', sa.Text(), nullable=True))
+        batch_op.drop_index('ix_activity_log_created')
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+    note = "changes->>'note'" if postgres else "json_extract(changes, '$.note')"
+    op.execute(f"UPDATE activity_log SET details = {note}")
+    with op.batch_alter_table('activity_log', schema=None) as batch_op:
+        batch_op.drop_column('changes')
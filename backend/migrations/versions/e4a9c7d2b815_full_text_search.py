@@ -0,0 +1,105 @@
+"""full text search
+
+Revision ID: e4a9c7d2b815
+Revises: c52a8e1d9f47
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c7d2b815'
+down_revision = 'c52a8e1d9f47'
+branch_labels = None
+depends_on = None
+
+POSTGRES_COLUMNS = [
+    """ALTER TABLE item ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(steps_to_reproduce, '')), 'C')
+    ) STORED""",
+    """ALTER TABLE comment ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(content, ''))
+    ) STORED""",
+]
+
+POSTGRES_INDEXES = [
+    "CREATE INDEX CONCURRENTLY ix_item_search_vector ON item USING GIN (search_vector)",
+    "CREATE INDEX CONCURRENTLY ix_comment_search_vector ON comment USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE item_fts USING fts5(
+        title, description, steps_to_reproduce, content='item', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER item_fts_ai AFTER INSERT ON item BEGIN
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER item_fts_ad AFTER DELETE ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER item_fts_au AFTER UPDATE OF title, description, steps_to_reproduce ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+    """CREATE VIRTUAL TABLE comment_fts USING fts5(
+        content, content='comment', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER comment_fts_ai AFTER INSERT ON comment BEGIN
+        INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER comment_fts_ad AFTER DELETE ON comment BEGIN
+        INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER comment_fts_au AFTER UPDATE OF content ON comment BEGIN
+        INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    "INSERT INTO item_fts(item_fts) VALUES ('rebuild')",
+    "INSERT INTO comment_fts(comment_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_DDL = [
+    "DROP TRIGGER comment_fts_au",
+    "DROP TRIGGER comment_fts_ad",
+    "DROP TRIGGER comment_fts_ai",
+    "DROP TABLE comment_fts",
+    "DROP TRIGGER item_fts_au",
+    "DROP TRIGGER item_fts_ad",
+    "DROP TRIGGER item_fts_ai",
+    "DROP TABLE item_fts",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Adding a STORED generated column rewrites the table once to fill it in
+        for statement in POSTGRES_COLUMNS:
+            op.execute(statement)
+        with op.get_context().autocommit_block():
+            for statement in POSTGRES_INDEXES:
+                op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_comment_search_vector")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_item_search_vector")
+        op.execute("ALTER TABLE comment DROP COLUMN search_vector")
+        op.execute("ALTER TABLE item DROP COLUMN search_vector")
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DROP_DDL:
+            op.execute(statement)
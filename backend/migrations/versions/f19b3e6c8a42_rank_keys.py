@@ -0,0 +1,105 @@
+"""rank keys for items and board columns
+
+Revision ID: f19b3e6c8a42
+Revises: e4a9c7d2b815
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f19b3e6c8a42'
+down_revision = 'e4a9c7d2b815'
+branch_labels = None
+depends_on = None
+
+RANK_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+RANK_WIDTH = 6
+
+
+# SQLite batch mode rebuilds the item table, which drops the full-text search
+# triggers from e4a9c7d2b815; they are put back after each rebuild.
+SQLITE_ITEM_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS item_fts_ai AFTER INSERT ON item BEGIN
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_ad AFTER DELETE ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_au AFTER UPDATE OF title, description, steps_to_reproduce ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+]
+
+
+def restore_search_triggers():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SQLITE_ITEM_TRIGGERS:
+            op.execute(statement)
+
+
+def rank_key():
+    return sa.String(64).with_variant(postgresql.VARCHAR(64, collation='C'), 'postgresql')
+
+
+def spread_ranks(count):
+    # Same keys as controllers.ranking.spread_ranks at the time of this revision
+    step = len(RANK_DIGITS) ** RANK_WIDTH // (count + 1)
+    keys = []
+    for i in range(count):
+        value, digits = step * (i + 1), []
+        for _ in range(RANK_WIDTH):
+            value, digit = divmod(value, len(RANK_DIGITS))
+            digits.append(RANK_DIGITS[digit])
+        keys.append(''.join(reversed(digits)).rstrip('0'))
+    return keys
+
+
+def backfill(bind, table, group_column, order_by):
+    rows = bind.execute(sa.text(f'SELECT id, {group_column} FROM {table} ORDER BY {group_column}, {order_by}')).all()
+    groups = {}
+    for row_id, group in rows:
+        groups.setdefault(group, []).append(row_id)
+    params = []
+    for ids in groups.values():
+        params.extend({'id': row_id, 'rank': rank} for row_id, rank in zip(ids, spread_ranks(len(ids))))
+    if params:
+        bind.execute(sa.text(f'UPDATE {table} SET rank = :rank WHERE id = :id'), params)
+
+
+def upgrade():
+    with op.batch_alter_table('board_column', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rank', rank_key(), nullable=True))
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rank', rank_key(), nullable=True))
+
+    # Columns keep their current 'order'; cards start out in id order
+    bind = op.get_bind()
+    backfill(bind, 'board_column', 'project_id', '"order", id')
+    backfill(bind, 'item', 'column_id', 'id')
+
+    with op.batch_alter_table('board_column', schema=None) as batch_op:
+        batch_op.alter_column('rank', existing_type=rank_key(), nullable=False)
+        batch_op.create_index('ix_board_column_project_rank', ['project_id', 'rank'], unique=False)
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.alter_column('rank', existing_type=rank_key(), nullable=False)
+        batch_op.create_index('ix_item_column_rank', ['column_id', 'rank'], unique=False)
+    restore_search_triggers()
+
+
+def downgrade():
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.drop_index('ix_item_column_rank')
+        batch_op.drop_column('rank')
+    restore_search_triggers()
+    with op.batch_alter_table('board_column', schema=None) as batch_op:
+        batch_op.drop_index('ix_board_column_project_rank')
+        batch_op.drop_column('rank')
@@ -7,7 +7,12 @@ from .comment import Comment
 from .team import Team
 from .team_member import TeamMember
 from .project_team import ProjectTeam
-from .activity_log import ActivityLog
+from .activity_log import ActivityLog, ActivitySegment, ActivitySegmentItem
 from .notification import Notification
 from .role import Role
 from .permission import Permission
+from .stats import ProjectStats, UserStats
+from .item_tombstone import ItemTombstone
+from .item_rollup import ItemRollup
+from . import search
+from . import partitions
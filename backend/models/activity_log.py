@@ -1,10 +1,42 @@
 from datetime import datetime
+from sqlalchemy.dialects import postgresql
 from .db import db
 
+# Field -> [old, new] pairs; rows migrated from the free-text column carry {'note': text}
+ChangesType = db.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
 class ActivityLog(db.Model):
+    """Append-only; monthly range partitions on PostgreSQL (see models/partitions.py)."""
+    __table_args__ = (
+        db.Index('ix_activity_log_item_created', 'item_id', 'created_at'),
+        # Range scans by age for archival; BRIN stays tiny on an append-ordered table
+        db.Index('ix_activity_log_created', 'created_at', postgresql_using='brin'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    item_id = db.Column(db.Integer, db.ForeignKey('item.id'), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    action = db.Column(db.String(50), nullable=False) 
-    details = db.Column(db.Text) 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow) 
\ No newline at end of file
+    action = db.Column(db.String(50), nullable=False)
+    changes = db.Column(ChangesType)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class ActivitySegment(db.Model):
+    """A month of activity moved out of the database into a gzipped NDJSON file."""
+    __tablename__ = 'activity_segment'
+    id = db.Column(db.Integer, primary_key=True)
+    period_start = db.Column(db.DateTime, nullable=False)
+    period_end = db.Column(db.DateTime, nullable=False)
+    path = db.Column(db.String(255), nullable=False)  # relative to ACTIVITY_ARCHIVE_DIR
+    row_count = db.Column(db.Integer, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ActivitySegmentItem(db.Model):
+    """Which segments hold activity of an item, so reads open only those files."""
+    __tablename__ = 'activity_segment_item'
+    segment_id = db.Column(db.Integer, db.ForeignKey('activity_segment.id', ondelete='CASCADE'), primary_key=True)
+    item_id = db.Column(db.Integer, primary_key=True, index=True)
+    # The item's gzip member within the file and the ids it holds; NULL for segments
+    # written before members existed, which are read whole
+    byte_offset = db.Column(db.BigInteger)
+    byte_length = db.Column(db.Integer)
+    first_id = db.Column(db.BigInteger)
+    last_id = db.Column(db.BigInteger)
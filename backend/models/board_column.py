@@ -1,10 +1,16 @@
 from datetime import datetime
 from .db import db
+from .item import RankKey
 
 class BoardColumn(db.Model):
+    __table_args__ = (
+        db.Index('ix_board_column_project_order', 'project_id', 'order'),
+        db.Index('ix_board_column_project_rank', 'project_id', 'rank'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
     order = db.Column(db.Integer, nullable=False)
+    rank = db.Column(RankKey, nullable=False)  # position on the board, see controllers/ranking.py
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
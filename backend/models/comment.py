@@ -2,8 +2,11 @@ from datetime import datetime
 from .db import db
 
 class Comment(db.Model):
+    __table_args__ = (
+        db.Index('ix_comment_item_id', 'item_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    item_id = db.Column(db.Integer, db.ForeignKey('item.id'), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,3 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql, sqlite
+from .routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def dialect_insert(model):
+    """INSERT with the dialect's ON CONFLICT support (both PostgreSQL and SQLite have it)."""
+    if db.session.connection().dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
@@ -1,14 +1,28 @@
 from datetime import datetime
+from sqlalchemy.dialects import postgresql
 from .db import db
 
+# Rank keys must compare byte-wise; PostgreSQL would otherwise use the database collation
+RankKey = db.String(64).with_variant(postgresql.VARCHAR(64, collation='C'), 'postgresql')
+
 class Item(db.Model):
+    __table_args__ = (
+        db.Index('ix_item_project_status', 'project_id', 'status'),
+        db.Index('ix_item_project_type', 'project_id', 'type'),
+        db.Index('ix_item_assignee_id', 'assignee_id'),
+        db.Index('ix_item_reporter_id', 'reporter_id'),
+        db.Index('ix_item_parent_id', 'parent_id'),
+        db.Index('ix_item_project_change_seq', 'project_id', 'change_seq'),
+        db.Index('ix_item_column_rank', 'column_id', 'rank'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text)
     type = db.Column(db.String(20), nullable=False)
     status = db.Column(db.String(30), nullable=False)
     column_id = db.Column(db.Integer, db.ForeignKey('board_column.id'), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    rank = db.Column(RankKey, nullable=False)  # position within the column, see controllers/ranking.py
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
     reporter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     assignee_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     due_date = db.Column(db.Date)
@@ -18,7 +32,10 @@ class Item(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     start_date = db.Column(db.DateTime)
-    parent_id = db.Column(db.Integer, db.ForeignKey('item.id'))  # For subtasks
-    subtasks = db.relationship('Item', backref=db.backref('parent', remote_side=[id]), lazy='dynamic')
-    activity_logs = db.relationship('ActivityLog', backref='item', lazy='dynamic')
-    comments = db.relationship('Comment', backref='item', lazy='dynamic')
+    parent_id = db.Column(db.Integer, db.ForeignKey('item.id', ondelete='SET NULL'))  # For subtasks
+    story_points = db.Column(db.Integer)
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')  # Project.change_seq of the last write
+    # Dependent rows are removed by the database (see controllers/deletion.py), never loaded to be deleted
+    subtasks = db.relationship('Item', backref=db.backref('parent', remote_side=[id]), lazy='dynamic', passive_deletes=True)
+    activity_logs = db.relationship('ActivityLog', backref='item', lazy='dynamic', passive_deletes=True)
+    comments = db.relationship('Comment', backref='item', lazy='dynamic', passive_deletes=True)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from .db import db
+
+class ItemRollup(db.Model):
+    """Totals over the subtree of an item that has children; see controllers/hierarchy.py."""
+    __tablename__ = 'item_rollup'
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id', ondelete='CASCADE'), primary_key=True)
+    leaves_total = db.Column(db.Integer, nullable=False, default=0)
+    leaves_done = db.Column(db.Integer, nullable=False, default=0)
+    story_points = db.Column(db.Integer, nullable=False, default=0)
+    story_points_done = db.Column(db.Integer, nullable=False, default=0)
+    earliest_due_date = db.Column(db.Date)
+    latest_due_date = db.Column(db.Date)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,12 @@
+from datetime import datetime
+from .db import db
+
+class ItemTombstone(db.Model):
+    __tablename__ = 'item_tombstone'
+    __table_args__ = (
+        db.Index('ix_item_tombstone_project_change_seq', 'project_id', 'change_seq'),
+    )
+    item_id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
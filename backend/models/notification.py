@@ -2,6 +2,14 @@ from datetime import datetime
 from .db import db
 
 class Notification(db.Model):
+    __table_args__ = (
+        db.Index('ix_notification_user_created', 'user_id', 'created_at'),
+        db.Index('ix_notification_user_unread', 'user_id', 'created_at',
+                 postgresql_where=db.text('is_read = false'), sqlite_where=db.text('is_read = 0')),
+        # Retention purge walks read notifications by age
+        db.Index('ix_notification_read_created', 'created_at',
+                 postgresql_where=db.text('is_read = true'), sqlite_where=db.text('is_read = 1')),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     message = db.Column(db.String(255), nullable=False)
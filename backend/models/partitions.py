@@ -0,0 +1,132 @@
+"""Monthly range partitioning of activity_log on PostgreSQL.
+
+The ORM maps activity_log as a plain table. On PostgreSQL it is then turned into
+a table partitioned by created_at: one partition per month, plus a DEFAULT
+partition so an insert never fails for lack of one. Old months come off as a
+whole partition (DETACH + DROP) when they are archived. The primary key
+becomes (id, created_at), because PostgreSQL requires the partition key in it.
+SQLite keeps the single table; archival deletes by range there.
+"""
+from datetime import datetime
+from sqlalchemy import event
+from .db import db
+from .activity_log import ActivityLog
+
+PARENT = 'activity_log'
+DEFAULT_PARTITION = 'activity_log_default'
+PARTITION_PREFIX = 'activity_log_'
+MONTHS_AHEAD = 2
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def partition_name(month):
+    return f'{PARTITION_PREFIX}{month:%Y_%m}'
+
+def _bounds(month):
+    return f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+
+def is_partitioned(connection):
+    if connection.dialect.name != 'postgresql':
+        return False
+    return bool(connection.exec_driver_sql(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('activity_log')"
+    ).scalar())
+
+def month_partitions(connection):
+    """Month start -> partition name, for every monthly partition attached now."""
+    names = connection.exec_driver_sql(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'activity_log'::regclass"
+    ).scalars()
+    months = {}
+    for name in names:
+        try:
+            months[datetime.strptime(name[len(PARTITION_PREFIX):], '%Y_%m')] = name
+        except ValueError:
+            pass  # the DEFAULT partition
+    return months
+
+def create_month_partition(connection, month):
+    """Attach a partition for month, moving any of its rows out of the DEFAULT partition first."""
+    name, bounds = partition_name(month), _bounds(month)
+    in_range = f"created_at >= '{month:%Y-%m-%d}' AND created_at < '{add_months(month, 1):%Y-%m-%d}'"
+    stray = connection.exec_driver_sql(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range} LIMIT 1").scalar()
+    if not stray:
+        connection.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} FOR VALUES {bounds}")
+        return
+    connection.exec_driver_sql(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)")
+    connection.exec_driver_sql(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}")
+    connection.exec_driver_sql(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}")
+    connection.exec_driver_sql(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES {bounds}")
+
+def ensure_partitions(connection, now=None, months_ahead=MONTHS_AHEAD):
+    """Create partitions for this month and the next months_ahead; a no-op off PostgreSQL."""
+    if not is_partitioned(connection):
+        return []
+    existing = month_partitions(connection)
+    current = month_start(now or datetime.utcnow())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            create_month_partition(connection, month)
+            created.append(month)
+    return created
+
+def partition_activity_log(connection):
+    """Rebuild a plain activity_log as a partitioned table, keeping its rows and id sequence."""
+    run = connection.exec_driver_sql
+    run("ALTER TABLE activity_log RENAME TO activity_log_unpartitioned")
+    run("ALTER TABLE activity_log_unpartitioned RENAME CONSTRAINT activity_log_pkey TO activity_log_unpartitioned_pkey")
+    run("ALTER INDEX ix_activity_log_item_created RENAME TO ix_activity_log_unpartitioned_item_created")
+    run("ALTER INDEX IF EXISTS ix_activity_log_created RENAME TO ix_activity_log_unpartitioned_created")
+    run("CREATE TABLE activity_log (LIKE activity_log_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    run("ALTER TABLE activity_log ADD CONSTRAINT activity_log_pkey PRIMARY KEY (id, created_at)")
+    run("ALTER TABLE activity_log ADD CONSTRAINT activity_log_item_id_fkey FOREIGN KEY (item_id) REFERENCES item (id) ON DELETE CASCADE")
+    run('ALTER TABLE activity_log ADD CONSTRAINT activity_log_user_id_fkey FOREIGN KEY (user_id) REFERENCES "user" (id)')
+    run("CREATE INDEX ix_activity_log_item_created ON activity_log (item_id, created_at)")
+    run("CREATE INDEX ix_activity_log_created ON activity_log USING brin (created_at)")
+    run(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF activity_log DEFAULT")
+    months = {month_start(m) for m in run(
+        "SELECT DISTINCT date_trunc('month', created_at) FROM activity_log_unpartitioned"
+    ).scalars()}
+    current = month_start(datetime.utcnow())
+    months.update(add_months(current, offset) for offset in range(MONTHS_AHEAD + 1))
+    for month in sorted(months):
+        run(f"CREATE TABLE {partition_name(month)} PARTITION OF activity_log FOR VALUES {_bounds(month)}")
+    run("INSERT INTO activity_log SELECT * FROM activity_log_unpartitioned")
+    run("ALTER SEQUENCE activity_log_id_seq OWNED BY activity_log.id")
+    run("DROP TABLE activity_log_unpartitioned")
+
+def unpartition_activity_log(connection):
+    """Inverse of partition_activity_log, for downgrades."""
+    run = connection.exec_driver_sql
+    run("ALTER TABLE activity_log RENAME TO activity_log_partitioned")
+    run("ALTER TABLE activity_log_partitioned RENAME CONSTRAINT activity_log_pkey TO activity_log_partitioned_pkey")
+    run("ALTER INDEX ix_activity_log_item_created RENAME TO ix_activity_log_partitioned_item_created")
+    run("ALTER INDEX ix_activity_log_created RENAME TO ix_activity_log_partitioned_created")
+    run("CREATE TABLE activity_log (LIKE activity_log_partitioned INCLUDING DEFAULTS)")
+    run("ALTER TABLE activity_log ADD CONSTRAINT activity_log_pkey PRIMARY KEY (id)")
+    run("ALTER TABLE activity_log ADD CONSTRAINT activity_log_item_id_fkey FOREIGN KEY (item_id) REFERENCES item (id) ON DELETE CASCADE")
+    run('ALTER TABLE activity_log ADD CONSTRAINT activity_log_user_id_fkey FOREIGN KEY (user_id) REFERENCES "user" (id)')
+    run("CREATE INDEX ix_activity_log_item_created ON activity_log (item_id, created_at)")
+    run("CREATE INDEX ix_activity_log_created ON activity_log USING brin (created_at)")
+    run("INSERT INTO activity_log SELECT * FROM activity_log_partitioned")
+    run("ALTER SEQUENCE activity_log_id_seq OWNED BY activity_log.id")
+    run("DROP TABLE activity_log_partitioned")
+
+@event.listens_for(ActivityLog.__table__, 'after_create')
+def _partition_on_create(target, connection, **kw):
+    if connection.dialect.name == 'postgresql':
+        partition_activity_log(connection)
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Keep autogenerate from proposing to drop the partitions above."""
+    if type_ == 'table' and reflected and name and name.startswith(PARTITION_PREFIX):
+        return False
+    return True
@@ -1,10 +1,28 @@
 from .db import db
 
+# Fixed bit layout for the action vocabulary. Append new actions at the end only:
+# stored Role.permission_mask values depend on these positions.
+ACTIONS = (
+    'view_tasks', 'create_task', 'edit_any_task', 'edit_own_task', 'delete_any_task', 'delete_own_task',
+    'manage_project', 'add_remove_members', 'change_roles', 'view_project_settings', 'delete_project', 'transfer_admin',
+    'add_comment', 'edit_any_comment', 'delete_any_comment', 'edit_own_comment'
+)
+ACTION_BITS = {action: 1 << i for i, action in enumerate(ACTIONS)}
+
+def mask_for(actions):
+    mask = 0
+    for action in actions:
+        mask |= ACTION_BITS[action]
+    return mask
+
+def mask_has(mask, action):
+    return bool(mask & ACTION_BITS.get(action, 0))
+
 class Permission(db.Model):
     __tablename__ = 'permission'
     id = db.Column(db.Integer, primary_key=True)
     action = db.Column(db.String(50), nullable=False)
-    role_id = db.Column(db.Integer, db.ForeignKey('role.id'), nullable=False)
+    role_id = db.Column(db.Integer, db.ForeignKey('role.id', ondelete='CASCADE'), nullable=False)
 
     def __repr__(self):
-        return f'<Permission {self.action}>' 
\ No newline at end of file
+        return f'<Permission {self.action}>'
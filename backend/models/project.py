@@ -6,14 +6,19 @@ from .project_member import ProjectMember
 from .project_team import ProjectTeam
 
 class Project(db.Model):
+    __table_args__ = (
+        db.Index('ix_project_deleted_at', 'deleted_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text)
     admin_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    board_columns = db.relationship('BoardColumn', backref='project', cascade='all, delete-orphan', lazy='dynamic')
-    items = db.relationship('Item', backref='project', cascade='all, delete-orphan', lazy='dynamic')
-    members = db.relationship('ProjectMember', backref='project', cascade='all, delete-orphan', lazy='dynamic')
-    teams = db.relationship('ProjectTeam', backref='project', cascade='all, delete-orphan', lazy='dynamic')
+    board_columns = db.relationship('BoardColumn', backref='project', cascade='all, delete-orphan', lazy='dynamic', passive_deletes=True)
+    items = db.relationship('Item', backref='project', cascade='all, delete-orphan', lazy='dynamic', passive_deletes=True)
+    members = db.relationship('ProjectMember', backref='project', cascade='all, delete-orphan', lazy='dynamic', passive_deletes=True)
+    teams = db.relationship('ProjectTeam', backref='project', cascade='all, delete-orphan', lazy='dynamic', passive_deletes=True)
     owner_team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=True)
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')  # bumped once per transaction that writes items
+    deleted_at = db.Column(db.DateTime, nullable=True)  # set while a large project is being purged, see controllers/deletion.py
@@ -4,15 +4,22 @@ from datetime import datetime
 
 class ProjectMember(db.Model):
     __tablename__ = 'project_member'
+    __table_args__ = (
+        db.Index('ix_project_member_project_id', 'project_id'),
+    )
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True)
     role_id = db.Column(db.Integer, db.ForeignKey('role.id'), nullable=False)
     role = db.relationship('Role', backref='project_members')
 
 class ProjectJoinRequest(db.Model):
     __tablename__ = 'project_join_request'
+    __table_args__ = (
+        db.Index('ix_project_join_request_project_type_status', 'project_id', 'type', 'status'),
+        db.Index('ix_project_join_request_user_type_status', 'user_id', 'type', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     type = db.Column(db.String(20), nullable=False) 
     status = db.Column(db.String(20), nullable=False, default='pending')  
@@ -1,5 +1,5 @@
 from .db import db
 
 class ProjectTeam(db.Model):
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True)
     team_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
@@ -4,7 +4,8 @@ class Role(db.Model):
     __tablename__ = 'role'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=True)  
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=True)  
+    permission_mask = db.Column(db.BigInteger, nullable=True)  # see models.permission.ACTIONS; NULL = legacy Permission rows
     permissions = db.relationship('Permission', backref='role', lazy=True)
 
     def __repr__(self):
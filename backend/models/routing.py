@@ -0,0 +1,139 @@
+"""Read/write splitting across the primary and optional read replicas.
+
+Replicas are registered as SQLALCHEMY_BINDS named replica_0, replica_1, ...
+RoutingSession sends the reads of authenticated GET/HEAD requests to them
+and everything else to the primary. These always go to the primary:
+- flushes, DML, SELECT ... FOR UPDATE, and every statement after them
+  in the same request
+- requests from a user who wrote within the last DB_STICKY_SECONDS, so
+  they read their own writes
+- requests made while every replica lags by more than DB_REPLICA_MAX_LAG
+  seconds or cannot be reached
+
+Stickiness is tracked per worker process.
+"""
+import itertools
+import threading
+import time
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_PREFIX = 'replica_'
+
+# Replication delay in seconds; 0 when the replica has replayed everything it received
+POSTGRES_LAG = """
+SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+"""
+
+def replica_lag(engine):
+    """Seconds the replica is behind; SQLite copies have no replication to lag."""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+    with engine.connect() as conn:
+        return float(conn.exec_driver_sql(POSTGRES_LAG).scalar() or 0)
+
+class ReplicaRouter:
+    def __init__(self):
+        self.keys = []
+        self.sticky_seconds = 5.0
+        self.max_lag = 2.0
+        self.check_interval = 5.0
+        self._sticky = {}
+        self._lag = {}  # bind key -> (checked_at, lag seconds or None when unreachable)
+        self._checking = set()
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+
+    def init_app(self, app):
+        self.keys = sorted(k for k in app.config.get('SQLALCHEMY_BINDS', {}) if k.startswith(REPLICA_PREFIX))
+        self.sticky_seconds = float(app.config.get('DB_STICKY_SECONDS', self.sticky_seconds))
+        self.max_lag = float(app.config.get('DB_REPLICA_MAX_LAG', self.max_lag))
+        self.check_interval = float(app.config.get('DB_REPLICA_CHECK_INTERVAL', self.check_interval))
+
+    def mark_write(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._sticky) > 1024:
+                self._sticky = {u: t for u, t in self._sticky.items() if t > now}
+            self._sticky[user_id] = now + self.sticky_seconds
+
+    def is_sticky(self, user_id):
+        return self._sticky.get(user_id, 0) > time.monotonic()
+
+    def _lag_of(self, key, engine):
+        now = time.monotonic()
+        checked_at, lag = self._lag.get(key, (None, None))
+        if checked_at is not None and now - checked_at < self.check_interval:
+            return lag
+        with self._lock:
+            if key in self._checking:
+                # Another thread is measuring; use the last value meanwhile
+                return lag
+            self._checking.add(key)
+        try:
+            lag = replica_lag(engine)
+        except Exception:
+            lag = None
+        finally:
+            with self._lock:
+                self._checking.discard(key)
+        self._lag[key] = (now, lag)
+        return lag
+
+    def pick(self, engines):
+        """A replica engine within the lag threshold, round robin; None when there is none."""
+        count = len(self.keys)
+        start = next(self._turn)
+        for i in range(count):
+            key = self.keys[(start + i) % count]
+            lag = self._lag_of(key, engines[key])
+            if lag is not None and lag <= self.max_lag:
+                return engines[key]
+        return None
+
+    def status(self):
+        return [{'bind': key, 'lag_seconds': self._lag.get(key, (None, None))[1]} for key in self.keys]
+
+router = ReplicaRouter()
+
+class RoutingSession(Session):
+    def _reads_from_replica(self, clause):
+        if not router.keys or self._flushing or not has_request_context():
+            return False
+        if self.info.get('primary'):
+            return False
+        if clause is not None and (getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None):
+            self.info['primary'] = True
+            return False
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        # request.user is set once the token is verified; the principal lookup itself stays on the primary
+        user = getattr(request, 'user', None)
+        return user is not None and not router.is_sticky(user.id)
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            engine = router.pick(self._db.engines)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _note_flush(session, flush_context):
+    session.info['primary'] = True
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _note_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['primary'] = True
+        orm_execute_state.session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _stick_to_primary(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        user = getattr(request, 'user', None)
+        if user is not None:
+            router.mark_write(user.id)
@@ -0,0 +1,103 @@
+"""Full-text search structures that live outside the ORM mapping.
+
+PostgreSQL keeps a generated tsvector column with a GIN index on item and
+comment. SQLite keeps external-content FTS5 tables that triggers hold in step
+with their source rows. Both are maintained by the database itself, so bulk
+statements that bypass the ORM stay searchable.
+"""
+from sqlalchemy import event
+from .db import db
+
+SEARCH_CONFIG = 'english'
+
+POSTGRES_DDL = [
+    f"""ALTER TABLE item ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(steps_to_reproduce, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_item_search_vector ON item USING GIN (search_vector)",
+    f"""ALTER TABLE comment ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('{SEARCH_CONFIG}', coalesce(content, ''))
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_comment_search_vector ON comment USING GIN (search_vector)",
+]
+
+POSTGRES_DROP_DDL = [
+    "DROP INDEX IF EXISTS ix_comment_search_vector",
+    "ALTER TABLE IF EXISTS comment DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS ix_item_search_vector",
+    "ALTER TABLE IF EXISTS item DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS item_fts USING fts5(
+        title, description, steps_to_reproduce, content='item', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_ai AFTER INSERT ON item BEGIN
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_ad AFTER DELETE ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS item_fts_au AFTER UPDATE OF title, description, steps_to_reproduce ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, title, description, steps_to_reproduce)
+        VALUES ('delete', old.id, old.title, old.description, old.steps_to_reproduce);
+        INSERT INTO item_fts(rowid, title, description, steps_to_reproduce)
+        VALUES (new.id, new.title, new.description, new.steps_to_reproduce);
+    END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS comment_fts USING fts5(
+        content, content='comment', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS comment_fts_ai AFTER INSERT ON comment BEGIN
+        INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comment_fts_ad AFTER DELETE ON comment BEGIN
+        INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comment_fts_au AFTER UPDATE OF content ON comment BEGIN
+        INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    # Index rows that existed before the tables were created
+    "INSERT INTO item_fts(item_fts) VALUES ('rebuild')",
+    "INSERT INTO comment_fts(comment_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS comment_fts_au",
+    "DROP TRIGGER IF EXISTS comment_fts_ad",
+    "DROP TRIGGER IF EXISTS comment_fts_ai",
+    "DROP TABLE IF EXISTS comment_fts",
+    "DROP TRIGGER IF EXISTS item_fts_au",
+    "DROP TRIGGER IF EXISTS item_fts_ad",
+    "DROP TRIGGER IF EXISTS item_fts_ai",
+    "DROP TABLE IF EXISTS item_fts",
+]
+
+def search_ddl(dialect_name, drop=False):
+    if dialect_name == 'postgresql':
+        return POSTGRES_DROP_DDL if drop else POSTGRES_DDL
+    if dialect_name == 'sqlite':
+        return SQLITE_DROP_DDL if drop else SQLITE_DDL
+    return []
+
+@event.listens_for(db.metadata, 'after_create')
+def install_search(target, connection, **kw):
+    for statement in search_ddl(connection.dialect.name):
+        connection.exec_driver_sql(statement)
+
+@event.listens_for(db.metadata, 'before_drop')
+def uninstall_search(target, connection, **kw):
+    for statement in search_ddl(connection.dialect.name, drop=True):
+        connection.exec_driver_sql(statement)
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Keep autogenerate from proposing to drop the search structures above."""
+    if type_ == 'table' and reflected and name and (name.startswith('item_fts') or name.startswith('comment_fts')):
+        return False
+    if type_ in ('column', 'index') and reflected and name and 'search_vector' in name:
+        return False
+    return True
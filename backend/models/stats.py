@@ -0,0 +1,21 @@
+from datetime import datetime
+from .db import db
+
+class ProjectStats(db.Model):
+    __tablename__ = 'project_stats'
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    todo = db.Column(db.Integer, nullable=False, default=0)
+    inprogress = db.Column(db.Integer, nullable=False, default=0)
+    inreview = db.Column(db.Integer, nullable=False, default=0)
+    done = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class UserStats(db.Model):
+    __tablename__ = 'user_stats'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    project_count = db.Column(db.Integer, nullable=False, default=0)
+    task_count = db.Column(db.Integer, nullable=False, default=0)
+    team_count = db.Column(db.Integer, nullable=False, default=0)
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,10 @@
+from flask import Blueprint
+from controllers.pooling import get_pool_stats
+from controllers.jwt_utils import jwt_required
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/health/db-pool', methods=['GET'])
+@jwt_required
+def db_pool_stats():
+    return get_pool_stats()
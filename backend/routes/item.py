@@ -1,5 +1,5 @@
 from flask import Blueprint, make_response
-from controllers.item_controller import create_item, get_items, get_item, update_item, delete_item, get_subtasks, create_subtask, update_subtask, delete_subtask, get_activity_logs, get_recent_activity, get_my_tasks, add_comment, edit_comment
+from controllers.item_controller import create_item, get_items, get_item, update_item, move_item, delete_item, get_subtasks, get_item_tree, create_subtask, update_subtask, delete_subtask, get_activity_logs, get_recent_activity, get_my_tasks, add_comment, edit_comment
 from controllers.jwt_utils import jwt_required
 
 item_bp = Blueprint('item', __name__)
@@ -26,6 +26,11 @@ def get_item_route(item_id):
 def update_item_route(item_id):
     return update_item(item_id)
 
+@item_bp.route('/<int:item_id>/move', methods=['POST'])
+@jwt_required
+def move_item_route(item_id):
+    return move_item(item_id)
+
 @item_bp.route('/<int:item_id>', methods=['DELETE'])
 @jwt_required
 def delete_item_route(item_id):
@@ -45,6 +50,11 @@ def options_item(item_id):
 def get_subtasks_route(item_id):
     return get_subtasks(item_id)
 
+@item_bp.route('/<int:item_id>/tree', methods=['GET'])
+@jwt_required
+def get_item_tree_route(item_id):
+    return get_item_tree(item_id)
+
 @item_bp.route('/<int:item_id>/subtasks', methods=['POST'])
 @jwt_required
 def create_subtask_route(item_id):
@@ -1,5 +1,5 @@
 from flask import Blueprint
-from controllers.notification_controller import get_notifications, mark_as_read
+from controllers.notification_controller import get_notifications, get_unread_count, mark_as_read, mark_many_as_read
 
 notification_bp = Blueprint('notification', __name__)
 
@@ -7,6 +7,14 @@ notification_bp = Blueprint('notification', __name__)
 def notifications():
     return get_notifications()
 
+@notification_bp.route('/notifications/unread-count', methods=['GET'])
+def unread_count():
+    return get_unread_count()
+
+@notification_bp.route('/notifications/read', methods=['POST'])
+def read_notifications():
+    return mark_many_as_read()
+
 @notification_bp.route('/notifications/<int:notif_id>/read', methods=['POST'])
 def read_notification(notif_id):
-    return mark_as_read(notif_id) 
\ No newline at end of file
+    return mark_as_read(notif_id) 
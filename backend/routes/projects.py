@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from controllers.project_controller import create_project, get_projects, get_dashboard_stats, update_project, delete_project, transfer_admin, get_project_progress, get_all_projects
-from controllers.project_controller import get_project
+from controllers.project_controller import get_project, get_project_deletion
+from controllers.item_controller import get_project_changes, batch_items
 from controllers.jwt_utils import jwt_required
 from flask_cors import cross_origin
 
@@ -10,11 +11,14 @@ projects_bp.route('/projects', methods=['POST'])(jwt_required(create_project))
 projects_bp.route('/projects', methods=['GET'])(jwt_required(get_projects))
 projects_bp.route('/projects/<int:project_id>', methods=['GET'])(jwt_required(get_project))
 projects_bp.route('/projects/<int:project_id>/progress', methods=['GET'])(jwt_required(get_project_progress))
+projects_bp.route('/projects/<int:project_id>/changes', methods=['GET'])(jwt_required(get_project_changes))
+projects_bp.route('/projects/<int:project_id>/items:batch', methods=['POST'])(jwt_required(batch_items))
 projects_bp.route('/all-projects', methods=['GET'])(get_all_projects)
 
 projects_bp.route('/dashboard/stats', methods=['GET'])(jwt_required(get_dashboard_stats))
 projects_bp.route('/projects/<int:project_id>', methods=['PATCH'])(jwt_required(update_project))
 projects_bp.route('/projects/<int:project_id>', methods=['DELETE'])(jwt_required(delete_project))
+projects_bp.route('/projects/<int:project_id>/deletion', methods=['GET'])(get_project_deletion)
 projects_bp.route('/projects/<int:project_id>/transfer-admin', methods=['POST'])(jwt_required(transfer_admin))
 
 
@@ -0,0 +1,7 @@
+from flask import Blueprint
+from controllers.search_controller import search
+from controllers.jwt_utils import jwt_required
+
+search_bp = Blueprint('search', __name__)
+
+search_bp.route('/search', methods=['GET'])(jwt_required(search))
@@ -1,12 +1,13 @@
 from flask import Blueprint, jsonify, request
 from models.team import Team
 from models.db import db
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from controllers.jwt_utils import jwt_required
 from models.user import User
 from models.team_member import TeamMember
 from models.project_team import ProjectTeam
 from models.project import Project
-from models.project_member import ProjectMember
+from controllers.memberships import grant_team_access, revoke_team_access, forget_permissions, UnknownRole
+from controllers.stats import team_membership_changed
 
 teams_bp = Blueprint('teams', __name__)
 
@@ -18,14 +19,14 @@ def get_teams():
     ]})
 
 @teams_bp.route('/teams', methods=['POST'])
-@jwt_required()
+@jwt_required
 def create_team():
     data = request.get_json()
     name = data.get('name')
     description = data.get('description')
     if not name:
         return jsonify({'error': 'Team name is required'}), 400
-    user_id = get_jwt_identity()
+    user_id = request.user.id
     if not user_id:
         return jsonify({'error': 'Authentication required'}), 401
     team = Team(name=name, description=description, admin_id=user_id)
@@ -34,7 +35,7 @@ def create_team():
     return jsonify({'message': 'Team created', 'team': {'id': team.id, 'name': team.name, 'description': team.description, 'admin_id': team.admin_id}}), 201 
 
 @teams_bp.route('/teams/<int:team_id>', methods=['GET'])
-@jwt_required()
+@jwt_required
 def get_team(team_id):
     team = Team.query.get(team_id)
     if not team:
@@ -61,10 +62,10 @@ def get_team(team_id):
     })
 
 @teams_bp.route('/teams/<int:team_id>/projects', methods=['POST'])
-@jwt_required()
+@jwt_required
 def add_team_project(team_id):
     team = Team.query.get_or_404(team_id)
-    if team.admin_id != get_jwt_identity():
+    if team.admin_id != request.user.id:
         return jsonify({'error': 'Forbidden: You are not the admin of this team.'}), 403
 
     data = request.get_json()
@@ -72,45 +73,46 @@ def add_team_project(team_id):
     roles = data.get('roles', {})
     if not project_id:
         return jsonify({'error': 'Project ID required'}), 400
+    try:
+        roles = {int(user_id): name for user_id, name in roles.items()}
+    except (AttributeError, ValueError):
+        return jsonify({'error': 'roles must map user ids to role names'}), 400
+    if not db.session.query(Project.id).filter(Project.id == project_id, Project.deleted_at.is_(None)).first():
+        return jsonify({'error': 'Project not found'}), 404
     if ProjectTeam.query.filter_by(team_id=team_id, project_id=project_id).first():
         return jsonify({'error': 'Project already associated'}), 409
-    pt = ProjectTeam(team_id=team_id, project_id=project_id)
-    db.session.add(pt)
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
-    for tm in team_members:
-        if not ProjectMember.query.filter_by(project_id=project_id, user_id=tm.user_id).first():
-            role = roles.get(str(tm.user_id), 'member')
-            pm = ProjectMember(project_id=project_id, user_id=tm.user_id, role=role) # This line assumes 'role' is a string, which is incorrect. A full fix requires mapping role name to role_id.
-            db.session.add(pm)
+    db.session.add(ProjectTeam(team_id=team_id, project_id=project_id))
+    db.session.flush()
+    try:
+        added = grant_team_access(team_id, project_ids=[project_id], roles=roles)
+    except UnknownRole as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     db.session.commit()
-    return jsonify({'message': 'Project associated'})
+    forget_permissions(added)
+    return jsonify({'message': 'Project associated', 'members_added': len(added)})
 
 @teams_bp.route('/teams/<int:team_id>/projects/<int:project_id>', methods=['DELETE'])
-@jwt_required()
+@jwt_required
 def remove_team_project(team_id, project_id):
     team = Team.query.get_or_404(team_id)
-    if team.admin_id != get_jwt_identity():
+    if team.admin_id != request.user.id:
         return jsonify({'error': 'Forbidden: You are not the admin of this team.'}), 403
         
     pt = ProjectTeam.query.filter_by(team_id=team_id, project_id=project_id).first()
     if not pt:
         return jsonify({'error': 'Project association not found'}), 404
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
-    for tm in team_members:
-        other_teams = ProjectTeam.query.filter(ProjectTeam.project_id==project_id, ProjectTeam.team_id!=team_id).all()
-        is_member_via_other_team = any(TeamMember.query.filter_by(team_id=ot.team_id, user_id=tm.user_id).first() for ot in other_teams)
-        direct_member = ProjectMember.query.filter_by(project_id=project_id, user_id=tm.user_id).first()
-        if direct_member and not is_member_via_other_team:
-            db.session.delete(direct_member)
+    removed = revoke_team_access(team_id, project_ids=[project_id])
     db.session.delete(pt)
     db.session.commit()
-    return jsonify({'message': 'Project disassociated'})
+    forget_permissions(removed)
+    return jsonify({'message': 'Project disassociated', 'members_removed': len(removed)})
 
 @teams_bp.route('/teams/<int:team_id>/members', methods=['POST'])
-@jwt_required()
+@jwt_required
 def add_team_member(team_id):
     team = Team.query.get_or_404(team_id)
-    if team.admin_id != get_jwt_identity():
+    if team.admin_id != request.user.id:
         return jsonify({'error': 'Forbidden: You are not the admin of this team.'}), 403
 
     data = request.get_json()
@@ -124,39 +126,38 @@ def add_team_member(team_id):
         return jsonify({'error': 'User already a member'}), 409
     tm = TeamMember(team_id=team_id, user_id=user.id)
     db.session.add(tm)
-    project_links = ProjectTeam.query.filter_by(team_id=team_id).all()
-    for pl in project_links:
-        if not ProjectMember.query.filter_by(project_id=pl.project_id, user_id=user.id).first():
-            pm = ProjectMember(project_id=pl.project_id, user_id=user.id, role='member') 
-            db.session.add(pm)
+    db.session.flush()
+    try:
+        added = grant_team_access(team_id, user_ids=[user.id])
+    except UnknownRole as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    team_membership_changed(user.id, 1)
     db.session.commit()
-    return jsonify({'message': 'Member added'})
+    forget_permissions(added)
+    return jsonify({'message': 'Member added', 'projects_added': len(added)})
 
 @teams_bp.route('/teams/<int:team_id>/members/<int:user_id>', methods=['DELETE'])
-@jwt_required()
+@jwt_required
 def remove_team_member(team_id, user_id):
     team = Team.query.get_or_404(team_id)
-    if team.admin_id != get_jwt_identity():
+    if team.admin_id != request.user.id:
         return jsonify({'error': 'Forbidden: You are not the admin of this team.'}), 403
 
     tm = TeamMember.query.filter_by(team_id=team_id, user_id=user_id).first()
     if not tm:
         return jsonify({'error': 'Member not found'}), 404
-    project_links = ProjectTeam.query.filter_by(team_id=team_id).all()
-    for pl in project_links:
-        other_teams = ProjectTeam.query.filter(ProjectTeam.project_id==pl.project_id, ProjectTeam.team_id!=team_id).all()
-        is_member_via_other_team = any(TeamMember.query.filter_by(team_id=ot.team_id, user_id=user_id).first() for ot in other_teams)
-        direct_member = ProjectMember.query.filter_by(project_id=pl.project_id, user_id=user_id).first()
-        if direct_member and not is_member_via_other_team:
-            db.session.delete(direct_member)
+    removed = revoke_team_access(team_id, user_ids=[user_id])
     db.session.delete(tm)
+    team_membership_changed(user_id, -1)
     db.session.commit()
-    return jsonify({'message': 'Member removed'}) 
+    forget_permissions(removed)
+    return jsonify({'message': 'Member removed', 'projects_removed': len(removed)}) 
 
 @teams_bp.route('/teams/my-teams', methods=['GET'])
-@jwt_required()
+@jwt_required
 def get_my_teams():
-    user_id = get_jwt_identity()
+    user_id = request.user.id
     if not user_id:
         return jsonify({'error': 'User not found'}), 401
     team_ids = [tm.team_id for tm in TeamMember.query.filter_by(user_id=user_id)]
@@ -0,0 +1,363 @@
+"""Synthetic datasets for benchmarking ('flask generate-data').
+
+Everything is drawn from one random.Random(seed), and timestamps count back
+from a fixed end date, so a seed and an end date always give the same rows on
+the same starting database (all but the password hash, whose salt is random).
+Rows are appended with explicit ids after the current maximum of each table.
+PostgreSQL loads them with COPY and then moves the id sequences past them.
+SQLite loads them with executemany. Run it against a database nobody else is
+writing to.
+
+The shape is skewed the way a real tracker is:
+- A few projects hold most items, and a few members of each project are
+  assigned most of them.
+- Older items are mostly done.
+- Epics own stories, and stories own tasks and bugs.
+- Activity follows each item's status changes, and assignees get a
+  notification for each assignment.
+
+Once the rows are loaded, the counter rows (project_stats, user_stats) of the
+new users and projects and the cached rollups of the new hierarchies are
+computed from them and stored in the same transaction, as the write paths
+would have left them.
+"""
+import csv
+import io
+import json
+import random
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+from sqlalchemy import func, select
+from werkzeug.security import generate_password_hash
+from models.db import db
+from models import User, Team, TeamMember, Project, ProjectTeam, Role, ProjectMember, BoardColumn, Item, Comment, ActivityLog, Notification
+from models import partitions
+from controllers import stats
+from controllers.hierarchy import refresh_rollups
+from controllers.ranking import spread_ranks
+from database import ROLE_MASKS
+
+PASSWORD = 'password'
+# Every generated user shares one hash; full-cost hashing would dominate the run
+PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+BATCH_SIZE = 10000
+# Ids per counter computation, under SQLite's bound-parameter limit
+STATS_CHUNK = 1000
+COLUMNS = (('To Do', 'todo'), ('In Progress', 'inprogress'), ('In Review', 'inreview'), ('Done', 'done'))
+STATUSES = [status for _, status in COLUMNS]
+ITEM_TYPES = (('epic', 1), ('story', 14), ('task', 55), ('bug', 20), ('feature', 10))
+PRIORITIES = (('Low', 30), ('Medium', 45), ('High', 20), ('Critical', 5))
+STORY_POINTS = (1, 2, 3, 5, 8, 13)
+MEMBER_ROLES = (('manager', 10), ('member', 80), ('visitor', 10))
+ZIPF_EXPONENT = 1.1
+UNASSIGNED_SHARE = 0.1
+READ_AFTER = timedelta(days=14)
+
+VERBS = ('Fix', 'Add', 'Improve', 'Refactor', 'Remove', 'Document', 'Speed up', 'Migrate', 'Test', 'Redesign')
+NOUNS = ('login', 'export', 'search', 'billing', 'dashboard', 'upload', 'report', 'notification', 'sync', 'permissions',
+         'onboarding', 'settings', 'timeline', 'invoice', 'profile', 'webhook', 'cache', 'import', 'audit log', 'checkout')
+PLACES = ('page', 'service', 'API', 'worker', 'modal', 'flow', 'job', 'widget', 'endpoint', 'screen')
+WORDS = ('the', 'user', 'when', 'after', 'fails', 'slow', 'request', 'timeout', 'error', 'button', 'data', 'should',
+         'retry', 'mobile', 'browser', 'customer', 'expected', 'missing', 'duplicate', 'value', 'field', 'update',
+         'release', 'regression', 'console', 'screenshot', 'steps', 'reproduce', 'works', 'again', 'deploy', 'review')
+
+def zipf_weights(count, exponent=ZIPF_EXPONENT):
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+class Choice:
+    """Weighted draws by bisecting cumulative weights, cheaper than random.choices per call."""
+    def __init__(self, values, weights):
+        self.values = list(values)
+        self.cumulative = list(accumulate(weights))
+
+    def draw(self, rng):
+        return self.values[bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+
+def weighted(pairs):
+    return Choice([value for value, _ in pairs], [weight for _, weight in pairs])
+
+def timestamp(value):
+    return value.isoformat(' ') if value else None
+
+class BulkLoader:
+    """Buffers rows per table and writes them in batches, parents before children.
+
+    A full buffer flushes every table before it in TABLES as well, so a row
+    never reaches the database before the rows it references.
+    """
+    TABLES = (User, Team, TeamMember, Project, ProjectTeam, Role, ProjectMember, BoardColumn, Item, Comment, ActivityLog, Notification)
+
+    def __init__(self, connection, batch_size=BATCH_SIZE):
+        self.connection = connection
+        self.postgres = connection.dialect.name == 'postgresql'
+        self.batch_size = batch_size
+        self.columns = {}
+        self.buffers = {model.__table__: [] for model in self.TABLES}
+        self.counts = dict.fromkeys(self.buffers, 0)
+        self.next_ids = {
+            table: (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+            for table in self.buffers if 'id' in table.c
+        }
+
+    def allocate(self, model):
+        table = model.__table__
+        row_id = self.next_ids[table]
+        self.next_ids[table] += 1
+        return row_id
+
+    def add(self, model, **row):
+        table = model.__table__
+        columns = self.columns.setdefault(table, tuple(row))
+        buffer = self.buffers[table]
+        buffer.append(tuple(row[c] for c in columns))
+        if len(buffer) >= self.batch_size:
+            self.flush(upto=table)
+
+    def flush(self, upto=None):
+        for table, buffer in self.buffers.items():
+            if buffer:
+                self._write(table, self.columns[table], buffer)
+                self.counts[table] += len(buffer)
+                buffer.clear()
+            if table is upto:
+                return
+
+    def _write(self, table, columns, rows):
+        preparer = self.connection.dialect.identifier_preparer
+        names = ', '.join(preparer.quote(c) for c in columns)
+        cursor = self.connection.connection.cursor()
+        try:
+            if self.postgres:
+                data = io.StringIO()
+                csv.writer(data, lineterminator='\n').writerows(rows)
+                data.seek(0)
+                cursor.copy_expert(f'COPY {preparer.format_table(table)} ({names}) FROM STDIN WITH (FORMAT csv)', data)
+            else:
+                placeholders = ', '.join('?' for _ in columns)
+                cursor.executemany(f'INSERT INTO {preparer.format_table(table)} ({names}) VALUES ({placeholders})', rows)
+        finally:
+            cursor.close()
+
+    def finish(self):
+        """Flush what is left, move PostgreSQL id sequences past the explicit ids, refresh planner statistics."""
+        self.flush()
+        if self.postgres:
+            for table in self.next_ids:
+                name = self.connection.dialect.identifier_preparer.format_table(table)
+                self.connection.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT max(id) FROM {name}))"
+                )
+        self.connection.exec_driver_sql('ANALYZE')
+        return {table.name: count for table, count in self.counts.items()}
+
+class DatasetGenerator:
+    def __init__(self, loader, seed=0, end=None, months=12):
+        self.loader = loader
+        self.rng = random.Random(seed)
+        self.end = end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = self.end - timedelta(days=30 * months)
+
+    def _moment(self, after=None):
+        after = after or self.start
+        return after + (self.end - after) * self.rng.random()
+
+    def _text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize() + '.'
+
+    def _title(self):
+        rng = self.rng
+        return f'{rng.choice(VERBS)} {rng.choice(NOUNS)} {rng.choice(PLACES)}'
+
+    def generate(self, users, teams, projects, items, comments=1.0, activity=1.0, progress=None):
+        """Load the rows; returns (user ids, project ids, ids of the hierarchy roots that have children)."""
+        user_ids = self._users(users)
+        team_members = self._teams(teams, user_ids)
+        project_members = self._projects(projects, team_members)
+        roots = self._items(items, project_members, comments, activity, progress)
+        return user_ids, list(project_members), roots
+
+    def _users(self, count):
+        password_hash = generate_password_hash(PASSWORD, method=PASSWORD_HASH_METHOD)
+        ids = []
+        for _ in range(count):
+            user_id = self.loader.allocate(User)
+            created = self._moment()
+            self.loader.add(User, id=user_id, username=f'user{user_id}', email=f'user{user_id}@example.com',
+                            password_hash=password_hash, role='visitor' if self.rng.random() < 0.05 else 'member',
+                            created_at=timestamp(created), updated_at=timestamp(created))
+            ids.append(user_id)
+        return ids
+
+    def _teams(self, count, user_ids):
+        """{team_id: [user_id, ...]}, the first member being the team admin; a few teams are large."""
+        rng = self.rng
+        team_ids = [self.loader.allocate(Team) for _ in range(count)]
+        pick = Choice(team_ids, zipf_weights(count))
+        members = {team_id: [] for team_id in team_ids}
+        for user_id in user_ids:
+            for team_id in {pick.draw(rng) for _ in range(1 + int(rng.expovariate(2)))}:
+                members[team_id].append(user_id)
+        for team_id in team_ids:
+            if not members[team_id]:
+                members[team_id].append(rng.choice(user_ids))
+            created = timestamp(self._moment())
+            self.loader.add(Team, id=team_id, name=f'Team {team_id}', description=self._text(8),
+                            admin_id=members[team_id][0], created_at=created, updated_at=created)
+            for user_id in members[team_id]:
+                self.loader.add(TeamMember, team_id=team_id, user_id=user_id)
+        return members
+
+    def _projects(self, count, team_members):
+        """{project_id: ({user_id: role name}, [column ids by status])}, memberships granted through linked teams."""
+        rng = self.rng
+        team_ids = list(team_members)
+        pick_team = Choice(team_ids, zipf_weights(len(team_ids)))
+        member_role = weighted(MEMBER_ROLES)
+        column_ranks = spread_ranks(len(COLUMNS))
+        projects = {}
+        for _ in range(count):
+            project_id = self.loader.allocate(Project)
+            owner_team = pick_team.draw(rng)
+            linked = {owner_team}
+            if rng.random() < 0.3:
+                linked.add(pick_team.draw(rng))
+            admin_id = team_members[owner_team][0]
+            created = self._moment()
+            self.loader.add(Project, id=project_id, name=f'Project {project_id}', description=self._text(12),
+                            admin_id=admin_id, owner_team_id=owner_team, change_seq=0,
+                            created_at=timestamp(created), updated_at=timestamp(created))
+            role_ids = {}
+            for name, mask in ROLE_MASKS.items():
+                role_ids[name] = self.loader.allocate(Role)
+                self.loader.add(Role, id=role_ids[name], name=name, project_id=project_id, permission_mask=mask)
+            roles = {admin_id: 'admin'}
+            for team_id in sorted(linked):
+                self.loader.add(ProjectTeam, project_id=project_id, team_id=team_id)
+                for user_id in team_members[team_id]:
+                    roles.setdefault(user_id, member_role.draw(rng))
+            for user_id, role in roles.items():
+                self.loader.add(ProjectMember, user_id=user_id, project_id=project_id, role_id=role_ids[role])
+            column_ids = []
+            for order, ((name, _), rank) in enumerate(zip(COLUMNS, column_ranks), start=1):
+                column_id = self.loader.allocate(BoardColumn)
+                self.loader.add(BoardColumn, id=column_id, name=name, project_id=project_id, order=order, rank=rank,
+                                created_at=timestamp(created), updated_at=timestamp(created))
+                column_ids.append(column_id)
+            projects[project_id] = (roles, column_ids)
+        return projects
+
+    def _status(self, age):
+        """Index into STATUSES; older items are more likely done."""
+        if self.rng.random() < 0.15 + 0.75 * age:
+            return 3
+        return bisect((5, 8, 10), self.rng.random() * 10)
+
+    def _items(self, count, projects, comments, activity, progress):
+        rng = self.rng
+        project_ids = list(projects)
+        pick_project = Choice(project_ids, zipf_weights(len(project_ids)))
+        # First pass: project and status of every item, so each column's ranks can be spread evenly
+        plan = []
+        column_counts = {}
+        for index in range(count):
+            project_id = pick_project.draw(rng)
+            status = self._status(1 - index / count)
+            plan.append((project_id, status))
+            column_id = projects[project_id][1][status]
+            column_counts[column_id] = column_counts.get(column_id, 0) + 1
+        ranks = {column_id: iter(spread_ranks(n)) for column_id, n in column_counts.items()}
+
+        assignees, reporters, everyone = {}, {}, {}
+        for project_id, (roles, _) in projects.items():
+            members = sorted(roles)
+            rng.shuffle(members)
+            everyone[project_id] = members
+            assignees[project_id] = Choice(members, zipf_weights(len(members)))
+            reporters[project_id] = [u for u in members if roles[u] != 'visitor'] or members
+        item_type = weighted(ITEM_TYPES)
+        priority = weighted(PRIORITIES)
+        epics, stories = {}, {}
+        story_roots, roots = {}, set()
+        span = self.end - self.start
+        for index, (project_id, status) in enumerate(plan):
+            item_id = self.loader.allocate(Item)
+            created = self.start + span * ((index + rng.random()) / count)
+            kind = item_type.draw(rng)
+            parent_id = None
+            if kind == 'story' and epics.get(project_id) and rng.random() < 0.9:
+                parent_id = rng.choice(epics[project_id][-20:])
+                story_roots[item_id] = parent_id
+                roots.add(parent_id)
+            elif kind in ('task', 'bug') and stories.get(project_id) and rng.random() < 0.6:
+                parent_id = rng.choice(stories[project_id][-50:])
+                roots.add(story_roots.get(parent_id, parent_id))
+            if kind == 'epic':
+                epics.setdefault(project_id, []).append(item_id)
+            elif kind == 'story':
+                stories.setdefault(project_id, []).append(item_id)
+            title = self._title()
+            reporter_id = rng.choice(reporters[project_id])
+            assignee_id = None if rng.random() < UNASSIGNED_SHARE else assignees[project_id].draw(rng)
+            updated = self._moment(created) if status else created
+            due = (created + timedelta(days=rng.randint(3, 60))).date() if rng.random() < 0.5 else None
+            column_id = projects[project_id][1][status]
+            self.loader.add(Item, id=item_id, title=title, description=self._text(rng.randint(5, 40)),
+                            type=kind, status=STATUSES[status], column_id=column_id, rank=next(ranks[column_id]),
+                            project_id=project_id, reporter_id=reporter_id, assignee_id=assignee_id,
+                            due_date=due.isoformat() if due else None, priority=priority.draw(rng),
+                            severity=rng.choice(('minor', 'major')) if kind == 'bug' else None,
+                            steps_to_reproduce=self._text(15) if kind == 'bug' else None,
+                            created_at=timestamp(created), updated_at=timestamp(updated), start_date=None,
+                            parent_id=parent_id, story_points=rng.choice(STORY_POINTS) if kind not in ('epic', 'story') and rng.random() < 0.8 else None,
+                            change_seq=0)
+            self._history(item_id, title, status, created, reporter_id, assignee_id, everyone[project_id], activity)
+            for _ in range(int(rng.expovariate(1 / comments) + 0.5) if comments else 0):
+                self.loader.add(Comment, id=self.loader.allocate(Comment), item_id=item_id,
+                                user_id=rng.choice(everyone[project_id]), content=self._text(rng.randint(3, 30)),
+                                created_at=timestamp(self._moment(created)))
+            if progress and (index + 1) % 100000 == 0:
+                progress(index + 1)
+        return sorted(roots)
+
+    def _history(self, item_id, title, status, created, reporter_id, assignee_id, members, extra):
+        """Activity for the item's creation, each status step up to its current one, and a few other edits."""
+        rng = self.rng
+        events = [(created, reporter_id, 'created', {'title': [None, title]})]
+        moment = created
+        for step in range(status):
+            moment = self._moment(moment)
+            events.append((moment, assignee_id or reporter_id, 'updated', {'status': [STATUSES[step], STATUSES[step + 1]]}))
+        for _ in range(int(rng.expovariate(1 / extra) + 0.5) if extra else 0):
+            old, new = rng.sample([name for name, _ in PRIORITIES], 2)
+            events.append((self._moment(created), rng.choice(members), 'updated', {'priority': [old, new]}))
+        for moment, user_id, action, changes in events:
+            self.loader.add(ActivityLog, id=self.loader.allocate(ActivityLog), item_id=item_id, user_id=user_id,
+                            action=action, changes=json.dumps(changes), created_at=timestamp(moment))
+        if assignee_id:
+            self.loader.add(Notification, id=self.loader.allocate(Notification), user_id=assignee_id,
+                            message=f"You have been assigned to task '{title}'",
+                            is_read=self.end - created > READ_AFTER and rng.random() < 0.95,
+                            created_at=timestamp(created))
+
+def generate_dataset(users, teams, projects, items, seed=0, end=None, months=12, comments=1.0, activity=1.0,
+                     batch_size=BATCH_SIZE, progress=None):
+    """Append a synthetic dataset, with its counter rows and rollups, in one transaction; returns rows written per table."""
+    connection = db.session.connection()
+    generator = DatasetGenerator(BulkLoader(connection, batch_size), seed, end, months)
+    if partitions.is_partitioned(connection):
+        # Monthly partitions for the whole history, so nothing lands in the DEFAULT partition
+        month = partitions.month_start(generator.start)
+        while month <= generator.end:
+            partitions.create_month_partition(connection, month)
+            month = partitions.add_months(month, 1)
+    user_ids, project_ids, roots = generator.generate(users, teams, projects, items, comments, activity, progress)
+    counts = generator.loader.finish()
+    for start in range(0, len(user_ids), STATS_CHUNK):
+        stats.create_user_stats(user_ids[start:start + STATS_CHUNK])
+    for start in range(0, len(project_ids), STATS_CHUNK):
+        stats.create_project_stats(project_ids[start:start + STATS_CHUNK])
+    counts['user_stats'], counts['project_stats'] = len(user_ids), len(project_ids)
+    counts['item_rollup'] = sum(len(refresh_rollups(root_id)) for root_id in roots)
+    db.session.commit()
+    return counts
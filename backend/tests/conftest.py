@@ -0,0 +1,72 @@
+import itertools
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+
+# The app reads its database URL at import time. TEST_DATABASE_URL runs the
+# suite against another database, e.g. PostgreSQL; it is dropped and reseeded.
+DB_DIR = tempfile.mkdtemp(prefix='jira-clone-tests-')
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL') or f'sqlite:///{os.path.join(DB_DIR, "test.db")}'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app  # noqa: E402
+from database import reset_and_seed_db  # noqa: E402
+from models.db import db  # noqa: E402
+
+_project_names = itertools.count(1)
+
+@pytest.fixture(scope='session')
+def app():
+    with flask_app.app_context():
+        reset_and_seed_db()
+    return flask_app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def login(client):
+    def login(email='alice@example.com', password='password'):
+        token = client.post('/login', json={'email': email, 'password': password}).get_json()['token']
+        return {'Authorization': f'Bearer {token}'}
+    return login
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager yielding a list that collects every SQL statement run inside it."""
+    @contextmanager
+    def count():
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+    return count
+
+@pytest.fixture
+def project(client, login):
+    """A fresh project administered by alice: {'id': ..., 'columns': [column ids in board order]}."""
+    headers = login()
+    project_id = client.post('/projects', json={'name': f'Project {next(_project_names)}'}, headers=headers).get_json()['project']['id']
+    columns = client.get(f'/projects/{project_id}/columns', headers=headers).get_json()['columns']
+    return {'id': project_id, 'columns': [c['id'] for c in columns]}
+
+@pytest.fixture
+def make_item(client, login):
+    """Create an item as alice in the first column of project (a project fixture dict); returns its id."""
+    def make_item(project, title, **fields):
+        response = client.post(f'/items/projects/{project["id"]}/items', headers=login(),
+                               json=dict({'title': title, 'column_id': project['columns'][0]}, **fields))
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['item']['id']
+    return make_item
@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import insert
+from models.db import db
+from models.item import Item
+from models.activity_log import ActivityLog, ActivitySegmentItem
+from controllers.activity import archive_month
+from controllers.ranking import spread_ranks
+
+MONTH = datetime(2020, 1, 1)
+
+def test_deleting_an_item_drops_its_archived_segment_entries(app, client, login, tmp_path, monkeypatch):
+    headers = login()
+    monkeypatch.setitem(app.config, 'ACTIVITY_ARCHIVE_DIR', str(tmp_path))
+    with app.app_context():
+        item_id = db.session.scalars(insert(Item).returning(Item.id), [{
+            'title': 'Archived', 'type': 'task', 'status': 'todo', 'column_id': 1, 'project_id': 1, 'reporter_id': 1,
+            'rank': spread_ranks(1)[0], 'created_at': MONTH, 'updated_at': MONTH
+        }]).one()
+        db.session.execute(insert(ActivityLog), [
+            {'item_id': item_id, 'user_id': 1, 'action': 'updated', 'changes': {'status': ['todo', 'done']},
+             'created_at': MONTH.replace(day=day)} for day in (2, 3)
+        ])
+        db.session.commit()
+        assert archive_month(MONTH) == 2
+    response = client.get(f'/items/{item_id}/activity', headers=headers)
+    assert len(response.get_json()['activity_logs']) == 2
+
+    assert client.delete(f'/items/{item_id}', headers=headers).status_code == 200
+    with app.app_context():
+        assert ActivitySegmentItem.query.filter_by(item_id=item_id).count() == 0
@@ -0,0 +1,14 @@
+from models.db import db
+from models.user import User
+
+def test_deleted_user_is_refused_before_the_principal_expires(app, client, login):
+    client.post('/register', json={'username': 'frank', 'email': 'frank@example.com', 'password': 'secret'})
+    headers = login('frank@example.com', 'secret')
+    assert client.get('/me', headers=headers).status_code == 200
+    with app.app_context():
+        user = User.query.filter_by(email='frank@example.com').one()
+        db.session.delete(user)
+        db.session.commit()
+    response = client.get('/me', headers=headers)
+    assert response.status_code == 404
+    assert response.get_json()['error'] == 'User not found'
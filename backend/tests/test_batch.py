@@ -0,0 +1,42 @@
+from models.db import db
+from models.item import Item
+
+def test_batch_reports_a_status_per_operation(app, client, login, project, make_item):
+    headers = login()
+    first = make_item(project, 'First')
+    parent = make_item(project, 'Parent')
+    make_item(project, 'Child', parent_id=parent)
+    response = client.post(f'/projects/{project["id"]}/items:batch', headers=headers, json={'operations': [
+        {'op': 'create', 'data': {'title': 'Made in a batch', 'column_id': project['columns'][1]}},
+        {'op': 'update', 'id': first, 'data': {'status': 'done'}},
+        {'op': 'update', 'id': first, 'data': {'title': ''}},
+        {'op': 'delete', 'id': parent},
+        {'op': 'delete', 'id': 999999},
+        {'op': 'rename', 'id': first},
+    ]})
+    assert response.status_code == 200
+    assert [r['status'] for r in response.get_json()['results']] == [201, 200, 400, 409, 404, 400]
+    with app.app_context():
+        assert db.session.get(Item, first).status == 'done'
+        assert db.session.get(Item, parent) is not None
+
+def test_single_and_batch_writes_refuse_another_projects_column_and_parent(app, client, login, project, make_item):
+    headers = login()
+    item_id = make_item(project, 'Stays home')
+    foreign_column = 1
+    foreign_parent = make_item({'id': 1, 'columns': [foreign_column]}, 'Elsewhere')
+    own_column = project['columns'][0]
+
+    for fields, error in (({'column_id': foreign_column}, f'Invalid column_id: {foreign_column}'),
+                          ({'parent_id': foreign_parent}, f'Invalid parent_id: {foreign_parent}')):
+        response = client.patch(f'/items/{item_id}', headers=headers, json=fields)
+        assert response.status_code == 400 and response.get_json()['error'] == error
+        response = client.post(f'/items/projects/{project["id"]}/items', headers=headers,
+                               json=dict({'title': 'New', 'column_id': own_column}, **fields))
+        assert response.status_code == 400 and response.get_json()['error'] == error
+        response = client.post(f'/projects/{project["id"]}/items:batch', headers=headers,
+                               json={'operations': [{'op': 'update', 'id': item_id, 'data': fields}]})
+        assert response.get_json()['results'][0]['error'] == error
+    with app.app_context():
+        item = db.session.get(Item, item_id)
+        assert (item.column_id, item.parent_id) == (own_column, None)
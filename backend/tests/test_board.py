@@ -0,0 +1,22 @@
+def test_board_revalidates_until_the_project_changes(client, login, project, make_item):
+    headers = login()
+    item_id = make_item(project, 'Card')
+    url = f'/projects/{project["id"]}/board'
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert [i['id'] for i in response.get_json()['columns'][0]['items']] == [item_id]
+
+    cached = client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+    assert cached.status_code == 304 and cached.data == b''
+    assert cached.headers['ETag'] == etag
+
+    assert client.patch(f'/items/{item_id}', headers=headers, json={'title': 'Renamed card'}).status_code == 200
+    changed = client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert changed.get_json()['columns'][0]['items'][0]['title'] == 'Renamed card'
+
+    etag = changed.headers['ETag']
+    assert client.patch(f'/projects/{project["id"]}', headers=headers, json={'name': 'Renamed project'}).status_code == 200
+    renamed = client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+    assert renamed.status_code == 200 and renamed.get_json()['project']['name'] == 'Renamed project'
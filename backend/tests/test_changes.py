@@ -0,0 +1,27 @@
+def changes(client, headers, project, since=None):
+    url = f'/projects/{project["id"]}/changes' + (f'?since={since}' if since is not None else '')
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def test_sync_token_returns_only_later_writes_and_deletions(client, login, project, make_item):
+    headers = login()
+    kept = make_item(project, 'Kept')
+    removed = make_item(project, 'Removed')
+    start = changes(client, headers, project)
+    assert start['reset'] is True
+
+    assert client.patch(f'/items/{kept}', headers=headers, json={'title': 'Kept, renamed'}).status_code == 200
+    added = make_item(project, 'Added')
+    assert client.delete(f'/items/{removed}', headers=headers).status_code == 200
+    delta = changes(client, headers, project, start['next_token'])
+    assert delta['reset'] is False
+    assert [(i['id'], i['title']) for i in delta['items']] == [(kept, 'Kept, renamed'), (added, 'Added')]
+    assert delta['deleted'] == [removed]
+
+    idle = changes(client, headers, project, delta['next_token'])
+    assert (idle['items'], idle['deleted'], idle['next_token']) == ([], [], delta['next_token'])
+
+def test_malformed_sync_token_is_refused(client, login, project):
+    response = client.get(f'/projects/{project["id"]}/changes?since=yesterday', headers=login())
+    assert response.status_code == 400
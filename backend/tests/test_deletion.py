@@ -0,0 +1,44 @@
+from models.db import db
+from models.activity_log import ActivityLog
+from models.item import Item
+from models.project import Project
+from controllers import deletion
+
+def remaining(app, project_id):
+    with app.app_context():
+        return (
+            db.session.query(Project.id).filter(Project.id == project_id).count(),
+            Item.query.filter_by(project_id=project_id).count(),
+            ActivityLog.query.join(Item, ActivityLog.item_id == Item.id).filter(Item.project_id == project_id).count(),
+        )
+
+def test_small_project_is_deleted_inline(app, client, login, project, make_item):
+    headers = login()
+    make_item(project, 'Only card')
+    response = client.delete(f'/projects/{project["id"]}', headers=headers)
+    assert response.status_code == 200
+    assert remaining(app, project['id']) == (0, 0, 0)
+
+def test_large_project_is_hidden_then_purged_in_batches(app, client, login, project, make_item, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(deletion, 'INLINE_PROJECT_ITEMS', 2)
+    monkeypatch.setattr(deletion, 'schedule_purge', scheduled.append)
+    headers = login()
+    for n in range(5):
+        make_item(project, f'Card {n}')
+    assert remaining(app, project['id'])[2] > 0
+
+    response = client.delete(f'/projects/{project["id"]}', headers=headers)
+    assert response.status_code == 202 and response.get_json()['items'] == 5
+    assert scheduled == [project['id']]
+    assert client.get(f'/projects/{project["id"]}/board', headers=headers).status_code == 403
+    assert client.get(f'/projects/{project["id"]}/deletion', headers=headers).get_json()['items_remaining'] == 5
+    assert client.delete(f'/projects/{project["id"]}', headers=headers).status_code == 403
+
+    batches = []
+    with app.app_context():
+        assert deletion.pending_purges() == [project['id']]
+        assert deletion.purge_project(project['id'], batch_size=2, progress=batches.append) == 5
+        assert deletion.pending_purges() == []
+    assert batches == [2, 4, 5]
+    assert remaining(app, project['id']) == (0, 0, 0)
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from models.db import db
+from models.item_rollup import ItemRollup
+from controllers.hierarchy import compute_rollups
+
+def stored_rollups(app, ids):
+    with app.app_context():
+        return {r.item_id: (r.leaves_done, r.story_points_done, r.computed_at)
+                for r in ItemRollup.query.filter(ItemRollup.item_id.in_(ids))}
+
+def test_leaf_change_recomputes_only_its_ancestors(app, client, login, project, make_item):
+    headers = login()
+    epic = make_item(project, 'Epic', type='epic')
+    story = make_item(project, 'Story', type='story', parent_id=epic)
+    task = make_item(project, 'Task', parent_id=story, story_points=3)
+    make_item(project, 'Other task', parent_id=story, story_points=5)
+    sibling = make_item(project, 'Sibling story', type='story', parent_id=epic)
+    make_item(project, 'Sibling task', parent_id=sibling, story_points=8)
+    other_epic = make_item(project, 'Other epic', type='epic')
+    make_item(project, 'Other epic task', parent_id=other_epic)
+    ids = (epic, story, sibling, other_epic)
+    before = stored_rollups(app, ids)
+    assert set(before) == set(ids)
+
+    assert client.patch(f'/items/{task}', headers=headers, json={'status': 'done'}).status_code == 200
+    after = stored_rollups(app, ids)
+    assert after[story][:2] == (1, 3) and after[epic][:2] == (1, 3)
+    assert after[story][2] > before[story][2] and after[epic][2] > before[epic][2]
+    assert after[sibling] == before[sibling] and after[other_epic] == before[other_epic]
+    with app.app_context():
+        computed = compute_rollups(epic)
+    assert {i: (v['leaves_done'], v['story_points_done']) for i, v in computed.items()} == \
+        {i: after[i][:2] for i in (epic, story, sibling)}
+
+def test_tree_trusts_stored_rollups_however_old(app, client, login, project, make_item):
+    headers = login()
+    epic = make_item(project, 'Old epic', type='epic')
+    make_item(project, 'Old task', parent_id=epic)
+    with app.app_context():
+        db.session.execute(update(ItemRollup).where(ItemRollup.item_id == epic).values(
+            leaves_total=42, computed_at=datetime.utcnow() - timedelta(days=30)
+        ))
+        db.session.commit()
+    tree = client.get(f'/items/{epic}/tree', headers=headers).get_json()
+    assert tree['tree']['rollup']['leaves_total'] == 42
+
+def test_moves_and_deletes_keep_stored_rollups_equal_to_computed(app, client, login, project, make_item):
+    headers = login()
+    old_epic = make_item(project, 'Old parent', type='epic')
+    story = make_item(project, 'Moving story', type='story', parent_id=old_epic)
+    make_item(project, 'Moving task', parent_id=story, story_points=2, due_date='2030-01-05')
+    kept = make_item(project, 'Kept task', parent_id=old_epic, story_points=1)
+    new_epic = make_item(project, 'New parent', type='epic')
+    make_item(project, 'New sibling', parent_id=new_epic)
+
+    assert client.patch(f'/items/{story}', headers=headers, json={'parent_id': new_epic}).status_code == 200
+    assert client.delete(f'/items/{kept}', headers=headers).status_code == 200
+    with app.app_context():
+        stored = {r.item_id: (r.leaves_total, r.story_points, r.latest_due_date)
+                  for r in ItemRollup.query.filter(ItemRollup.item_id.in_((old_epic, story, new_epic)))}
+        computed = {**compute_rollups(old_epic), **compute_rollups(new_epic)}
+    assert stored == {i: (v['leaves_total'], v['story_points'], v['latest_due_date']) for i, v in computed.items()}
+    assert old_epic not in stored and stored[new_epic][:2] == (2, 2)
@@ -0,0 +1,44 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import insert
+from models.db import db
+from models.item import Item
+from models.comment import Comment
+from models.activity_log import ActivityLog
+from controllers.ranking import spread_ranks
+
+def seed_item(size):
+    """One item in the demo project with `size` comments, activity rows and subtasks."""
+    now = datetime.utcnow()
+    base = dict(type='task', status='todo', column_id=1, project_id=1, reporter_id=1, assignee_id=2, created_at=now, updated_at=now)
+    ranks = spread_ranks(size + 1)
+    item_id = db.session.scalars(insert(Item).returning(Item.id), [dict(base, title=f'Detail {size}', rank=ranks[0])]).one()
+    db.session.execute(insert(Item), [dict(base, title=f'Subtask {n}', rank=ranks[n + 1], parent_id=item_id) for n in range(size)])
+    db.session.execute(insert(Comment), [
+        {'item_id': item_id, 'user_id': 1 + n % 4, 'content': f'Comment {n}', 'created_at': now} for n in range(size)
+    ])
+    db.session.execute(insert(ActivityLog), [
+        {'item_id': item_id, 'user_id': 1 + n % 4, 'action': 'updated', 'changes': {'status': ['todo', 'inprogress']}, 'created_at': now}
+        for n in range(size)
+    ])
+    db.session.commit()
+    return item_id
+
+@pytest.mark.parametrize('small, large', [(1, 200)])
+def test_item_detail_query_count_does_not_grow(app, client, login, count_queries, small, large):
+    headers = login()
+    counts = {}
+    for size in (small, large):
+        with app.app_context():
+            item_id = seed_item(size)
+        # The first request warms the principal and permission caches
+        assert client.get(f'/items/{item_id}', headers=headers).status_code == 200
+        with count_queries() as statements:
+            response = client.get(f'/items/{item_id}', headers=headers)
+        assert response.status_code == 200
+        item = response.get_json()['item']
+        assert len(item['comments']) == size and len(item['subtasks']) == size
+        assert {c['author_name'] for c in item['comments']} <= {'alice', 'bob', 'carol', 'dave'}
+        counts[size] = len(statements)
+    assert counts[small] == counts[large]
+    assert counts[large] <= 4
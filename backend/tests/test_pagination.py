@@ -0,0 +1,37 @@
+def walk(client, headers, url):
+    """Follow next_cursor from the first page; returns the ids in order and the number of pages."""
+    ids, cursor, pages = [], '', 0
+    while cursor is not None:
+        response = client.get(f'{url}&cursor={cursor}', headers=headers)
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        ids += [i['id'] for i in page['items']]
+        cursor, pages = page['next_cursor'], pages + 1
+    return ids, pages
+
+def test_cursor_pages_cover_every_item_once(client, login, project, make_item):
+    headers = login()
+    created = [make_item(project, f'Card {n}') for n in range(5)]
+    url = f'/items/projects/{project["id"]}/items?limit=2'
+    assert walk(client, headers, url) == (created, 3)
+    assert walk(client, headers, url + '&direction=desc')[0] == created[::-1]
+
+def test_writes_between_pages_do_not_shift_the_next_page(client, login, project, make_item):
+    headers = login()
+    created = [make_item(project, f'Card {n}') for n in range(4)]
+    url = f'/items/projects/{project["id"]}/items?limit=2&cursor='
+    first = client.get(url, headers=headers).get_json()
+    assert client.delete(f'/items/{created[0]}', headers=headers).status_code == 200
+    second = client.get(url + first['next_cursor'], headers=headers).get_json()
+    assert [i['id'] for i in second['items']] == created[2:]
+
+def test_cursor_from_another_sort_is_refused(client, login, project, make_item):
+    headers = login()
+    for n in range(3):
+        make_item(project, f'Card {n}')
+    url = f'/items/projects/{project["id"]}/items?limit=1'
+    cursor = client.get(f'{url}&cursor=', headers=headers).get_json()['next_cursor']
+    response = client.get(f'{url}&sort=created_at&cursor={cursor}', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Cursor does not match the requested sort order'
+    assert client.get(f'{url}&cursor=garbage', headers=headers).status_code == 400
@@ -0,0 +1,119 @@
+import os
+import re
+from datetime import datetime
+import pytest
+from sqlalchemy import func, select, text
+from models.db import db
+from models.activity_log import ActivityLog
+from models.comment import Comment
+from models.item import Item
+from models.item_tombstone import ItemTombstone
+from models.notification import Notification
+from models.project_member import ProjectJoinRequest
+
+# Every hot lookup must reach these tables through an index. SQLite reports a
+# full read as 'SCAN <table>' (with or without an index, which is still every
+# row); PostgreSQL as 'Seq Scan on <table>'. Walking a partial index whole is
+# fine: it only holds the rows its WHERE clause selects.
+#
+# What the planner picks depends on the data, so the real check is opt-in:
+# PLAN_DATASET_ITEMS=1000000 appends a synthetic dataset of that many items to
+# the test database, runs ANALYZE, and explains each query for the busiest
+# project, column, user and item. Run this file on its own for that, against
+# TEST_DATABASE_URL for PostgreSQL. Without it, SQLite plans the demo seed
+# with no statistics, which only shows that an index matches; PostgreSQL would
+# rightly read tables that small whole, so there the check is skipped.
+GUARDED_TABLES = {'item', 'activity_log', 'notification'}
+DATASET_ITEMS = int(os.environ.get('PLAN_DATASET_ITEMS') or 0)
+DATASET_END = datetime(2026, 1, 1)
+
+HOT_QUERIES = {
+    'project items by status': lambda p: select(Item.id).where(Item.project_id == p['project'], Item.status == 'todo'),
+    'project items by type': lambda p: select(Item.id).where(Item.project_id == p['project'], Item.type == 'bug'),
+    'board column cards': lambda p: select(Item.id).where(Item.column_id == p['column']).order_by(Item.rank, Item.id),
+    'my tasks': lambda p: select(Item.id).where(Item.assignee_id == p['user']).order_by(Item.id),
+    'reported items': lambda p: select(func.count(Item.id)).where(Item.reporter_id == p['user']),
+    'subtasks': lambda p: select(Item.id).where(Item.parent_id == p['parent']).order_by(Item.rank, Item.id),
+    'board changes since': lambda p: select(Item.id).where(Item.project_id == p['project'], Item.change_seq > p['seq']),
+    'tombstones since': lambda p: select(ItemTombstone.item_id).where(
+        ItemTombstone.project_id == p['project'], ItemTombstone.change_seq > p['seq']
+    ),
+    'item comments': lambda p: select(Comment.id).where(Comment.item_id == p['item']).order_by(Comment.created_at),
+    'item activity page': lambda p: select(ActivityLog.id).where(ActivityLog.item_id == p['item'])
+        .order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(50),
+    'notifications page': lambda p: select(Notification.id).where(Notification.user_id == p['user'])
+        .order_by(Notification.created_at.desc(), Notification.id.desc()).limit(50),
+    'unread notifications': lambda p: select(Notification.id).where(Notification.user_id == p['user'], Notification.is_read == False),
+    'read notifications to purge': lambda p: select(Notification.id).where(Notification.is_read == True)
+        .order_by(Notification.created_at).limit(1000),
+    'pending join requests': lambda p: select(ProjectJoinRequest.id).where(
+        ProjectJoinRequest.project_id == p['project'], ProjectJoinRequest.type == 'request', ProjectJoinRequest.status == 'pending'
+    ),
+}
+
+def busiest(column, *criteria):
+    return db.session.query(column).filter(column.isnot(None), *criteria).group_by(column).order_by(
+        func.count().desc(), column
+    ).limit(1).scalar()
+
+@pytest.fixture(scope='module')
+def plan_params(app):
+    """Ids the hot queries are explained for, after seeding and analyzing PLAN_DATASET_ITEMS items if asked."""
+    with app.app_context():
+        if DATASET_ITEMS:
+            from synthetic_data import generate_dataset
+            generate_dataset(max(20, DATASET_ITEMS // 100), max(2, DATASET_ITEMS // 2000), max(2, DATASET_ITEMS // 10000),
+                             DATASET_ITEMS, seed=0, end=DATASET_END)
+            # generate_dataset analyzes too; this covers whatever the test run has written since
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+        elif db.engine.dialect.name == 'postgresql':
+            pytest.skip('PostgreSQL plans need a realistic dataset; set PLAN_DATASET_ITEMS')
+        project = busiest(Item.project_id)
+        return {
+            'project': project,
+            'column': busiest(Item.column_id),
+            'user': busiest(Item.assignee_id),
+            'parent': busiest(Item.parent_id),
+            'item': busiest(ActivityLog.item_id),
+            'seq': max(0, (db.session.query(func.max(Item.change_seq)).filter(Item.project_id == project).scalar() or 0) - 5),
+        }
+
+def explain(statement):
+    """The plan of statement as lines of text, from EXPLAIN QUERY PLAN on SQLite and EXPLAIN on PostgreSQL."""
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    if db.engine.dialect.name == 'postgresql':
+        return [line for (line,) in db.session.execute(text('EXPLAIN ' + sql))]
+    return [row.detail for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+
+def partial_indexes():
+    return {
+        index.name for table in db.metadata.tables.values() for index in table.indexes
+        if index.dialect_options['sqlite'].get('where') is not None
+    }
+
+def full_scans(plan):
+    if db.engine.dialect.name == 'postgresql':
+        return {m.group(1) for line in plan for m in [re.search(r'Seq Scan on (\w+)', line)] if m} & GUARDED_TABLES
+    partial = partial_indexes()
+    return {
+        m.group(1) for line in plan for m in [re.match(r'SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?', line.strip())]
+        if m and m.group(2) not in partial
+    } & GUARDED_TABLES
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(app, plan_params, name):
+    with app.app_context():
+        try:
+            plan = explain(HOT_QUERIES[name](plan_params))
+            assert not full_scans(plan), '\n'.join(plan)
+        finally:
+            db.session.rollback()
+
+def test_full_scan_is_detected(app, plan_params):
+    with app.app_context():
+        try:
+            plan = explain(select(Item.id).where(Item.title == 'Setup project'))
+            assert full_scans(plan) == {'item'}
+        finally:
+            db.session.rollback()
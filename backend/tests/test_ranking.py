@@ -0,0 +1,49 @@
+from models.db import db
+from models.item import Item
+from controllers import ranking
+
+def board_order(client, headers, project):
+    columns = client.get(f'/projects/{project["id"]}/board', headers=headers).get_json()['columns']
+    return [[(i['id'], i['rank']) for i in c['items']] for c in columns]
+
+def move(client, headers, item_id, **placement):
+    response = client.post(f'/items/{item_id}/move', headers=headers, json=placement)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['item']['rank']
+
+def test_move_writes_only_the_moved_card(client, login, project, make_item):
+    headers = login()
+    a, b, c = (make_item(project, title) for title in 'abc')
+    ranks = dict(board_order(client, headers, project)[0])
+
+    rank = move(client, headers, c, before_id=a, after_id=b)
+    assert ranks[a] < rank < ranks[b]
+    assert board_order(client, headers, project)[0] == [(a, ranks[a]), (c, rank), (b, ranks[b])]
+
+    move(client, headers, a, column_id=project['columns'][1])
+    first, second = board_order(client, headers, project)[:2]
+    assert first == [(c, rank), (b, ranks[b])] and [i for i, _ in second] == [a]
+
+    response = client.post(f'/items/{b}/move', headers=headers, json={'before_id': b, 'after_id': c})
+    assert response.status_code == 400
+
+def test_long_keys_schedule_a_rebalance_that_keeps_the_order(app, client, login, project, make_item, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(ranking, 'schedule_rebalance', scheduled.append)
+    headers = login()
+    top, x, y = (make_item(project, title) for title in ('Top', 'X', 'Y'))
+    # Two cards taking turns just below the top one halve the same gap every time
+    moving, below = x, y
+    for _ in range(200):
+        if len(move(client, headers, moving, before_id=top, after_id=below)) > ranking.REBALANCE_RANK_LENGTH:
+            break
+        moving, below = below, moving
+    assert scheduled == [project['columns'][0]]
+    before = [i for i, _ in board_order(client, headers, project)[0]]
+    assert before == [top, moving, below]
+
+    with app.app_context():
+        assert ranking.rebalance_column(project['columns'][0]) == 3
+        db.session.commit()
+        assert max(len(r) for (r,) in db.session.query(Item.rank).filter(Item.column_id == project['columns'][0])) <= ranking.RANK_WIDTH
+    assert [i for i, _ in board_order(client, headers, project)[0]] == before
@@ -0,0 +1,39 @@
+from models.db import db
+from models.user import User
+from controllers.realtime import NAMESPACE, socketio
+
+def connect(app, token):
+    return socketio.test_client(app, namespace=NAMESPACE, auth={'token': token})
+
+def token_of(headers):
+    return headers['Authorization'].split(' ')[1]
+
+def test_valid_token_connects_and_subscribes(app, login, project):
+    sio = connect(app, token_of(login()))
+    assert sio.is_connected(NAMESPACE)
+    assert sio.emit('subscribe', {'project_id': project['id']}, namespace=NAMESPACE, callback=True) == {'subscribed': project['id']}
+    sio.disconnect(namespace=NAMESPACE)
+
+def test_bad_token_and_deleted_user_are_refused(app, client, login):
+    assert not connect(app, 'not-a-jwt').is_connected(NAMESPACE)
+    client.post('/register', json={'username': 'gina', 'email': 'gina@example.com', 'password': 'secret'})
+    token = token_of(login('gina@example.com', 'secret'))
+    assert connect(app, token).is_connected(NAMESPACE)
+    with app.app_context():
+        db.session.delete(User.query.filter_by(email='gina@example.com').one())
+        db.session.commit()
+    assert not connect(app, token).is_connected(NAMESPACE)
+
+def test_patch_pushes_an_item_updated_delta(app, client, login, project, make_item):
+    headers = login()
+    item_id = make_item(project, 'Before')
+    sio = connect(app, token_of(headers))
+    sio.emit('subscribe', {'project_id': project['id']}, namespace=NAMESPACE, callback=True)
+    sio.get_received(NAMESPACE)
+
+    assert client.patch(f'/items/{item_id}', headers=headers, json={'title': 'After', 'status': 'inprogress'}).status_code == 200
+    events = [e for e in sio.get_received(NAMESPACE) if e['name'] == 'item_updated']
+    assert len(events) == 1
+    assert events[0]['args'][0]['id'] == item_id
+    assert (events[0]['args'][0]['title'], events[0]['args'][0]['status']) == ('After', 'inprogress')
+    sio.disconnect(namespace=NAMESPACE)
@@ -0,0 +1,25 @@
+def item_selects(statements):
+    return [s for s in statements if s.lstrip().upper().startswith('SELECT') and 'FROM item' in s and 'count(' not in s]
+
+def test_fields_projection_reaches_the_sql_column_list(client, login, count_queries, project, make_item):
+    headers = login()
+    make_item(project, 'Projected', description='Left out of the SELECT')
+    url = f'/items/projects/{project["id"]}/items'
+    client.get(url, headers=headers)  # warm the principal and permission caches
+
+    with count_queries() as statements:
+        response = client.get(f'{url}?fields=id,title,description', headers=headers)
+    assert response.get_json()['items'][0]['description'] == 'Left out of the SELECT'
+    assert any('item.description' in s for s in item_selects(statements))
+
+    with count_queries() as statements:
+        response = client.get(f'{url}?fields=id,title', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['items'] == [{'id': response.get_json()['items'][0]['id'], 'title': 'Projected'}]
+    selects = item_selects(statements)
+    assert selects and not any('item.description' in s for s in selects)
+
+def test_unknown_fields_are_refused(client, login, project):
+    response = client.get(f'/items/projects/{project["id"]}/items?fields=id,secret', headers=login())
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid fields: secret'
@@ -0,0 +1,50 @@
+from models.user import User
+
+def register(app, client, name):
+    client.post('/register', json={'username': name, 'email': f'{name}@example.com', 'password': 'secret'})
+    with app.app_context():
+        return User.query.filter_by(email=f'{name}@example.com').one().id
+
+def create_team(client, headers, name):
+    return client.post('/teams', headers=headers, json={'name': name}).get_json()['team']['id']
+
+def board_status(client, login, name, project):
+    return client.get(f'/projects/{project["id"]}/board', headers=login(f'{name}@example.com', 'secret')).status_code
+
+def test_team_links_grant_and_revoke_only_what_no_other_team_grants(app, client, login, project):
+    headers = login()
+    hank, iris = register(app, client, 'hank'), register(app, client, 'iris')
+    first, second = create_team(client, headers, 'First team'), create_team(client, headers, 'Second team')
+    for team_id, name in ((first, 'hank'), (first, 'iris'), (second, 'hank')):
+        assert client.post(f'/teams/{team_id}/members', headers=headers, json={'email': f'{name}@example.com'}).status_code == 200
+    assert board_status(client, login, 'hank', project) == 403
+
+    response = client.post(f'/teams/{first}/projects', headers=headers, json={'project_id': project['id']})
+    assert response.get_json()['members_added'] == 2
+    response = client.post(f'/teams/{second}/projects', headers=headers, json={'project_id': project['id']})
+    assert response.get_json()['members_added'] == 0
+    assert board_status(client, login, 'hank', project) == 200 and board_status(client, login, 'iris', project) == 200
+
+    # The second team still grants hank the project, and alice administers it
+    response = client.delete(f'/teams/{first}/projects/{project["id"]}', headers=headers)
+    assert response.get_json()['members_removed'] == 1
+    assert board_status(client, login, 'hank', project) == 200 and board_status(client, login, 'iris', project) == 403
+
+    response = client.delete(f'/teams/{second}/members/{hank}', headers=headers)
+    assert response.get_json()['projects_removed'] == 1
+    assert board_status(client, login, 'hank', project) == 403
+
+    response = client.post(f'/teams/{second}/members', headers=headers, json={'email': 'iris@example.com'})
+    assert response.get_json()['projects_added'] == 1
+    assert board_status(client, login, 'iris', project) == 200
+
+def test_unknown_role_grants_nothing(app, client, login, project):
+    headers = login()
+    jude = register(app, client, 'jude')
+    team_id = create_team(client, headers, 'Role team')
+    client.post(f'/teams/{team_id}/members', headers=headers, json={'email': 'jude@example.com'})
+    response = client.post(f'/teams/{team_id}/projects', headers=headers,
+                           json={'project_id': project['id'], 'roles': {str(jude): 'overlord'}})
+    assert response.status_code == 400
+    assert board_status(client, login, 'jude', project) == 403
+    assert client.post(f'/teams/{team_id}/projects', headers=headers, json={'project_id': project['id']}).status_code == 200
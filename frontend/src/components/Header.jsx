@@ -5,6 +5,7 @@ import { UserOutlined, DownOutlined, BellOutlined } from "@ant-design/icons";
 import NotificationModal from "./NotificationModal";
 import ProjectSearchModal from "./ProjectSearchModal";
 import { ProjectContext } from "../context/ProjectContext";
+import { onNotification } from "../utils/realtime";
 
 function getBreadcrumbItems(location, selectedProject) {
   const path = location.pathname.split("/").filter(Boolean);
@@ -48,16 +49,14 @@ function Header({ setIsAuthenticated, isAuthenticated }) {
         const token = localStorage.getItem("token");
         try {
           const res = await fetch(
-            "https://jira-clone-mtig.onrender.com/notifications",
+            "https://jira-clone-mtig.onrender.com/notifications/unread-count",
             {
               headers: { Authorization: `Bearer ${token}` },
             }
           );
           if (res.ok) {
             const data = await res.json();
-            setUnreadCount(
-              Array.isArray(data) ? data.filter((n) => !n.is_read).length : 0
-            );
+            setUnreadCount(data.unread || 0);
           }
         } catch {
           setUnreadCount(0);
@@ -67,6 +66,11 @@ function Header({ setIsAuthenticated, isAuthenticated }) {
     }
   }, [isAuthenticated, notifVisible]);
 
+  useEffect(() => {
+    if (!isAuthenticated) return undefined;
+    return onNotification(() => setUnreadCount((count) => count + 1));
+  }, [isAuthenticated]);
+
   const handleLogout = () => {
     localStorage.removeItem("token");
     localStorage.removeItem("user");
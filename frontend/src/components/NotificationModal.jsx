@@ -1,26 +1,32 @@
 import React, { useEffect, useState } from "react";
 import { Modal, List, Button, Badge, Spin, Typography } from "antd";
+import { onNotification } from "../utils/realtime";
 
 const { Text } = Typography;
 
 const NotificationModal = ({ visible, onClose }) => {
   const [notifications, setNotifications] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
 
-  const fetchNotifications = async () => {
+  const fetchNotifications = async (cursor = "") => {
     setLoading(true);
     const token = localStorage.getItem("token");
     try {
       const res = await fetch(
-        "https://jira-clone-mtig.onrender.com/notifications",
+        `https://jira-clone-mtig.onrender.com/notifications?limit=50&cursor=${encodeURIComponent(cursor)}`,
         {
           headers: { Authorization: `Bearer ${token}` },
         }
       );
       const data = await res.json();
-      setNotifications(data);
+      setNotifications((current) =>
+        cursor ? [...current, ...data.notifications] : data.notifications
+      );
+      setNextCursor(data.next_cursor);
     } catch (err) {
-      setNotifications([]);
+      if (!cursor) setNotifications([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
@@ -30,16 +36,38 @@ const NotificationModal = ({ visible, onClose }) => {
     if (visible) fetchNotifications();
   }, [visible]);
 
-  const markAsRead = async (id) => {
+  useEffect(() => {
+    if (!visible) return undefined;
+    return onNotification((notif) =>
+      setNotifications((current) => [notif, ...current])
+    );
+  }, [visible]);
+
+  const markRead = async (body) => {
     const token = localStorage.getItem("token");
-    await fetch(
-      `https://jira-clone-mtig.onrender.com/notifications/${id}/read`,
-      {
-        method: "POST",
-        headers: { Authorization: `Bearer ${token}` },
-      }
+    await fetch("https://jira-clone-mtig.onrender.com/notifications/read", {
+      method: "POST",
+      headers: {
+        Authorization: `Bearer ${token}`,
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(body),
+    });
+    const ids = body.ids ? new Set(body.ids) : null;
+    setNotifications((current) =>
+      current.map((n) =>
+        n.id && (ids ? ids.has(n.id) : n.id <= body.up_to_id)
+          ? { ...n, is_read: true }
+          : n
+      )
     );
-    fetchNotifications();
+  };
+
+  const markAsRead = (id) => markRead({ ids: [id] });
+
+  const markAllAsRead = () => {
+    const newest = Math.max(0, ...notifications.map((n) => n.id || 0));
+    if (newest) markRead({ up_to_id: newest });
   };
 
   return (
@@ -47,10 +75,25 @@ const NotificationModal = ({ visible, onClose }) => {
       title="Notifications"
       open={visible}
       onCancel={onClose}
-      footer={null}
+      footer={
+        <>
+          {nextCursor && (
+            <Button onClick={() => fetchNotifications(nextCursor)} loading={loading}>
+              Load more
+            </Button>
+          )}
+          <Button
+            type="link"
+            onClick={markAllAsRead}
+            disabled={!notifications.some((n) => !n.is_read)}
+          >
+            Mark all as read
+          </Button>
+        </>
+      }
       width={400}
     >
-      {loading ? (
+      {loading && !notifications.length ? (
         <Spin />
       ) : (
         <List
@@ -64,7 +107,7 @@ const NotificationModal = ({ visible, onClose }) => {
                 marginBottom: 8,
               }}
               actions={
-                item.is_read
+                item.is_read || !item.id
                   ? []
                   : [
                       <Button
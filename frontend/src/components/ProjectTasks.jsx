@@ -40,6 +40,7 @@ import {
   getStatusColor,
   getPriorityColor,
 } from "../utils/itemUi.jsx";
+import { subscribeProject, isRealtimeConnected } from "../utils/realtime";
 
 const { Option } = Select;
 const { Title } = Typography;
@@ -100,6 +101,29 @@ function ProjectTasks() {
     // eslint-disable-next-line
   }, [selectedProject, typeFilter]);
 
+  // Apply item deltas pushed by the server instead of reloading the list
+  useEffect(() => {
+    if (!selectedProject) return undefined;
+    const matchesFilter = (item) =>
+      typeFilter === "all" || item.type === typeFilter;
+    return subscribeProject(selectedProject.id, {
+      item_created: (item) => {
+        if (!matchesFilter(item)) return;
+        setTasks((current) =>
+          current.some((t) => t.id === item.id) ? current : [...current, item]
+        );
+      },
+      item_updated: (item) =>
+        setTasks((current) =>
+          matchesFilter(item)
+            ? current.map((t) => (t.id === item.id ? { ...t, ...item } : t))
+            : current.filter((t) => t.id !== item.id)
+        ),
+      item_deleted: ({ id }) =>
+        setTasks((current) => current.filter((t) => t.id !== id)),
+    });
+  }, [selectedProject, typeFilter]);
+
   const fetchTasks = async () => {
     setLoading(true);
     const token = localStorage.getItem("token");
@@ -204,7 +228,7 @@ function ProjectTasks() {
       body: JSON.stringify(values),
     });
     setEditTaskId(null);
-    fetchTasks();
+    if (!isRealtimeConnected()) fetchTasks();
     setAlert("Task updated!");
     setTimeout(() => setAlert(""), 2000);
   };
@@ -231,9 +255,11 @@ function ProjectTasks() {
           const data = await res.json().catch(() => ({}));
           console.log("Delete response:", res, data);
           if (res.ok) {
-            fetchTasks().catch((e) =>
-              console.error("fetchTasks error after delete:", e)
-            );
+            if (!isRealtimeConnected()) {
+              fetchTasks().catch((e) =>
+                console.error("fetchTasks error after delete:", e)
+              );
+            }
             setAlert("Task deleted!");
             setTimeout(() => setAlert(""), 2000);
           } else {
@@ -292,7 +318,7 @@ function ProjectTasks() {
     if (res.ok) {
       setShowBugModal(false);
       bugForm.resetFields();
-      fetchTasks();
+      if (!isRealtimeConnected()) fetchTasks();
       setAlert("Bug reported!");
       setTimeout(() => setAlert(""), 2000);
     } else {
@@ -382,7 +408,7 @@ function ProjectTasks() {
       setShowTaskModal(false);
       taskForm.resetFields();
       setTaskType("task");
-      fetchTasks();
+      if (!isRealtimeConnected()) fetchTasks();
       setAlert("Task created!");
       setTimeout(() => setAlert(""), 2000);
     } else {
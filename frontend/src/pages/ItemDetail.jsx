@@ -38,6 +38,24 @@ import {
 const { TextArea } = Input;
 const { Title, Text } = Typography;
 
+// Levels of the epic tree loaded in one request; deeper items show as "+N more"
+const TREE_DEPTH = 3;
+
+const formatRollup = (rollup) => {
+  const parts = [
+    `${rollup.leaves_done}/${rollup.leaves_total} done`,
+    `${rollup.story_points_done}/${rollup.story_points} pts`,
+  ];
+  if (rollup.earliest_due_date) {
+    parts.push(
+      rollup.earliest_due_date === rollup.latest_due_date
+        ? `due ${rollup.latest_due_date}`
+        : `due ${rollup.earliest_due_date} – ${rollup.latest_due_date}`
+    );
+  }
+  return parts.join(" · ");
+};
+
 const statusOptions = [
   { value: "todo", label: "To Do" },
   { value: "inprogress", label: "In Progress" },
@@ -62,6 +80,7 @@ function ItemDetail() {
   const [editModalVisible, setEditModalVisible] = useState(false);
   const [form] = Form.useForm();
   const [commentInput, setCommentInput] = useState("");
+  const [tree, setTree] = useState(null);
 
   useEffect(() => {
     if (itemId) {
@@ -81,6 +100,11 @@ function ItemDetail() {
       );
       const data = await res.json();
       setTask(data.item);
+      if (data.item?.type === "epic") {
+        fetchTree();
+      } else {
+        setTree(null);
+      }
       if (data.item?.project_id) {
         if (!selectedProject || selectedProject.id !== data.item.project_id) {
           fetchAndSetProject(data.item.project_id);
@@ -93,6 +117,71 @@ function ItemDetail() {
     }
   };
 
+  // The whole epic, with done/points/due rollups per node, in one request
+  const fetchTree = async () => {
+    const token = localStorage.getItem("token");
+    const res = await fetch(
+      `https://jira-clone-mtig.onrender.com/items/${itemId}/tree?depth=${TREE_DEPTH}`,
+      {
+        headers: { Authorization: `Bearer ${token}` },
+      }
+    );
+    if (res.ok) {
+      const data = await res.json();
+      setTree(data.tree);
+    }
+  };
+
+  const renderTreeNodes = (nodes) => (
+    <List
+      itemLayout="horizontal"
+      dataSource={nodes}
+      renderItem={(node) => (
+        <List.Item
+          style={{ display: "block", borderRadius: "4px" }}
+          className="hover-bg"
+        >
+          <List.Item.Meta
+            avatar={getTypeIcon(node.type)}
+            title={
+              <span
+                onClick={() => navigate(`/items/${node.id}`)}
+                style={{ fontWeight: 500, cursor: "pointer" }}
+              >
+                {node.title}
+              </span>
+            }
+            description={
+              <span>
+                <Tag color={getStatusColor(node.status)}>{node.status}</Tag>
+                {node.story_points != null && (
+                  <Tag>{node.story_points} pts</Tag>
+                )}
+                {node.child_count > 0 && (
+                  <Text type="secondary">{formatRollup(node.rollup)}</Text>
+                )}
+              </span>
+            }
+          />
+          {node.children.length > 0 && (
+            <div style={{ marginLeft: 24 }}>
+              {renderTreeNodes(node.children)}
+            </div>
+          )}
+          {node.child_count > 0 && node.children.length === 0 && (
+            <Text
+              type="secondary"
+              onClick={() => navigate(`/items/${node.id}`)}
+              style={{ marginLeft: 24, cursor: "pointer" }}
+            >
+              +{node.child_count} more
+            </Text>
+          )}
+        </List.Item>
+      )}
+    />
+  );
+
   const fetchAndSetProject = async (projectId) => {
     const token = localStorage.getItem("token");
     const res = await fetch(
@@ -166,47 +255,22 @@ function ItemDetail() {
             {task.description || "No description."}
           </Card>
 
-          {/* --- NEW: Subtasks Section --- */}
-          {/* This card will only show if the current item is an epic and has subtasks */}
-          {task.type === "epic" &&
-            task.subtasks &&
-            task.subtasks.length > 0 && (
-              <Card
-                title={
-                  <span>
-                    <CheckOutlined /> Subtasks ({task.subtasks.length})
-                  </span>
-                }
-                bordered={false}
-                style={{ marginBottom: 24 }}
-              >
-                <List
-                  itemLayout="horizontal"
-                  dataSource={task.subtasks}
-                  renderItem={(subtask) => (
-                    <List.Item
-                      onClick={() => navigate(`/items/${subtask.id}`)}
-                      style={{ cursor: "pointer", borderRadius: "4px" }}
-                      className="hover-bg"
-                    >
-                      <List.Item.Meta
-                        avatar={getTypeIcon(subtask.type)}
-                        title={
-                          <span style={{ fontWeight: 500 }}>
-                            {subtask.title}
-                          </span>
-                        }
-                        description={
-                          <Tag color={getStatusColor(subtask.status)}>
-                            {subtask.status}
-                          </Tag>
-                        }
-                      />
-                    </List.Item>
-                  )}
-                />
-              </Card>
-            )}
+          {/* --- Epic tree: every level below this epic, with rollups --- */}
+          {task.type === "epic" && tree && tree.children.length > 0 && (
+            <Card
+              title={
+                <span>
+                  <CheckOutlined /> Subtasks ({tree.rollup.leaves_done}/
+                  {tree.rollup.leaves_total})
+                </span>
+              }
+              extra={<Text type="secondary">{formatRollup(tree.rollup)}</Text>}
+              bordered={false}
+              style={{ marginBottom: 24 }}
+            >
+              {renderTreeNodes(tree.children)}
+            </Card>
+          )}
 
           <Card title="Comments" bordered={false}>
             {hasPermission("add_comment") && (
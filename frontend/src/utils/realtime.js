@@ -0,0 +1,46 @@
+import { io } from "socket.io-client";
+import API_BASE_URL from "../config";
+
+// One shared connection to the backend's /realtime namespace. The server puts
+// the socket in the user's room on connect; boards call subscribeProject().
+let socket = null;
+let socketToken = null;
+
+export function getSocket() {
+  const token = localStorage.getItem("token");
+  if (!token) return null;
+  if (socket && socketToken === token) return socket;
+  if (socket) socket.disconnect();
+  socketToken = token;
+  socket = io(`${API_BASE_URL.replace(/\/$/, "")}/realtime`, {
+    auth: { token },
+    transports: ["websocket", "polling"],
+  });
+  return socket;
+}
+
+export function subscribeProject(projectId, handlers) {
+  const s = getSocket();
+  if (!s) return () => {};
+  const join = () => s.emit("subscribe", { project_id: projectId });
+  join();
+  // Rooms are lost on reconnect, so join again each time
+  s.on("connect", join);
+  Object.entries(handlers).forEach(([event, handler]) => s.on(event, handler));
+  return () => {
+    s.emit("unsubscribe", { project_id: projectId });
+    s.off("connect", join);
+    Object.entries(handlers).forEach(([event, handler]) => s.off(event, handler));
+  };
+}
+
+export function onNotification(handler) {
+  const s = getSocket();
+  if (!s) return () => {};
+  s.on("notification", handler);
+  return () => s.off("notification", handler);
+}
+
+export function isRealtimeConnected() {
+  return Boolean(socket && socket.connected);
+}